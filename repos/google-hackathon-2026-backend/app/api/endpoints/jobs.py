@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Any, Dict
+import asyncio
+import logging
+
+from app.models import models
+from app.models.schemas import ItineraryRequest, JobSubmitResponse, JobStatusResponse
+from app.api.endpoints.auth import get_current_user
+from app.api.endpoints.media import VideoRequest
+from app.services.gemini import GeminiService
+from app.services.jobs import job_manager, job_to_dict, JobContext
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+gemini_service = GeminiService()
+
+# Long-poll requests are capped so they stay below typical load balancer timeouts
+MAX_WAIT_SECONDS = 50
+
+
+# --- Job handlers ---
+
+async def run_itinerary_job(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
+    job.report_progress(10, "Generating itinerary")
+    return await gemini_service.generate_itinerary(
+        payload["proposalId"], payload["title"], payload["language"], payload.get("nights", 1)
+    )
+
+async def run_image_job(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
+    job.report_progress(10, "Generating images")
+    image_urls = await gemini_service.generate_travel_images(
+        destination=payload["title"],
+        description=payload["description"],
+        user_image_url=payload.get("user_image_url"),
+        user_id=payload.get("user_id"),
+    )
+    return {"image_urls": image_urls}
+
+async def run_video_job(payload: Dict[str, Any], job: JobContext) -> Dict[str, Any]:
+    job.report_progress(10, "Generating video")
+    video_url = await gemini_service.generate_travel_video(
+        destination=payload["title"],
+        description=payload["description"],
+        user_image_url=payload.get("user_image_url"),
+        user_id=payload.get("user_id"),
+        on_progress=lambda fraction: job.report_progress(10 + int(fraction * 85), "Rendering video"),
+    )
+    return {"video_url": video_url}
+
+job_manager.register("itinerary", run_itinerary_job)
+job_manager.register("image", run_image_job)
+job_manager.register("video", run_video_job)
+
+
+async def _submit(kind: str, payload: Dict[str, Any]) -> JobSubmitResponse:
+    try:
+        job = await job_manager.submit(kind, payload)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JobSubmitResponse(job_id=job.id, kind=job.kind, status=job.status)
+
+
+# --- Submission ---
+
+@router.post("/itinerary", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_itinerary_job(request: ItineraryRequest):
+    """
+    Queues itinerary generation and returns a job id immediately.
+    """
+    logger.info(f"Request: /jobs/itinerary - ID: {request.proposalId}, Title: {request.title}")
+    return await _submit("itinerary", request.dict())
+
+@router.post("/image", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_image_job(request: VideoRequest, current_user: models.User = Depends(get_current_user)):
+    """
+    Queues travel image generation and returns a job id immediately.
+    Requires authentication.
+    """
+    logger.info(f"Request: /jobs/image - proposalId: {request.proposalId}, Title: {request.title}, UserId: {current_user.id}")
+    return await _submit("image", {
+        "title": request.title,
+        "description": request.description,
+        "user_image_url": current_user.profile_image_url or request.user_profile_image_url,
+        "user_id": current_user.id,
+    })
+
+@router.post("/video", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_video_job(request: VideoRequest, current_user: models.User = Depends(get_current_user)):
+    """
+    Queues Veo video generation and returns a job id immediately.
+    Requires authentication.
+    """
+    logger.info(f"Request: /jobs/video - proposalId: {request.proposalId}, Title: {request.title}, UserId: {current_user.id}")
+    return await _submit("video", {
+        "title": request.title,
+        "description": request.description,
+        "user_image_url": current_user.profile_image_url or request.user_profile_image_url,
+        "user_id": current_user.id,
+    })
+
+
+# --- Status ---
+
+@router.get("/stats")
+async def get_job_stats():
+    """
+    Worker pool size, queue depth, status counts and per-kind timings.
+    """
+    return await asyncio.to_thread(job_manager.stats)
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, wait: float = Query(0, ge=0, description="Seconds to long-poll for completion")):
+    """
+    Returns the job state. With `wait`, blocks until the job finishes or the wait elapses.
+    """
+    job = await job_manager.wait(job_id, min(wait, MAX_WAIT_SECONDS))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
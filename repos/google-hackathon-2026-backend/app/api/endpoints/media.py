@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Union
 import logging
 import asyncio
+import json
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models import models
@@ -10,12 +12,19 @@ from app.models import models
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+class VideoSpot(BaseModel):
+    name: str
+    lat: float | None = None
+    lng: float | None = None
+
 class VideoRequest(BaseModel):
     proposalId: Union[str, int]
     title: str
     description: str
     user_profile_image_url: str | None = None
     user_id: int | None = None
+    # Itinerary spots; when given, videos are looked up in the local VideoAssets index first
+    spots: List[VideoSpot] | None = None
 
 class VideoResponse(BaseModel):
     videoUrls: List[str]
@@ -26,6 +35,35 @@ class VideoAIResponse(BaseModel):
 
 from app.api.endpoints.auth import get_current_user
 
+def resolve_user_image_url(request: VideoRequest, db: Session) -> str | None:
+    """
+    Returns the user's profile image from the DB if user_id is provided, else the image in the request.
+    """
+    user_img = request.user_profile_image_url
+    if request.user_id:
+        db_user = db.query(models.User).filter(models.User.id == request.user_id).first()
+        if db_user and db_user.profile_image_url:
+            user_img = db_user.profile_image_url
+            logger.info(f"Found user in DB, using profile_image_url: {user_img}")
+    return user_img
+
+async def find_video_urls(request: VideoRequest) -> List[str]:
+    """
+    Short video URLs for the plan: the local VideoAssets index for the request's spots,
+    then Discovery Engine with the title and description on a miss.
+    """
+    from app.services.discovery_engine_service import discovery_engine_service
+    from app.services.video_asset_index import video_asset_index
+
+    if request.spots:
+        urls = video_asset_index.search([(spot.name, spot.lat, spot.lng) for spot in request.spots])
+        if urls:
+            logger.info(f"Video asset index returned {len(urls)} URLs for {len(request.spots)} spots.")
+            return urls
+
+    search_query = f"{request.title} {request.description}"[:200] # Limit query length
+    return await discovery_engine_service.search_video_urls(search_query)
+
 @router.post("/generate-video", response_model=VideoResponse)
 async def generate_video(request: VideoRequest, db: Session = Depends(get_db)):
     """
@@ -37,20 +75,13 @@ async def generate_video(request: VideoRequest, db: Session = Depends(get_db)):
     logger.info(f"Request: /generate-video - proposalId: {request.proposalId}, Title: {request.title}, Description: {request.description[:50]}..., UserImage: {user_img}, UserId: {request.user_id}")
     
     # Prioritize user image from DB if user_id is provided
-    user_img_for_gemini = request.user_profile_image_url
-    if request.user_id:
-        db_user = db.query(models.User).filter(models.User.id == request.user_id).first()
-        if db_user and db_user.profile_image_url:
-            user_img_for_gemini = db_user.profile_image_url
-            logger.info(f"Found user in DB, using profile_image_url: {user_img_for_gemini}")
+    user_img_for_gemini = resolve_user_image_url(request, db)
 
     # 1. Start Image Generation (Async)
     # Extract destination from title or description roughly (or just use full text)
     from app.services.gemini import GeminiService
-    from app.services.discovery_engine_service import DiscoveryEngineService
     
     gemini_service = GeminiService()
-    discovery_service = DiscoveryEngineService()
     
     # Run image generation concurrently with video logic
     image_task = None
@@ -64,10 +95,8 @@ async def generate_video(request: VideoRequest, db: Session = Depends(get_db)):
             )
         )
 
-    # 2. Search for Video URLs using Discovery Engine
-    # Use both title and description for a better search query if needed
-    search_query = f"{request.title} {request.description}"[:200] # Limit query length
-    video_task = asyncio.create_task(discovery_service.search_video_urls(search_query))
+    # 2. Search for Video URLs (local index for the spots, Discovery Engine as fallback)
+    video_task = asyncio.create_task(find_video_urls(request))
 
     # Wait for results
     urls = await video_task
@@ -130,11 +159,7 @@ async def generate_image(request: VideoRequest, db: Session = Depends(get_db)):
     logger.info(f"Request: /image - proposalId: {request.proposalId}, Title: {request.title}, Description: {request.description[:50]}..., UserImage: {user_img}, UserId: {request.user_id}")
     
     # Prioritize user image from DB if user_id is provided
-    user_img_for_gemini = request.user_profile_image_url
-    if request.user_id:
-        db_user = db.query(models.User).filter(models.User.id == request.user_id).first()
-        if db_user and db_user.profile_image_url:
-            user_img_for_gemini = db_user.profile_image_url
+    user_img_for_gemini = resolve_user_image_url(request, db)
 
     if not user_img_for_gemini:
         pass
@@ -152,18 +177,53 @@ async def generate_image(request: VideoRequest, db: Session = Depends(get_db)):
     return {"image_urls": image_urls}
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/image/stream")
+async def generate_image_stream(request: VideoRequest, db: Session = Depends(get_db)):
+    """
+    Streaming variant of /image (Server-Sent Events).
+    Emits an `image` event as soon as each image is ready, an `image_failed` event
+    (with a fallback URL) for each image that failed, and a final `done` event with all URLs in order.
+    """
+    logger.info(f"Request: /image/stream - proposalId: {request.proposalId}, Title: {request.title}, Description: {request.description[:50]}..., UserId: {request.user_id}")
+
+    user_img_for_gemini = resolve_user_image_url(request, db)
+
+    from app.services.gemini import GeminiService
+    gemini_service = GeminiService()
+
+    async def event_stream():
+        results = {}
+        async for result in gemini_service.iter_travel_images(
+            destination=request.title,
+            description=request.description,
+            user_image_url=user_img_for_gemini,
+            user_id=request.user_id
+        ):
+            results[result["index"]] = result["url"]
+            if result["error"]:
+                yield _sse_event("image_failed", {"index": result["index"], "error": result["error"], "fallback_url": result["url"]})
+            else:
+                yield _sse_event("image", {"index": result["index"], "url": result["url"]})
+        yield _sse_event("done", {"image_urls": [results[i] for i in sorted(results)]})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/shorts", response_model=ShortsResponse)
 async def search_shorts(request: VideoRequest):
     """
-    Searches for relevant short videos using Discovery Engine.
+    Searches for relevant short videos (local VideoAssets index, then Discovery Engine).
     """
     logger.info(f"Request: /shorts - proposalId: {request.proposalId}, Title: {request.title}")
     
-    from app.services. discovery_engine_service import DiscoveryEngineService
-    discovery_service = DiscoveryEngineService()
-    
-    search_query = f"{request.title} {request.description}"[:200]
-    urls = await discovery_service.search_video_urls(search_query)
+    urls = await find_video_urls(request)
     
     if not urls:
         logger.info("No video URLs found in Discovery Engine, falling back to defaults.")
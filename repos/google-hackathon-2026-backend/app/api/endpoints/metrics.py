@@ -0,0 +1,55 @@
+from fastapi import APIRouter
+import asyncio
+import logging
+
+from app.services.gemini.model_router import model_router
+from app.services.jobs import job_manager, teaser_scheduler
+from app.services.places.places_client import search_flight, photo_flight, places_rate_limiter, search_hedge as places_search_hedge
+from app.services.places.places_cache import place_photo_cache, place_photo_names_cache, place_photo_bytes_cache
+from app.services.retry import retry_budget
+from app.services.cache import persist_writer
+from app.services.hedging import hedge_budget
+from app.services.video_asset_index import video_asset_index
+from app.services.discovery_engine_service import search_hedge as discovery_search_hedge, search_cache as discovery_search_cache, search_flight as discovery_search_flight
+from app.services import http_client
+from app.services.storage.media_cache import image_cache, video_cache
+from app.services.gemini import image_preprocessor
+from app.services.storage import async_storage
+from app.services.gemini.video_operation_tracker import video_operation_tracker
+from app.services.gemini.video_service import video_flight
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("")
+async def get_metrics():
+    """
+    Runtime statistics of the performance-related components, for tuning.
+    """
+    return {
+        "model_router": model_router.stats(),
+        "jobs": await asyncio.to_thread(job_manager.stats),
+        "retry_budget": retry_budget.stats(),
+        "http_client": http_client.stats(),
+        "image_cache": image_cache.stats(),
+        "image_preprocessing": image_preprocessor.stats(),
+        "storage_io": async_storage.stats(),
+        "video_operations": video_operation_tracker.stats(),
+        "video_cache": video_cache.stats(),
+        "video_single_flight": video_flight.stats(),
+        "teasers": teaser_scheduler.stats(),
+        "lookup_cache_writer": persist_writer.stats(),
+        "place_photo_cache": place_photo_cache.stats(),
+        "place_photo_names_cache": place_photo_names_cache.stats(),
+        "place_photo_bytes_cache": place_photo_bytes_cache.stats(),
+        "places_single_flight": {"search": search_flight.stats(), "photo": photo_flight.stats()},
+        "places_rate_limiter": places_rate_limiter.stats(),
+        "video_asset_index": video_asset_index.stats(),
+        "discovery_engine_cache": discovery_search_cache.stats(),
+        "discovery_engine_single_flight": discovery_search_flight.stats(),
+        "hedging": {
+            "budget": hedge_budget.stats(),
+            "places_search": places_search_hedge.stats(),
+            "discovery_engine_search": discovery_search_hedge.stats(),
+        },
+    }
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict
-import requests
-import os
 import logging
+import os
+import re
+
+from app.models.schemas import ItineraryResponse
+from app.services.places import places_client
+from app.services.places.places_client import PlacesAPIError
+from app.services.places.place_photo_resolver import resolve_place_photo, resolve_place_photos, itinerary_place_queries
+from app.services.places.photo_proxy import get_cached_photo, normalize_max_px, sign_photo_name, verify_photo_name, PHOTO_NAME_RE
 
 # Configure router
 router = APIRouter()
@@ -12,25 +19,69 @@ logger = logging.getLogger(__name__)
 # Request Models
 class PlacePhotoRequest(BaseModel):
     query: str
+    # Optional location bias (e.g. an itinerary item's coordinates)
+    lat: float | None = None
+    lng: float | None = None
 
 class PlacePhotoResponse(BaseModel):
     image_url: str | None
     author_attributions: list[dict[str, str]] | None = None
 
-# Environment Variables
-# Using GOOGLE_PLACE_API_KEY as requested by user
-GOOGLE_PLACE_API_KEY = os.getenv("GOOGLE_PLACE_API_KEY", "")
+class PlacePhotoBatchItem(BaseModel):
+    query: str
+    lat: float | None = None
+    lng: float | None = None
+
+class PlacePhotoBatchRequest(BaseModel):
+    items: List[PlacePhotoBatchItem] = []
+    # Alternatively, a whole itinerary: every item's activity and location are resolved
+    itinerary: ItineraryResponse | None = None
+
+class PlacePhotoBatchResult(PlacePhotoResponse):
+    query: str
+
+class PlacePhotoBatchResponse(BaseModel):
+    results: List[PlacePhotoBatchResult]
+
+MAX_BATCH_ITEMS = 100
+PHOTO_MAX_PX = 800
+# Photo bytes for a resource name never change, so browsers and CDNs may keep them
+PHOTO_PROXY_MAX_AGE_SECONDS = int(os.getenv("PLACE_PHOTO_PROXY_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+# Base URL used in returned photo URLs (defaults to the URL the request came in on)
+PUBLIC_API_BASE_URL = os.getenv("PUBLIC_API_BASE_URL", "")
+STREAM_CHUNK_SIZE = 64 * 1024
+_RANGE_SPEC_RE = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
 
-# In-memory cache for place photos
-_image_cache = {}
+def _public_base_url(http_request: Request) -> str:
+    if PUBLIC_API_BASE_URL:
+        return PUBLIC_API_BASE_URL.rstrip("/")
+    base_url = http_request.base_url
+    # Behind Cloud Run / a load balancer the app itself sees plain http
+    forwarded_proto = http_request.headers.get("x-forwarded-proto", "").split(",")[0].strip().lower()
+    if forwarded_proto in ("http", "https"):
+        base_url = base_url.replace(scheme=forwarded_proto)
+    return str(base_url).rstrip("/")
+
+def _proxy_url(http_request: Request, photo_name: str, max_px: int = PHOTO_MAX_PX) -> str:
+    base = _public_base_url(http_request)
+    path = http_request.app.url_path_for("get_place_photo_media", photo_name=photo_name)
+    return f"{base}{path}?max_px={max_px}&sig={sign_photo_name(photo_name)}"
+
+def _photo_response(http_request: Request, resolved: dict | None) -> PlacePhotoResponse:
+    if not resolved:
+        return PlacePhotoResponse(image_url=None)
+    return PlacePhotoResponse(
+        image_url=_proxy_url(http_request, resolved["photo_name"]),
+        author_attributions=resolved.get("attributions"),
+    )
 
 @router.post("/photo", response_model=PlacePhotoResponse)
-async def get_place_photo(request: PlacePhotoRequest):
+async def get_place_photo(request: PlacePhotoRequest, http_request: Request):
     """
     Fetches a photo URL for a place query using Google Places API (New).
     Values privacy and backend-controlled API usage.
     """
-    if not GOOGLE_PLACE_API_KEY:
+    if not places_client.get_api_key():
         logger.warning("GOOGLE_PLACE_API_KEY is not set.")
         return PlacePhotoResponse(image_url=None)
 
@@ -38,61 +89,123 @@ async def get_place_photo(request: PlacePhotoRequest):
     if not query:
         return PlacePhotoResponse(image_url=None)
 
-    # Check cache
-    if query in _image_cache:
-        cached = _image_cache[query]
-        logger.info(f"Returning cached image for: {query}")
-        return PlacePhotoResponse(
-            image_url=cached.get("url"), 
-            author_attributions=cached.get("attributions")
-        )
-
+    location = (request.lat, request.lng) if request.lat is not None and request.lng is not None else None
     try:
-        # 1. Text Search (New) to get Place ID/Name
-        # POST https://places.googleapis.com/v1/places:searchText
-        search_url = 'https://places.googleapis.com/v1/places:searchText'
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Goog-Api-Key': GOOGLE_PLACE_API_KEY,
-            'X-Goog-FieldMask': 'places.photos,places.photos.authorAttributions' # Include attributions
-        }
-        body = {
-            'textQuery': query
-        }
-
-        # Sync request using 'requests' library
-        response = requests.post(search_url, json=body, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        search_data = response.json()
-
-        if search_data.get('places') and len(search_data['places']) > 0:
-             place = search_data['places'][0]
-             if place.get('photos') and len(place['photos']) > 0:
-                 photo = place['photos'][0]
-                 # 2. Construct Photo URL
-                 photo_resource_name = photo['name']
-                 photo_url = f"https://places.googleapis.com/v1/{photo_resource_name}/media?maxHeightPx=800&maxWidthPx=800&key={GOOGLE_PLACE_API_KEY}"
-                 
-                 # 3. Get Attributions
-                 attributions = photo.get('authorAttributions', [])
-                 
-                 # Store in cache
-                 _image_cache[query] = {
-                     "url": photo_url,
-                     "attributions": attributions
-                 }
-                 
-                 return PlacePhotoResponse(
-                     image_url=photo_url,
-                     author_attributions=attributions
-                 )
-        
-        # Cache negative results
-        _image_cache[query] = {"url": None, "attributions": None}
-        logger.info(f"No photos found for query: {query}")
-        return PlacePhotoResponse(image_url=None)
-
-    except Exception as e:
+        return _photo_response(http_request, await resolve_place_photo(query, location))
+    except PlacesAPIError as e:
+        # Errors are not cached so the next request retries
         logger.error(f"Failed to fetch place photo: {e}")
         return PlacePhotoResponse(image_url=None)
+
+@router.post("/photos/batch", response_model=PlacePhotoBatchResponse)
+async def get_place_photos_batch(request: PlacePhotoBatchRequest, http_request: Request):
+    """
+    Resolves photos for many places in one request (e.g. every spot of an itinerary).
+    Each item's lat/lng is used as a location bias. Results follow the input order.
+    """
+    queries = [(item.query, (item.lat, item.lng) if item.lat is not None and item.lng is not None else None) for item in request.items]
+    if request.itinerary:
+        queries += itinerary_place_queries(request.itinerary.dict())
+    if len(queries) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many items (max {MAX_BATCH_ITEMS})")
+
+    logger.info(f"Request: /places/photos/batch - {len(queries)} items")
+    if not places_client.get_api_key():
+        logger.warning("GOOGLE_PLACE_API_KEY is not set.")
+        resolved = [None] * len(queries)
+    else:
+        resolved = await resolve_place_photos(queries)
+
+    return PlacePhotoBatchResponse(results=[
+        PlacePhotoBatchResult(query=query, **_photo_response(http_request, result).dict())
+        for (query, _), result in zip(queries, resolved)
+    ])
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parses a single "bytes=start-end" range into inclusive offsets.
+    Returns None when the header should be ignored: malformed, multiple ranges or
+    another unit (RFC 9110 says to serve the full response then). Raises ValueError
+    when a valid range is unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    match = _RANGE_SPEC_RE.match(spec)
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    start_s, end_s = match.groups()
+    if not start_s:
+        # Suffix range: last N bytes
+        length = int(end_s)
+        if length <= 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(start_s)
+    if end_s and int(end_s) < start:
+        return None
+    end = min(int(end_s), size - 1) if end_s else size - 1
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+def _iter_file(f, start: int, length: int):
+    # Sync generator: Starlette runs it in the thread pool
+    try:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+@router.get("/photo/media/{photo_name:path}", name="get_place_photo_media")
+async def get_place_photo_media(photo_name: str, request: Request, max_px: int = Query(PHOTO_MAX_PX, ge=1, le=4800), sig: str = ""):
+    """
+    Serves a Places photo from the local photo cache (fetching it on a miss) without exposing the API key.
+    Only signed URLs issued by this server are served. Supports ETag / If-None-Match (304) and single byte ranges.
+    """
+    if not PHOTO_NAME_RE.match(photo_name) or not verify_photo_name(photo_name, sig):
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    photo = await get_cached_photo(photo_name, normalize_max_px(max_px))
+    if photo is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    headers = {
+        "ETag": photo.etag,
+        "Cache-Control": f"public, max-age={PHOTO_PROXY_MAX_AGE_SECONDS}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or photo.etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+
+    start, end = 0, photo.size - 1
+    status_code = 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and photo.size > 0 and (not if_range or if_range.strip() == photo.etag):
+        try:
+            parsed = _parse_range(range_header, photo.size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{photo.size}"})
+        if parsed:
+            start, end = parsed
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{photo.size}"
+
+    length = max(0, end - start + 1)
+    headers["Content-Length"] = str(length)
+    # Open before responding so a concurrent eviction cannot remove the file mid-stream
+    try:
+        f = open(photo.path, "rb")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return StreamingResponse(_iter_file(f, start, length), status_code=status_code, media_type=photo.content_type, headers=headers)
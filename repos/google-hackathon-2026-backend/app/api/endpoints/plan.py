@@ -12,6 +12,7 @@ from app.models.schemas import (
 from app.api.endpoints.auth import get_current_user
 from app.services.gemini import GeminiService
 from app.services.bigquery_service import BigQueryService
+from app.services.places.place_photo_resolver import prefetch_itinerary_photos
 from typing import List
 import logging
 
@@ -60,6 +61,8 @@ async def create_itinerary(request: ItineraryRequest):
     logger.info(f"Request: /itinerary - ID: {request.proposalId}, Title: {request.title}")
     try:
         itinerary = await gemini_service.generate_itinerary(request.proposalId, request.title, request.language, request.nights)
+        # Warm the place photo cache for the spots the frontend is about to look up
+        prefetch_itinerary_photos(itinerary)
         return itinerary
     except Exception as e:
         logger.error(f"Error in /itinerary: {e}")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Query
 from app.services.bigquery_service import BigQueryService
 from app.models.schemas import SearchResultsResponse, SocialPlan, SocialPlanDetail, CommentRequest, CommentResponse
+from app.services.jobs import teaser_scheduler
+from app.services.storage import async_storage
 from typing import List, Optional
 
 router = APIRouter()
@@ -28,6 +30,11 @@ async def get_plan_detail(plan_id: str):
     plan = await bq_service.get_plan(plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
+
+    # Attach the pre-generated teaser video, if any
+    teaser_uri = teaser_scheduler.get_teaser_uri(plan_id)
+    if teaser_uri:
+        plan["teaser_video_url"] = await async_storage.generate_signed_url(teaser_uri)
     return plan
 
 @router.post("/plans/{plan_id}/like")
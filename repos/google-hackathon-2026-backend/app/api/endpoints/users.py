@@ -6,6 +6,7 @@ from app.database import get_db
 from app.models import models, schemas
 from app.api.endpoints.auth import get_current_user
 from app.services import storage
+from app.services.storage import async_storage
 from app.services.bigquery_service import BigQueryService
 
 router = APIRouter()
@@ -50,7 +51,7 @@ async def update_user_me(
     
     if file:
         # Upload image to GCS or Local
-        public_url = storage.save_image(
+        public_url = await async_storage.save_image(
             file.file, 
             file.filename, 
             file.content_type, 
@@ -67,7 +68,7 @@ async def update_user_me(
     # Prepare response with signed URL
     user_response = schemas.UserResponse.from_orm(current_user)
     if user_response.profile_image_url and user_response.profile_image_url.startswith("gs://"):
-        user_response.profile_image_url = storage.generate_signed_url(user_response.profile_image_url)
+        user_response.profile_image_url = await async_storage.generate_signed_url(user_response.profile_image_url)
         
     return user_response
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -16,3 +16,58 @@ class User(Base):
     hobbies = Column(String, nullable=True)
     profile_image_url = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, index=True)  # UUID
+    kind = Column(String, index=True)  # itinerary, image, video
+    status = Column(String, index=True, default="queued")  # queued, running, succeeded, failed
+    payload = Column(Text)  # JSON
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(Text, nullable=True)
+    progress = Column(Integer, default=0)  # 0-100
+    progress_message = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class MediaCacheEntry(Base):
+    __tablename__ = "media_cache"
+
+    key = Column(String, primary_key=True, index=True)  # sha256 of the generation inputs
+    kind = Column(String, index=True)  # image, video
+    model = Column(String)
+    gs_uri = Column(String)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+
+class PlanTeaser(Base):
+    __tablename__ = "plan_teasers"
+
+    plan_id = Column(String, primary_key=True, index=True)  # PlanShare.plan_id (BigQuery)
+    status = Column(String, index=True, default="running")  # running, succeeded, failed
+    gs_uri = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    like_count = Column(Integer, default=0)  # like_count when selected
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class PlanTeaserAttempt(Base):
+    __tablename__ = "plan_teaser_attempts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(String, index=True)  # PlanTeaser.plan_id
+    started_at = Column(DateTime(timezone=True), index=True)  # counted against the daily budget
+
+class LookupCacheEntry(Base):
+    __tablename__ = "lookup_cache"
+
+    namespace = Column(String, primary_key=True)  # e.g. place_photo
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=True)  # JSON, null for negative results
+    expires_at = Column(DateTime(timezone=True), index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
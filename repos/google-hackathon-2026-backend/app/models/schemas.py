@@ -89,7 +89,7 @@ class Souvenir(BaseModel):
 class ItineraryResponse(BaseModel):
     proposalId: Union[str, int]
     days: List[ItineraryDay]
-    souvenirs: List[Souvenir]
+    souvenirs: List[Souvenir] = []  # May be missing when the model output was cut off
 
 class BrushUpRequest(BaseModel):
     proposalId: Union[str, int]
@@ -150,6 +150,7 @@ class SocialPlanDetail(SocialPlan):
     itinerary: List[Any]
     souvenirs: List[Souvenir] = []
     comments: List[Any] = []
+    teaser_video_url: Optional[str] = None
 
 class CommentRequest(BaseModel):
     content: str
@@ -172,3 +173,25 @@ class ReportRequest(BaseModel):
 class ReportResponse(BaseModel):
     status: str
     ai_analysis: str
+
+# --- Job API Models ---
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str  # queued, running, succeeded, failed
+    progress: int = 0
+    progress_message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: Any = None
+    started_at: Any = None
+    finished_at: Any = None
+    queue_wait_seconds: Optional[float] = None
+    run_seconds: Optional[float] = None
@@ -1,5 +1,5 @@
-from .proposal import get_proposal_agent_instruction
-from .itinerary import get_itinerary_agent_instruction
-from .brushup import get_brushup_agent_instruction
+from .proposal import get_proposal_agent_instruction, get_proposal_agent_context, PROPOSAL_AGENT_STATIC_INSTRUCTION
+from .itinerary import get_itinerary_agent_instruction, get_itinerary_agent_context, ITINERARY_AGENT_STATIC_INSTRUCTION
+from .brushup import get_brushup_agent_instruction, get_brushup_agent_context, BRUSHUP_AGENT_STATIC_INSTRUCTION
 from .video import get_video_generation_prompt
 from .image import get_image_generation_prompt
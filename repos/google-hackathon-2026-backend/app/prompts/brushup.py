@@ -1,28 +1,37 @@
-def get_brushup_agent_instruction(current_itinerary: dict, request: str, history: list[str]) -> str:
-    # Format history for prompt
-    history_text = "\n".join([f"- {h}" for h in history]) if history else "なし"
-
-    return f"""
+# Static part of the instruction. Keep it free of request-specific values; the
+# request-specific context is appended after it.
+BRUSHUP_AGENT_STATIC_INSTRUCTION = """
     【役割】
     あなたは熟練したAIトラベルコンシェルジュです。
     ユーザーから提供された「現在の旅行プラン」に対し、「ユーザーの要望」と「過去の会話履歴」を踏まえて、プランを修正・ブラッシュアップすることが目標です。
 
-    【現在の旅行プラン】
-    {current_itinerary}
-
-    【ユーザーの要望】
-    {request}
-
-    【会話履歴】
-    {history_text}
-
     【制約事項】
     - 出力は必ず有効なJSONオブジェクトでなければなりません。
     - 「現在の旅行プラン」のJSON構造（days, souvenirsなど）を維持してください。
     - ユーザーの要望に応じて、時間、活動内容、場所、説明文などを適切に変更してください。
     - もし要望がプラン全体に関わる場合（例：「もっとゆったりしたい」）、全体的にスケジュールを調整してください。
     - ユーザーの要望が具体的でない場合（例：「いい感じにして」）、文脈から推測して最適な改善を行ってください。
-    - 各スケジュール項目の `location` フィールドは、必ず `{{ "lat": 数字, "lng": 数字 }}` の形式（オブジェクト）を維持してください。文字列にしないでください。
+    - 各スケジュール項目の `location` フィールドは、必ず `{ "lat": 数字, "lng": 数字 }` の形式（オブジェクト）を維持してください。文字列にしないでください。
     - レスポンスには修正後のJSONオブジェクトのみを含めてください。マークダウン記法は不要です。
     - 日数や宿泊数の変更は行わないでください（itemsのみ変更）。
     """
+
+
+def get_brushup_agent_context(current_itinerary: dict, request: str, history: list[str]) -> str:
+    # Format history for prompt
+    history_text = "\n".join([f"- {h}" for h in history]) if history else "なし"
+
+    return f"""
+    【現在の旅行プラン】
+    {current_itinerary}
+
+    【ユーザーの要望】
+    {request}
+
+    【会話履歴】
+    {history_text}
+    """
+
+
+def get_brushup_agent_instruction(current_itinerary: dict, request: str, history: list[str]) -> str:
+    return BRUSHUP_AGENT_STATIC_INSTRUCTION + get_brushup_agent_context(current_itinerary, request, history)
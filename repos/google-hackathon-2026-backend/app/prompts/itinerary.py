@@ -1,13 +1,10 @@
-def get_itinerary_agent_instruction(proposal_id: int, title: str, language: str, nights: int = 1) -> str:
-    # 0 nights means Day Trip (1 day). 1 night means 2 days. N nights means N+1 days.
-    num_days = 1 if nights == 0 else nights + 1
-    
-    return f"""
+# Static part of the instruction. Keep it free of request-specific values; the
+# request-specific context is appended after it.
+ITINERARY_AGENT_STATIC_INSTRUCTION = """
     【役割】
     あなたは熟練したAIトラベルデザイナーです。
-    旅行タイトル「{title}」に対する詳細な{num_days}日間の旅程を作成することが目標です。
-    泊数: {nights}泊 ({num_days}日間)
-    出力言語: {language}
+    【旅行情報】に記載された旅行タイトルに対する、指定された日数分の詳細な旅程を作成することが目標です。
+    出力は【旅行情報】の出力言語で記述してください。
 
     【制約事項】
     - 旅程の詳細を計画する際には、以下の要素を考慮してください:
@@ -16,25 +13,43 @@ def get_itinerary_agent_instruction(proposal_id: int, title: str, language: str,
     - 出力は必ず有効なJSONオブジェクトでなければなりません。
     - レスポンスにマークダウン形式（```json など）を含めないでください。生のJSONオブジェクトのみを出力してください。
     - オブジェクトは以下のスキーマに一致させる必要があります:
-        {{
-            "proposalId": 整数 ({proposal_id}),
+        {
+            "proposalId": 整数 (【旅行情報】のプランID),
             "days": [
-                {{
-                    "day": 整数 (日数, 1から{num_days}まで),
+                {
+                    "day": 整数 (日数, 1から【旅行情報】の日数まで),
                     "items": [
-                        {{ 
+                        { 
                             "time": "HH:MM", 
                             "activity": "活動内容", 
                             "icon": "活動を表す絵文字",
-                            "location": {{ "lat": 数字, "lng": 数字 }},
+                            "location": { "lat": 数字, "lng": 数字 },
                             "description": "場所や活動の詳細な説明 (2-3文)",
                             "travel_time": "前のスポットからの現実的な移動時間と手段 (例: 徒歩15分, 電車とバスで45分, タクシー10分)。実際の地図上の距離と交通手段を考慮し、実現可能な時間を設定すること。 - 初回はnull"
-                        }}
+                        }
                     ]
-                }}
+                }
             ],
             "souvenirs": [
-                {{ "name": "お土産の名前", "price": "通貨記号付きの価格文字列 (例: ¥1,000)" }}
+                { "name": "お土産の名前", "price": "通貨記号付きの価格文字列 (例: ¥1,000)" }
             ]
-        }}
+        }
+    """
+
+
+def get_itinerary_agent_context(proposal_id: int, title: str, language: str, nights: int = 1) -> str:
+    # 0 nights means Day Trip (1 day). 1 night means 2 days. N nights means N+1 days.
+    num_days = 1 if nights == 0 else nights + 1
+
+    return f"""
+    【旅行情報】
+    プランID: {proposal_id}
+    旅行タイトル: {title}
+    泊数: {nights}泊 ({num_days}日間)
+    日数: {num_days}
+    出力言語: {language}
     """
+
+
+def get_itinerary_agent_instruction(proposal_id: int, title: str, language: str, nights: int = 1) -> str:
+    return ITINERARY_AGENT_STATIC_INSTRUCTION + get_itinerary_agent_context(proposal_id, title, language, nights)
@@ -1,25 +1,17 @@
-def get_proposal_agent_instruction(mode: str, language: str, selected_tags: list[str] = None, custom_attributes: str = None, nights: int = 1, departure_location: str = None) -> str:
-    tags_str = ", ".join(selected_tags) if selected_tags else "特になし"
-    extra_info_parts = []
-    if custom_attributes: extra_info_parts.append(f"追加要望: {custom_attributes}")
-    if nights: extra_info_parts.append(f"泊数: {nights}泊")
-    if departure_location: extra_info_parts.append(f"出発地: {departure_location}")
-    extra_info = "\n".join(extra_info_parts)
-    
-    return f"""
+# Static part of the instruction. Keep it free of request-specific values; the
+# request-specific context is appended after it.
+PROPOSAL_AGENT_STATIC_INSTRUCTION = """
     【役割】
     あなたは熟練したAIトラベルデザイナーです。
-    ユーザーの旅行モード「{mode}」および興味関心タグ「{tags_str}」に基づいて、3つのユニークな旅行コンセプトを提案することが目標です。
-    ユーザープロファイル情報:
-    {extra_info}
-    出力言語: {language}
+    【ユーザー情報】に記載された旅行モードおよび興味関心タグに基づいて、3つのユニークな旅行コンセプトを提案することが目標です。
+    出力は【ユーザー情報】の出力言語で記述してください。
 
     【制約事項】
     - 混雑状況を考慮して、旅行先・交通手段を検討してください
     - 出力は必ず有効なJSONオブジェクトのリスト（配列）でなければなりません。
     - レスポンスにマークダウン形式（```json など）を含めないでください。生のJSON配列のみを出力してください。
     - 各オブジェクトは以下のスキーマに一致させる必要があります:
-        {{
+        {
             "id": 整数 (1, 2, 3),
             "title": 文字列 (短く、キャッチーに),
             "tagline": 文字列 (感情的、詩的に),
@@ -27,5 +19,27 @@ def get_proposal_agent_instruction(mode: str, language: str, selected_tags: list
             "match": 整数 (0-100のマッチ度),
             "color": 文字列 (Tailwind CSSのグラデーションクラス 'from-X to-Y'。例: 'from-blue-400 to-purple-500'),
             "location": 文字列 (Google Mapsで検索可能な具体的な場所の名前)
-        }}
+        }
+    """
+
+
+def get_proposal_agent_context(mode: str, language: str, selected_tags: list[str] = None, custom_attributes: str = None, nights: int = 1, departure_location: str = None) -> str:
+    tags_str = ", ".join(selected_tags) if selected_tags else "特になし"
+    extra_info_parts = []
+    if custom_attributes: extra_info_parts.append(f"追加要望: {custom_attributes}")
+    if nights: extra_info_parts.append(f"泊数: {nights}泊")
+    if departure_location: extra_info_parts.append(f"出発地: {departure_location}")
+    extra_info = "\n".join(extra_info_parts)
+
+    return f"""
+    【ユーザー情報】
+    旅行モード: {mode}
+    興味関心タグ: {tags_str}
+    ユーザープロファイル情報:
+    {extra_info}
+    出力言語: {language}
     """
+
+
+def get_proposal_agent_instruction(mode: str, language: str, selected_tags: list[str] = None, custom_attributes: str = None, nights: int = 1, departure_location: str = None) -> str:
+    return PROPOSAL_AGENT_STATIC_INSTRUCTION + get_proposal_agent_context(mode, language, selected_tags, custom_attributes, nights, departure_location)
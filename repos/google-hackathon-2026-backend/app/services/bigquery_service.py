@@ -241,6 +241,65 @@ class BigQueryService:
             
         return results
 
+    def get_trending_plans(self, limit: int = 10, recent_days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Returns recently shared plans ranked by likes, decayed by age
+        (score = (like_count + 1) / (age_days + 2) ^ 1.5).
+        Blocking; call it from a worker thread.
+        """
+        table_id = self._get_table_id("PlanShare")
+
+        sql = f"""
+            SELECT plan_id, title, description, like_count, created_at
+            FROM `{table_id}`
+            WHERE created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @recent_days DAY)
+            ORDER BY (IFNULL(like_count, 0) + 1) / POW(TIMESTAMP_DIFF(CURRENT_TIMESTAMP(), created_at, HOUR) / 24 + 2, 1.5) DESC
+            LIMIT @limit
+        """
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("recent_days", "INT64", recent_days),
+            bigquery.ScalarQueryParameter("limit", "INT64", limit),
+        ])
+        query_job = self.client.query(sql, job_config=job_config)
+
+        return [
+            {
+                "plan_id": row.plan_id,
+                "title": row.title,
+                "description": row.description,
+                "like_count": row.like_count or 0,
+                "created_at": row.created_at,
+            }
+            for row in query_job
+        ]
+
+    def export_video_assets(self) -> List[Dict[str, Any]]:
+        """
+        Returns every VideoAssets row for the local video index, with the location as lat/lng.
+        Blocking (runs the query and reads all rows); call it from a worker thread.
+        """
+        table_id = self._get_table_id("VideoAssets")
+
+        sql = f"""
+            SELECT video_id, platform, video_url, poi_name, keywords,
+                   ST_Y(location) AS lat, ST_X(location) AS lng
+            FROM `{table_id}`
+        """
+        query_job = self.client.query(sql)
+
+        return [
+            {
+                "video_id": row.video_id,
+                "platform": row.platform,
+                "video_url": row.video_url,
+                "poi_name": row.poi_name,
+                "keywords": list(row.keywords or []),
+                "lat": row.lat,
+                "lng": row.lng,
+            }
+            for row in query_job
+        ]
+
     async def get_plan(self, plan_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieves a single plan by ID.
@@ -0,0 +1,231 @@
+import datetime
+import json
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from app.database import SessionLocal
+from app.models.models import LookupCacheEntry
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+# Upper bound on persistence ops applied in one transaction
+WRITE_BATCH_SIZE = 500
+
+
+class _WriteBehind:
+    """
+    Single background thread that applies lookup_cache persistence (loads, upserts,
+    deletes) so SQLite never runs on the caller's thread. Queued writes are drained
+    in batches with one commit per batch.
+    """
+    def __init__(self):
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+        self._stats = {"batches": 0, "writes": 0, "deletes": 0, "errors": 0}
+
+    def submit(self, op: tuple):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="lookup-cache-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put(op)
+
+    def _run(self):
+        while True:
+            ops = [self._queue.get()]
+            while len(ops) < WRITE_BATCH_SIZE:
+                try:
+                    ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply(ops)
+            finally:
+                for _ in ops:
+                    self._queue.task_done()
+
+    def _apply(self, ops: list[tuple]):
+        writes = []
+        for op in ops:
+            if op[0] == "load":
+                op[1]._load()
+            else:
+                writes.append(op)
+        if not writes:
+            return
+
+        db = SessionLocal()
+        try:
+            now = datetime.datetime.utcnow()
+            for kind, namespace, *args in writes:
+                if kind == "write":
+                    key, value, expires_at = args
+                    db.merge(LookupCacheEntry(
+                        namespace=namespace,
+                        key=key,
+                        value=json.dumps(value, ensure_ascii=False) if value is not None else None,
+                        expires_at=datetime.datetime.utcfromtimestamp(expires_at),
+                        updated_at=now,
+                    ))
+                    self._stats["writes"] += 1
+                else:
+                    db.query(LookupCacheEntry).filter(LookupCacheEntry.namespace == namespace, LookupCacheEntry.key.in_(args[0])).delete(synchronize_session=False)
+                    self._stats["deletes"] += len(args[0])
+            db.commit()
+            self._stats["batches"] += 1
+        except Exception as e:
+            db.rollback()
+            self._stats["errors"] += 1
+            logger.warning(f"Failed to persist {len(writes)} lookup cache ops: {e}")
+        finally:
+            db.close()
+
+    def flush(self):
+        """Blocks until every queued op has been applied (shutdown, tests)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": self._queue.qsize()}
+
+
+persist_writer = _WriteBehind()
+
+
+class LRUTTLCache:
+    """
+    Bounded in-memory LRU cache with separate TTLs for positive and negative (None) results.
+
+    With `persist=True` entries are written behind to the SQLite `lookup_cache` table
+    under `namespace` so warm entries survive restarts. Call load() at startup to read
+    them back before serving; otherwise they are loaded in the background on first use.
+    get/set only touch memory. Values must be JSON-serializable when persisted.
+    """
+    def __init__(self, namespace: str, max_entries: int, ttl_seconds: float, negative_ttl_seconds: float, persist: bool = True):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.persist = persist
+
+        self._entries: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()  # key -> (value, expires_at epoch)
+        self._lock = threading.Lock()
+        self._load_requested = not persist
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expirations": 0, "evictions": 0, "loaded": 0}
+
+    # --- Persistence (runs on the write-behind thread, or at startup via load()) ---
+
+    def _request_load(self):
+        if not self._load_requested:
+            self._load_requested = True
+            persist_writer.submit(("load", self))
+
+    def load(self):
+        """Loads the persisted entries now, on the calling thread (blocking)."""
+        if self.persist:
+            self._load_requested = True
+            self._load()
+
+    def _load(self):
+        """
+        Loads the most recently updated unexpired entries of this namespace. Entries
+        set in memory since startup are newer and are kept.
+        """
+        db = SessionLocal()
+        try:
+            now = datetime.datetime.utcnow()
+            db.query(LookupCacheEntry).filter(LookupCacheEntry.namespace == self.namespace, LookupCacheEntry.expires_at <= now).delete(synchronize_session=False)
+            db.commit()
+            rows = (
+                db.query(LookupCacheEntry)
+                .filter(LookupCacheEntry.namespace == self.namespace)
+                .order_by(LookupCacheEntry.updated_at.desc())
+                .limit(self.max_entries)
+                .all()
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load {self.namespace} cache: {e}")
+            return
+        finally:
+            db.close()
+
+        epoch_offset = time.time() - datetime.datetime.utcnow().timestamp()
+        loaded = 0
+        with self._lock:
+            # Loaded entries go to the LRU end, behind everything used since startup
+            for row in rows:
+                if row.key in self._entries:
+                    continue
+                value = json.loads(row.value) if row.value is not None else None
+                self._entries[row.key] = (value, row.expires_at.timestamp() + epoch_offset)
+                self._entries.move_to_end(row.key, last=False)
+                loaded += 1
+                if len(self._entries) >= self.max_entries:
+                    break
+            self._stats["loaded"] = loaded
+        logger.info(f"Loaded {loaded} entries into {self.namespace} cache")
+
+    # --- Access ---
+
+    def get(self, key: str, default: Any = MISSING) -> Any:
+        """
+        Returns the cached value (None for a cached negative result), or `default` on a miss.
+        """
+        self._request_load()
+
+        expired = False
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[1] <= time.time():
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                item = None
+                expired = True
+            if item is None:
+                self._stats["misses"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats["hits" if item[0] is not None else "negative_hits"] += 1
+
+        if expired and self.persist:
+            persist_writer.submit(("delete", self.namespace, [key]))
+        return default if item is None else item[0]
+
+    def set(self, key: str, value: Any):
+        """
+        Caches value; None is cached as a negative result with the negative TTL.
+        """
+        self._request_load()
+
+        ttl = self.ttl_seconds if value is not None else self.negative_ttl_seconds
+        expires_at = time.time() + ttl
+        evicted = []
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                evicted.append(evicted_key)
+            self._stats["evictions"] += len(evicted)
+
+        if self.persist:
+            persist_writer.submit(("write", self.namespace, key, value, expires_at))
+            if evicted:
+                persist_writer.submit(("delete", self.namespace, evicted))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["negative_hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round((self._stats["hits"] + self._stats["negative_hits"]) / lookups, 3) if lookups else None,
+        }
@@ -1,54 +1,136 @@
+import asyncio
 import os
+import re
+import threading
+import unicodedata
 from google.cloud import discoveryengine_v1 as discoveryengine
 from typing import List
 import logging
 
+from app.services.cache import LRUTTLCache, MISSING
+from app.services.hedging import HedgePolicy
+from app.services.singleflight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
+# Opt-in: a second search is sent when the first is slower than the observed p95.
+# The losing call cannot be cancelled (it runs in a worker thread) and simply finishes unused.
+search_hedge = HedgePolicy(
+    "discovery_engine_search",
+    enabled=os.getenv("DISCOVERY_ENGINE_HEDGING_ENABLED", "false").lower() == "true",
+    percentile=float(os.getenv("DISCOVERY_ENGINE_HEDGE_PERCENTILE", "0.95")),
+    default_delay=float(os.getenv("DISCOVERY_ENGINE_HEDGE_DEFAULT_DELAY_SECONDS", "1.5")),
+)
+
+# Normalized query -> video URLs ([] when nothing matched). In memory only, so
+# changes to the data store show up after a restart at the latest.
+search_cache = LRUTTLCache(
+    "discovery_engine_search",
+    max_entries=int(os.getenv("DISCOVERY_ENGINE_CACHE_MAX_ENTRIES", "2000")),
+    ttl_seconds=float(os.getenv("DISCOVERY_ENGINE_CACHE_TTL_MINUTES", "60")) * 60,
+    negative_ttl_seconds=float(os.getenv("DISCOVERY_ENGINE_CACHE_NEGATIVE_TTL_MINUTES", "5")) * 60,
+    persist=False,
+)
+search_flight = SingleFlight("discovery_engine_search")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """NFKC, lower case and collapsed whitespace, so trivially different queries share a cache entry."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
 class DiscoveryEngineService:
+    """
+    Vertex AI Search over the video data store. Use the process-wide
+    `discovery_engine_service` instance; the gRPC client is created once on first use.
+    """
     def __init__(self):
         self.project_id = os.getenv("GCP_PROJECT_ID")
         if not self.project_id:
             logger.warning("GCP_PROJECT_ID is not set.")
-            
+
         self.location = "global"  # Discovery Engine often uses 'global'
-        
+
         self.data_store_id = os.getenv("DATA_STORE_ID")
         if not self.data_store_id:
             logger.warning("DATA_STORE_ID is not set.")
-        self.client = discoveryengine.SearchServiceClient()
+        self._client: discoveryengine.SearchServiceClient | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> discoveryengine.SearchServiceClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = discoveryengine.SearchServiceClient()
+                    logger.info("Created shared Discovery Engine client")
+        return self._client
+
+    def startup(self):
+        """
+        Creates the client up front so the first request does not pay for channel setup.
+        """
+        try:
+            self.client
+        except Exception as e:
+            logger.warning(f"Failed to create Discovery Engine client at startup: {e}")
+
+    def shutdown(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.transport.close()
+                logger.info("Closed shared Discovery Engine client")
+            except Exception as e:
+                logger.warning(f"Failed to close Discovery Engine client: {e}")
 
     async def search_video_urls(self, query: str, page_size: int = 5) -> List[str]:
         """
         Searches the data store for video URLs matching the query.
+        Results are cached per normalized query, and concurrent identical searches share
+        one call. Returns [] on failure (failures are not cached).
         """
+        key = f"{page_size}:{normalize_query(query)}"
+        cached = search_cache.get(key)
+        if cached is not MISSING:
+            return list(cached or [])
+
         try:
-            serving_config = self.client.serving_config_path(
-                project=self.project_id,
-                location=self.location,
-                data_store=self.data_store_id,
-                serving_config="default_config",
-            )
-
-            request = discoveryengine.SearchRequest(
-                serving_config=serving_config,
-                query=query,
-                page_size=page_size,
-            )
-
-            # Execution is generic, but the client is usually thread-safe.
-            # For better performance in FastAPI, we could run this in a threadpool.
-            import asyncio
-            response = await asyncio.to_thread(self.client.search, request)
-
-            video_urls = []
-            for result in response.results:
-                struct_data = result.document.struct_data
-                if struct_data and "video_url" in struct_data:
-                    video_urls.append(struct_data["video_url"])
-            
-            logger.info(f"Discovery Engine search for '{query}' returned {len(video_urls)} URLs.")
-            return video_urls
+            video_urls = await search_flight.do(key, lambda: self._search(query, page_size))
         except Exception as e:
             logger.error(f"Discovery Engine search failed: {e}")
             return []
+        search_cache.set(key, video_urls or None)
+        return list(video_urls)
+
+    async def _search(self, query: str, page_size: int) -> List[str]:
+        serving_config = self.client.serving_config_path(
+            project=self.project_id,
+            location=self.location,
+            data_store=self.data_store_id,
+            serving_config="default_config",
+        )
+
+        request = discoveryengine.SearchRequest(
+            serving_config=serving_config,
+            query=query,
+            page_size=page_size,
+        )
+
+        # The client is thread-safe; the blocking call runs in the default thread pool.
+        response = await search_hedge.run(lambda candidate: asyncio.to_thread(self.client.search, request))
+
+        video_urls = []
+        for result in response.results:
+            struct_data = result.document.struct_data
+            if struct_data and "video_url" in struct_data:
+                video_urls.append(struct_data["video_url"])
+
+        logger.info(f"Discovery Engine search for '{query}' returned {len(video_urls)} URLs.")
+        return video_urls
+
+
+discovery_engine_service = DiscoveryEngineService()
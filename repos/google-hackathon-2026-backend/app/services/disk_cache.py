@@ -0,0 +1,126 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class DiskByteCache:
+    """
+    Size-capped byte store on local disk, addressed by the SHA-256 of the key.
+
+    Files are written atomically (temp file + rename). get() reads a whole file;
+    get_path() lets callers stream it instead. The in-memory index is rebuilt from
+    the directory on first use, ordered by mtime, and the least recently used files
+    are deleted once the total exceeds max_bytes.
+    All methods are blocking; call them from a thread when on the event loop.
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # digest -> size, LRU first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._scanned = False
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def digest(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def _scan(self):
+        with self._lock:
+            if self._scanned:
+                return
+            self._scanned = True
+            entries = []
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    if name.startswith(".tmp"):
+                        # Leftover from an interrupted write
+                        os.unlink(path)
+                        continue
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, name, stat.st_size))
+            for _, name, size in sorted(entries):
+                self._index[name] = size
+                self._total_bytes += size
+        if entries:
+            logger.info(f"Disk cache {self.directory}: {len(entries)} files, {self._total_bytes} bytes")
+
+    def get_path(self, key: str) -> str | None:
+        """
+        Returns the path of the cached file for key (marking it recently used), or None.
+        """
+        self._scan()
+        digest = self.digest(key)
+        with self._lock:
+            if digest not in self._index:
+                self._stats["misses"] += 1
+                return None
+            self._index.move_to_end(digest)
+            self._stats["hits"] += 1
+        path = self.path_for(digest)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total_bytes -= self._index.pop(digest, 0)
+            return None
+        return path
+
+    def get(self, key: str) -> bytes | None:
+        path = self.get_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError as e:
+            logger.warning(f"Disk cache read failed for {path}: {e}")
+            return None
+
+    def put(self, key: str, data: bytes):
+        self._scan()
+        digest = self.digest(key)
+        path = self.path_for(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Disk cache write failed for {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        evicted = []
+        with self._lock:
+            self._total_bytes -= self._index.pop(digest, 0)
+            self._index[digest] = len(data)
+            self._total_bytes += len(data)
+            self._stats["writes"] += 1
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                old_digest, size = self._index.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_digest)
+            self._stats["evictions"] += len(evicted)
+
+        for old_digest in evicted:
+            try:
+                os.unlink(self.path_for(old_digest))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "files": len(self._index), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
@@ -0,0 +1,68 @@
+import logging
+import os
+import threading
+
+from google import genai
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Process-wide genai clients, keyed by location. Building a client resolves credentials
+# and creates new HTTP connection pools, so services share these instead.
+_clients: dict[str, genai.Client] = {}
+_lock = threading.Lock()
+
+
+def _build_client(location: str | None) -> genai.Client:
+    timeout_ms = int(os.getenv("GENAI_HTTP_TIMEOUT_MS", "600000"))
+    kwargs = {"vertexai": True, "http_options": types.HttpOptions(timeout=timeout_ms)}
+    if location:
+        kwargs["location"] = location
+    return genai.Client(**kwargs)
+
+
+def get_genai_client(location: str | None = None) -> genai.Client:
+    """
+    Returns the shared Vertex AI genai client (created on first use if startup() was not called).
+    """
+    key = location or "default"
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _build_client(location)
+                _clients[key] = client
+                logger.info(f"Created shared genai client ({key})")
+    return client
+
+
+def startup():
+    """
+    Creates the default client up front so the first request does not pay for it.
+    """
+    try:
+        get_genai_client()
+    except Exception as e:
+        logger.warning(f"Failed to create genai client at startup: {e}")
+
+
+async def shutdown():
+    """
+    Closes the HTTP connections of all shared clients.
+    """
+    with _lock:
+        clients = list(_clients.items())
+        _clients.clear()
+
+    for key, client in clients:
+        try:
+            aclose = getattr(client.aio, "aclose", None)
+            if aclose:
+                await aclose()
+            close = getattr(client, "close", None)
+            if close:
+                close()
+            logger.info(f"Closed shared genai client ({key})")
+        except Exception as e:
+            logger.warning(f"Failed to close genai client ({key}): {e}")
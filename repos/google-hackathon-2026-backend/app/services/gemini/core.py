@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Callable
 
 # Import new services
 from app.services.gemini.plan_design_service import PlanDesignService
@@ -31,11 +31,14 @@ class GeminiService:
     async def generate_travel_images(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> List[str]:
         return await self.image_service.generate_travel_images(destination, description, user_image_url, user_id)
 
+    def iter_travel_images(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> AsyncIterator[Dict[str, Any]]:
+        return self.image_service.iter_travel_images(destination, description, user_image_url, user_id)
+
     async def generate_travel_image(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> str:
         return await self.image_service.generate_travel_image(destination, description, user_image_url, user_id)
 
-    async def generate_travel_video(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> str:
-        return await self.video_service.generate_travel_video(destination, description, user_image_url, user_id)
+    async def generate_travel_video(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None, on_progress: Callable[[float], None] = None) -> str:
+        return await self.video_service.generate_travel_video(destination, description, user_image_url, user_id, on_progress=on_progress)
 
     async def _get_place_photo_bytes(self, destination: str) -> bytes | None:
         """
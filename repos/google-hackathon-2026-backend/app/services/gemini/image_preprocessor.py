@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps
+
+from app.services.storage import async_storage as storage
+
+logger = logging.getLogger(__name__)
+
+# Longest side worth sending to each model. Larger inputs are downscaled by the
+# model anyway, so the extra pixels only cost upload time.
+GEMINI_IMAGE_MAX_SIDE = int(os.getenv("GEMINI_IMAGE_MAX_SIDE", "1024"))
+VEO_IMAGE_MAX_SIDE = int(os.getenv("VEO_IMAGE_MAX_SIDE", "1280"))
+JPEG_QUALITY = int(os.getenv("IMAGE_PREPROCESS_JPEG_QUALITY", "85"))
+CACHE_MAX_BYTES = int(os.getenv("IMAGE_PREPROCESS_CACHE_MB", "64")) * 1024 * 1024
+
+# (kind, source key, max_side) -> (bytes, mime_type); bounded by total bytes
+_cache: "OrderedDict[tuple, tuple[bytes, str]]" = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+_stats = {"processed": 0, "failures": 0, "cache_hits": 0, "bytes_in": 0, "bytes_out": 0}
+
+
+def sniff_image_mime(data: bytes, default: str = "image/jpeg") -> str:
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return "image/png"
+    if data.startswith(b'\xff\xd8'):
+        return "image/jpeg"
+    if data.startswith(b'RIFF') and data[8:12] == b'WEBP':
+        return "image/webp"
+    return default
+
+
+def _cache_get(key: tuple) -> tuple[bytes, str] | None:
+    with _cache_lock:
+        value = _cache.get(key)
+        if value is not None:
+            _cache.move_to_end(key)
+            _stats["cache_hits"] += 1
+        return value
+
+
+def _cache_put(key: tuple, value: tuple[bytes, str]):
+    global _cache_bytes
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = value
+        _cache_bytes += len(value[0])
+        while _cache_bytes > CACHE_MAX_BYTES and _cache:
+            _, (evicted, _) = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+def _process(data: bytes, max_side: int) -> tuple[bytes, str]:
+    """
+    Decodes once, applies EXIF orientation, downsizes to max_side and re-encodes as
+    JPEG without metadata. Returns the original bytes if they cannot be decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # Let the JPEG decoder skip detail we would throw away anyway
+            img.draft("RGB", (max_side, max_side))
+            img = ImageOps.exif_transpose(img)
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            processed = out.getvalue()
+    except Exception as e:
+        logger.warning(f"Image preprocessing failed, sending original: {e}")
+        _stats["failures"] += 1
+        return data, sniff_image_mime(data)
+
+    _stats["processed"] += 1
+    _stats["bytes_in"] += len(data)
+    _stats["bytes_out"] += len(processed)
+    logger.info(f"Preprocessed image: {len(data)} -> {len(processed)} bytes (max side {max_side}px)")
+    return processed, "image/jpeg"
+
+
+async def preprocess_image(data: bytes, max_side: int = GEMINI_IMAGE_MAX_SIDE) -> tuple[bytes, str]:
+    """
+    Returns (bytes, mime_type) ready to be sent inline to the model.
+    Results are cached by source digest; decoding runs off the event loop.
+    """
+    key = ("digest", hashlib.sha256(data).hexdigest(), max_side)
+    cached = _cache_get(key)
+    if cached:
+        return cached
+
+    result = await asyncio.to_thread(_process, data, max_side)
+    _cache_put(key, result)
+    return result
+
+
+async def load_user_image(gs_uri: str, max_side: int = GEMINI_IMAGE_MAX_SIDE) -> tuple[bytes, str] | None:
+    """
+    Downloads and preprocesses a user image from GCS.
+    Uploaded objects get unique names and are never overwritten, so the processed
+    result is also cached by URI to skip the download on repeat requests.
+    """
+    key = ("uri", gs_uri, max_side)
+    cached = _cache_get(key)
+    if cached:
+        return cached
+
+    data = await storage.get_file_bytes(gs_uri)
+    if not data:
+        return None
+
+    result = await preprocess_image(data, max_side)
+    _cache_put(key, result)
+    return result
+
+
+def stats() -> dict:
+    with _cache_lock:
+        return {**_stats, "cache_entries": len(_cache), "cache_bytes": _cache_bytes}
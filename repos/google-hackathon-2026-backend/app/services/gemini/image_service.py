@@ -1,18 +1,33 @@
 import os
 import logging
 import traceback
-import httpx
-import io
-from google import genai
+import json
+from app.services.gemini.client_registry import get_genai_client
 from google.genai import types
-from app.services.storage import storage_service as storage
+from app.services.storage import async_storage as storage
+from app.services.storage.media_cache import image_cache, media_cache_key
 import asyncio
 import time
-from app.services.places.places_service import get_place_photo_bytes, get_place_photos_bytes
+from typing import AsyncIterator
+from app.services.places.places_service import get_place_photo_bytes, search_place_photo_names, fetch_place_photo
 from app.prompts.image import get_image_generation_prompt
+from app.services.retry import RetryPolicy, is_retryable_error, retry_after_seconds
+from app.services.gemini.image_preprocessor import preprocess_image, load_user_image, GEMINI_IMAGE_MAX_SIDE
 
 logger = logging.getLogger(__name__)
 
+NUM_TRAVEL_IMAGES = 2
+FALLBACK_IMAGE_URL = "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800"
+IMAGE_MODEL = "gemini-2.5-flash-image"
+
+# Retries share the process-wide retry budget so rate limiting is not amplified under load
+image_retry_policy = RetryPolicy(
+    "image_generation",
+    max_attempts=int(os.getenv("IMAGE_MAX_ATTEMPTS", "6")),
+    base_delay=2.0,
+    max_delay=30.0,
+)
+
 
 class ImageService:
     def __init__(self):
@@ -21,113 +36,151 @@ class ImageService:
         self.is_initialized = bool(self.project_id)
         if not self.is_initialized and not self.use_mock:
              logger.warning("GCP_PROJECT_ID not found. ImageService running in mock mode.")
+        self.request_deadline_seconds = float(os.getenv("IMAGE_REQUEST_DEADLINE_SECONDS", "120"))
 
-    async def generate_travel_image(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None, reference_image_bytes: bytes = None) -> str:
+    async def generate_travel_image(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None, reference_image_bytes: bytes = None, cache_scope: str = None) -> str:
+        """
+        Generates one travel photo and returns a signed URL (the fallback URL on failure).
+        cache_scope identifies the request inputs for the result cache when description is
+        itself generated (e.g. an LLM-extracted theme); it defaults to description.
+        """
         # Optimize log: truncate long strings
         req_desc = description[:50] + "..." if len(description) > 50 else description
         req_user_img = user_image_url[:47] + "..." if user_image_url and len(user_image_url) > 50 else (user_image_url or "None")
         logger.info(f"Generating travel image for Destination: {destination}, Description: {req_desc}, UserImage: {req_user_img}, UserId: {user_id}")
         
         if self.use_mock or not self.is_initialized:
-             return "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800"
+             return FALLBACK_IMAGE_URL
+
+        client = get_genai_client()
+
+        prompt_parts = []
+        sources_used = []
+        
+        # Base prompt
+        prompt_text = f"Generate a high-quality, photorealistic travel photo of the person provided in the user image, visiting {destination}. "
+        prompt_text += f"The background should clearly be {destination}. " 
+        prompt_text += f"Description of the vibe: {description}. "
+        prompt_text += "Cinematic lighting, 4k."
+
+        # 1. Fetch Destination Image from Places API (or use provided)
+        if reference_image_bytes:
+            destination_image_bytes = reference_image_bytes
+            logger.info(f"Using provided reference photo for {destination}")
+            sources_used.append(f"Provided Reference Photo")
+        else:
+            destination_image_bytes = await get_place_photo_bytes(destination)
+            if destination_image_bytes:
+                sources_used.append(f"Places API Image for {destination}")
+            
+        if destination_image_bytes:
+            # Downscale before hashing so the cache key matches what is actually sent
+            destination_image_bytes, destination_mime = await preprocess_image(destination_image_bytes, GEMINI_IMAGE_MAX_SIDE)
+            prompt_text += " Refer to the provided destination image for the background scenery and atmosphere."
+            prompt_parts.append(types.Part.from_bytes(data=destination_image_bytes, mime_type=destination_mime))
+        else:
+            sources_used.append("None (Places API failed or returned no image)")
+            prompt_text += " Ensure the location looks authentic."
 
-        max_retries = 5
-        for attempt in range(max_retries + 1):
+        # 2. Add User Image
+        user_image_ref = None
+        if user_image_url and user_image_url.startswith("gs://"):
+            logger.info(f"Using user profile image from: {req_user_img}")
+            sources_used.append("User Profile Image (GCS)")
+            
+            # Profile uploads can be several MB; send a downscaled copy inline instead of the original
+            user_image = None
             try:
-                client = genai.Client(
-                    vertexai=True
-                )
+                user_image = await load_user_image(user_image_url, GEMINI_IMAGE_MAX_SIDE)
+            except Exception as e:
+                logger.warning(f"Failed to preprocess user image, passing the GCS URI instead: {e}")
 
-                prompt_parts = []
-                sources_used = []
-                
-                # Base prompt
-                prompt_text = f"Generate a high-quality, photorealistic travel photo of the person provided in the user image, visiting {destination}. "
-                prompt_text += f"The background should clearly be {destination}. " 
-                prompt_text += f"Description of the vibe: {description}. "
-                prompt_text += "Cinematic lighting, 4k."
-
-                # 1. Fetch Destination Image from Places API (or use provided)
-                if reference_image_bytes:
-                    destination_image_bytes = reference_image_bytes
-                    logger.info(f"Using provided reference photo for {destination}")
-                    sources_used.append(f"Provided Reference Photo")
-                else:
-                    destination_image_bytes = await get_place_photo_bytes(destination)
-                    if destination_image_bytes:
-                        sources_used.append(f"Places API Image for {destination}")
-                    
-                if destination_image_bytes:
-                    prompt_text += " Refer to the provided destination image for the background scenery and atmosphere."
-                    prompt_parts.append(types.Part.from_bytes(data=destination_image_bytes, mime_type="image/jpeg")) 
-                else:
-                    sources_used.append("None (Places API failed or returned no image)")
-                    prompt_text += " Ensure the location looks authentic."
-
-                # 2. Add User Image
-                if user_image_url and user_image_url.startswith("gs://"):
-                    logger.info(f"Using user profile image from: {req_user_img}")
-                    sources_used.append("User Profile Image (GCS)")
-                    
-                    mime_type = "image/png"
-                    if user_image_url.lower().endswith(".jpg") or user_image_url.lower().endswith(".jpeg"):
-                        mime_type = "image/jpeg"
-                    elif user_image_url.lower().endswith(".webp"):
-                        mime_type = "image/webp"
-
-                    image_part = types.Part.from_uri(
-                        file_uri=user_image_url,
-                        mime_type=mime_type,
-                    )
-                    prompt_parts.append(image_part)
-                    prompt_text += " The person in this image is the traveler. Integrate them naturally into the scene."
-                else:
-                    sources_used.append("None (User image not provided or invalid)")
-                
-                final_parts = [types.Part.from_text(text=prompt_text)] + prompt_parts
-                
-                # Log exact prompt usage
-                logger.info(f"--- Gemini Image Generation Prompt Info ---")
-                logger.info(f"Sources Used: {', '.join(sources_used)}")
-                logger.info(f"Text Prompt: {prompt_text}")
-                logger.info(f"Total Parts Payload: {len(final_parts)} parts (1 text + {len(prompt_parts)} images)")
-                logger.info(f"-------------------------------------------")
-                
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=final_parts
-                    )
-                ]
-                
-                generate_content_config = types.GenerateContentConfig(
-                    temperature = 1,
-                    top_p = 0.95,
-                    max_output_tokens = 32768,
-                    response_modalities = ["TEXT", "IMAGE"],
-                    safety_settings = [types.SafetySetting(
-                        category="HARM_CATEGORY_HATE_SPEECH",
-                        threshold="OFF"
-                    ),types.SafetySetting(
-                        category="HARM_CATEGORY_DANGEROUS_CONTENT",
-                        threshold="OFF"
-                    ),types.SafetySetting(
-                        category="HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                        threshold="OFF"
-                    ),types.SafetySetting(
-                        category="HARM_CATEGORY_HARASSMENT",
-                        threshold="OFF"
-                    )],
-                    image_config=types.ImageConfig(
-                        aspect_ratio="9:16",
-                        image_size="1K", 
-                        output_mime_type="image/png",
-                    ),
+            if user_image:
+                image_part = types.Part.from_bytes(data=user_image[0], mime_type=user_image[1])
+            else:
+                mime_type = "image/png"
+                if user_image_url.lower().endswith(".jpg") or user_image_url.lower().endswith(".jpeg"):
+                    mime_type = "image/jpeg"
+                elif user_image_url.lower().endswith(".webp"):
+                    mime_type = "image/webp"
+
+                image_part = types.Part.from_uri(
+                    file_uri=user_image_url,
+                    mime_type=mime_type,
                 )
+            prompt_parts.append(image_part)
+            prompt_text += " The person in this image is the traveler. Integrate them naturally into the scene."
+            # Uploaded objects get unique names and are never overwritten, so the URI identifies the content
+            user_image_ref = user_image_url
+        else:
+            sources_used.append("None (User image not provided or invalid)")
 
+        # 3. Reuse an identical earlier generation if the cache policy allows it.
+        # Keyed on the caller's inputs (not the sampled theme) and scoped per user, since
+        # outputs are stored under the user's folder.
+        cache_key = media_cache_key(
+            IMAGE_MODEL,
+            destination,
+            cache_scope if cache_scope is not None else description,
+            destination_image_bytes,
+            user_image_ref,
+            f"user:{user_id}" if user_id is not None else None,
+        )
+        cached_uri = await asyncio.to_thread(image_cache.lookup, cache_key)
+        if cached_uri:
+            return await storage.generate_signed_url(cached_uri)
+        
+        final_parts = [types.Part.from_text(text=prompt_text)] + prompt_parts
+        
+        # Log exact prompt usage
+        logger.info(f"--- Gemini Image Generation Prompt Info ---")
+        logger.info(f"Sources Used: {', '.join(sources_used)}")
+        logger.info(f"Text Prompt: {prompt_text}")
+        logger.info(f"Total Parts Payload: {len(final_parts)} parts (1 text + {len(prompt_parts)} images)")
+        logger.info(f"-------------------------------------------")
+        
+        contents = [
+            types.Content(
+                role="user",
+                parts=final_parts
+            )
+        ]
+        
+        generate_content_config = types.GenerateContentConfig(
+            temperature = 1,
+            top_p = 0.95,
+            max_output_tokens = 32768,
+            response_modalities = ["TEXT", "IMAGE"],
+            safety_settings = [types.SafetySetting(
+                category="HARM_CATEGORY_HATE_SPEECH",
+                threshold="OFF"
+            ),types.SafetySetting(
+                category="HARM_CATEGORY_DANGEROUS_CONTENT",
+                threshold="OFF"
+            ),types.SafetySetting(
+                category="HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                threshold="OFF"
+            ),types.SafetySetting(
+                category="HARM_CATEGORY_HARASSMENT",
+                threshold="OFF"
+            )],
+            image_config=types.ImageConfig(
+                aspect_ratio="9:16",
+                image_size="1K", 
+                output_mime_type="image/png",
+            ),
+        )
+
+        # 4. Generate, retrying only the model call
+        max_attempts = image_retry_policy.max_attempts
+        image_retry_policy.budget.record_request()
+        deadline = time.monotonic() + self.request_deadline_seconds
+        for attempt in range(max_attempts):
+            attempt_start = time.monotonic()
+            try:
                 # Use generate_content_stream
                 response_stream = await client.aio.models.generate_content_stream(
-                    model="gemini-2.5-flash-image",
+                    model=IMAGE_MODEL,
                     contents=contents,
                     config=generate_content_config,
                 )
@@ -146,56 +199,53 @@ class ImageService:
                                 break
                         if generated_image_bytes: break
                     if generated_image_bytes: break
+
+                # Successful attempts count too, so the deadline check is not skewed by fast 429s
+                image_retry_policy.record_attempt(time.monotonic() - attempt_start)
                 
                 if generated_image_bytes:
                     # Save to GCS
                     filename = "generated_travel.png"
-                    file_obj = io.BytesIO(generated_image_bytes)
-                    uri = storage.save_image(file_obj, filename, generated_image_mime, user_id=user_id)
+                    uri = await storage.save_image_bytes(generated_image_bytes, filename, generated_image_mime, user_id=user_id)
                     logger.info(f"Saved generated image to: {uri}")
-                    return storage.generate_signed_url(uri)
+                    await asyncio.to_thread(image_cache.store, cache_key, uri, IMAGE_MODEL)
+                    return await storage.generate_signed_url(uri)
                 
-                logger.warning(f"No image data found in Gemini response (Attempt {attempt+1}/{max_retries+1})")
-                if attempt < max_retries:
-                    logger.info("Retrying...")
+                logger.warning(f"No image data found in Gemini response (Attempt {attempt+1}/{max_attempts})")
+                delay = image_retry_policy.next_delay(attempt, deadline)
+                if delay is not None:
+                    logger.info(f"Retrying in {delay:.1f} seconds...")
+                    await asyncio.sleep(delay)
                     continue
-                return "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800"
+                return FALLBACK_IMAGE_URL
 
             except Exception as e:
-                is_resource_exhausted = "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e)
-                if is_resource_exhausted and attempt < max_retries:
-                    logger.warning(f"Image generation rate limited. Waiting 5 seconds before retry... (Attempt {attempt+1}/{max_retries+1})")
-                    await asyncio.sleep(5)
+                image_retry_policy.record_attempt(time.monotonic() - attempt_start)
+                delay = None
+                if is_retryable_error(e):
+                    delay = image_retry_policy.next_delay(attempt, deadline, retry_after_seconds(e))
+                if delay is not None:
+                    logger.warning(f"Image generation failed with retryable error: {e}. Waiting {delay:.1f} seconds before retry... (Attempt {attempt+1}/{max_attempts})")
+                    await asyncio.sleep(delay)
                     continue
                 
                 logger.error(f"Image generation failed: {e}")
                 logger.error(traceback.format_exc())
-                return "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800"
+                return FALLBACK_IMAGE_URL
 
-    async def generate_travel_images(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> list[str]:
+        return FALLBACK_IMAGE_URL
+
+    async def _extract_themes(self, destination: str, description: str) -> list[str]:
         """
-        Generates 2 distinct images based on themes extracted from the description.
+        Asks the LLM for distinct photo themes; falls back to generic themes on any failure.
+        """
+        theme_prompt = f"""
+        Analyze this travel plan description: "{description}" for a trip to {destination}.
+        Extract {NUM_TRAVEL_IMAGES} distinct, visually rich themes or scenes for travel photography that capture different aspects of this trip (e.g., scenery, cultural activity, food, atmosphere).
+        Return ONLY a valid JSON list of {NUM_TRAVEL_IMAGES} strings. Example: ["Peaceful Zen garden with autumn leaves", "Bustling night market with neon lights"]
         """
-        logger.info(f"Generating 2 travel images for {destination}. Description: {description[:50]}...")
-        
-        if self.use_mock or not self.is_initialized:
-            return [
-                "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800",
-                "https://images.unsplash.com/photo-1476514525535-07fb3b4ae5f1",
-                "https://images.unsplash.com/photo-1540959733332-eab4deabeeaf"
-            ]
-
         try:
-            client = genai.Client(vertexai=True)
-
-            # 1. Extract Themes
-            theme_prompt = f"""
-            Analyze this travel plan description: "{description}" for a trip to {destination}.
-            Extract 2 distinct, visually rich themes or scenes for travel photography that capture different aspects of this trip (e.g., scenery, cultural activity, food, atmosphere).
-            Return ONLY a valid JSON list of 2 strings. Example: ["Peaceful Zen garden with autumn leaves", "Bustling night market with neon lights"]
-            """
-            
-            theme_response = await client.aio.models.generate_content(
+            theme_response = await get_genai_client().aio.models.generate_content(
                 model="gemini-3-flash-preview",
                 contents=theme_prompt,
                 config=types.GenerateContentConfig(
@@ -203,47 +253,107 @@ class ImageService:
                     temperature=0.7
                 )
             )
-            
-            import json
-            themes = []
+            themes = json.loads(theme_response.text)
+            if not isinstance(themes, list) or len(themes) == 0:
+                raise ValueError(f"Unexpected themes payload: {themes}")
+        except Exception as e:
+            logger.warning(f"Failed to extract themes, using fallback: {e}")
+            themes = [
+                f"Scenic view of {destination}, {description[:50]}",
+                f"Cultural atmosphere of {destination}",
+                f"Hidden gem in {destination}"
+            ]
+
+        logger.info(f"Extracted themes: {themes}")
+        return [str(theme) for theme in themes]
+
+    async def iter_travel_images(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> AsyncIterator[dict]:
+        """
+        Generates NUM_TRAVEL_IMAGES distinct images based on themes extracted from the description,
+        yielding {"index", "url", "error"} for each image as soon as it finishes.
+        A failed image yields the fallback URL with an error message instead of failing the others.
+
+        Runs as a small dependency graph: theme extraction and the Places photo search
+        start together, each reference photo download starts as soon as the search
+        returns, and image i starts as soon as its theme and photo are ready.
+        """
+        logger.info(f"Generating {NUM_TRAVEL_IMAGES} travel images for {destination}. Description: {description[:50]}...")
+
+        if self.use_mock or not self.is_initialized:
+            mock_urls = [
+                "https://images.unsplash.com/photo-1469854523086-cc02fe5d8800",
+                "https://images.unsplash.com/photo-1476514525535-07fb3b4ae5f1",
+                "https://images.unsplash.com/photo-1540959733332-eab4deabeeaf"
+            ]
+            for i, url in enumerate(mock_urls):
+                yield {"index": i, "url": url, "error": None}
+            return
+
+        timings: dict[str, float] = {}
+        pipeline_start = time.monotonic()
+
+        async def timed(stage: str, coro):
+            stage_start = time.monotonic()
             try:
-                themes = json.loads(theme_response.text)
-                if not isinstance(themes, list) or len(themes) == 0:
-                    logger.warning("Failed to parse themes, using fallback.")
-                    throw_error
-            except Exception:
-                # Fallback themes if parsing fails
-                themes = [
-                    f"Scenic view of {destination}, {description[:50]}",
-                    f"Cultural atmosphere of {destination}",
-                    f"Hidden gem in {destination}"
-                ]
-            
-            logger.info(f"Extracted themes: {themes}")
+                return await coro
+            finally:
+                timings[stage] = round(time.monotonic() - stage_start, 3)
 
-            # 2. Pre-fetch distinct place photos
-            # Fetch up to 3 distinct photos
-            place_photos = await get_place_photos_bytes(destination, limit=3)
-            logger.info(f"Fetched {len(place_photos)} reference photos from Places API")
+        # Independent roots of the graph
+        themes_task = asyncio.create_task(timed("themes", self._extract_themes(destination, description)))
+        photo_names_task = asyncio.create_task(timed("photo_search", search_place_photo_names(destination, limit=NUM_TRAVEL_IMAGES)))
+        photo_tasks: dict[str, asyncio.Task] = {}
 
-            # 3. Generate Images in Parallel
-            # Limit to 2 themes just in case
-            themes = themes[:2]
-            
-            tasks = []
-            for i, theme in enumerate(themes):
-                # Assign a different photo to each task if available, cycling if necessary
-                ref_photo = None
-                if place_photos:
-                    ref_photo = place_photos[i % len(place_photos)]
-                
-                tasks.append(self.generate_travel_image(destination, theme, user_image_url, user_id, reference_image_bytes=ref_photo))
-            
-            image_urls = await asyncio.gather(*tasks)
-            
-            return image_urls
+        async def reference_photo(i: int) -> bytes | None:
+            photo_names = await photo_names_task
+            if not photo_names:
+                return None
+            # Assign a different photo to each image if available, cycling if necessary
+            name = photo_names[i % len(photo_names)]
+            if name not in photo_tasks:
+                photo_tasks[name] = asyncio.create_task(timed(f"photo_{len(photo_tasks)}", fetch_place_photo(name)))
+            return await photo_tasks[name]
 
-        except Exception as e:
-            logger.error(f"Multi-image generation failed: {e}")
-            logger.error(traceback.format_exc())
-            return ["https://images.unsplash.com/photo-1469854523086-cc02fe5d8800"]
+        async def image(i: int) -> dict:
+            try:
+                themes, ref_photo = await asyncio.gather(themes_task, reference_photo(i))
+                theme = themes[i % len(themes)]
+                url = await timed(f"image_{i}", self.generate_travel_image(
+                    destination, theme, user_image_url, user_id,
+                    reference_image_bytes=ref_photo,
+                    # Themes are sampled per request; cache on the original description and slot
+                    cache_scope=f"{description}\0image:{i}",
+                ))
+            except Exception as e:
+                logger.error(f"Image {i} generation failed: {e}")
+                logger.error(traceback.format_exc())
+                return {"index": i, "url": FALLBACK_IMAGE_URL, "error": str(e)}
+            # generate_travel_image reports its own failures by returning the fallback URL
+            error = "Image generation failed" if url == FALLBACK_IMAGE_URL else None
+            return {"index": i, "url": url, "error": error}
+
+        image_tasks = [asyncio.create_task(image(i)) for i in range(NUM_TRAVEL_IMAGES)]
+        try:
+            for next_done in asyncio.as_completed(image_tasks):
+                yield await next_done
+        finally:
+            # The consumer may stop early (e.g. SSE client disconnected)
+            pending = [task for task in [*image_tasks, themes_task, photo_names_task, *photo_tasks.values()] if not task.done()]
+            for task in pending:
+                task.cancel()
+            # Let them finish cancelling so no task is destroyed pending or leaves its exception unretrieved
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        total = time.monotonic() - pipeline_start
+        sequential = timings.get("themes", 0) + timings.get("photo_search", 0) + max(
+            (v for k, v in timings.items() if k.startswith("photo_") and k != "photo_search"), default=0
+        ) + max((v for k, v in timings.items() if k.startswith("image_")), default=0)
+        logger.info(f"Image pipeline stage timings: {timings}, critical path: {total:.2f}s (sequential equivalent: {sequential:.2f}s)")
+
+    async def generate_travel_images(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> list[str]:
+        """
+        Generates all travel images and returns their URLs in order.
+        Each failed image is replaced by the fallback URL individually.
+        """
+        results = [result async for result in self.iter_travel_images(destination, description, user_image_url, user_id)]
+        return [result["url"] for result in sorted(results, key=lambda r: r["index"])]
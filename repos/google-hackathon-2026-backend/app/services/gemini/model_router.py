@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import re
+from collections import deque
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# Model tiers. latency_target_seconds is the SLO for one agent run and is also used
+# as the hedging delay for that tier. Override with AGENT_MODEL_TIERS (same JSON shape).
+DEFAULT_MODEL_TIERS: Dict[str, Dict[str, Any]] = {
+    "fast": {"model": "gemini-2.5-flash-lite", "latency_target_seconds": 6.0},
+    "standard": {"model": "gemini-3-flash-preview", "latency_target_seconds": 15.0},
+    "complex": {"model": "gemini-3-flash-preview", "latency_target_seconds": 30.0},
+}
+
+# Requests scoped to the whole plan rather than one item
+_PLAN_SCOPE_RE = re.compile(r"全体|全日程|全ての日|すべての日|毎日|whole|entire|every day|all days", re.IGNORECASE)
+# Restructuring verbs; only complex together with a multi-day or length signal, since
+# "ランチと観光を入れ替えて" is a one-item edit
+_RESTRUCTURE_RE = re.compile(r"入れ替え|組み直|組み替え|作り直|やり直|restructure|reorganize|rearrange|reshuffle", re.IGNORECASE)
+# Day references ("2日目", "day 3"); a single one scopes an edit to that day
+_DAY_REF_RE = re.compile(r"(\d+|[一二三四五六七八九十]+)\s*日目|day\s*(\d+)", re.IGNORECASE)
+RESTRUCTURE_MIN_LENGTH = 80
+
+LATENCY_WINDOW = 200
+
+
+def is_restructure_request(text: str) -> bool:
+    """
+    True for edits that change the structure of the plan: plan-wide scope, or a
+    restructuring verb spanning several days or with a long request.
+    """
+    if _PLAN_SCOPE_RE.search(text):
+        return True
+    if not _RESTRUCTURE_RE.search(text):
+        return False
+    days = {m.group(1) or m.group(2) for m in _DAY_REF_RE.finditer(text)}
+    return len(days) >= 2 or len(text) > RESTRUCTURE_MIN_LENGTH
+
+
+class ModelRouter:
+    """
+    Picks a model tier per agent run from cheap request heuristics and records
+    observed latency / fallback rates per tier so the tier table can be tuned.
+    """
+    def __init__(self):
+        self.tiers = dict(DEFAULT_MODEL_TIERS)
+        overrides = os.getenv("AGENT_MODEL_TIERS")
+        if overrides:
+            try:
+                for tier, conf in json.loads(overrides).items():
+                    self.tiers[tier] = {**self.tiers.get(tier, {}), **conf}
+            except Exception as e:
+                logger.warning(f"Invalid AGENT_MODEL_TIERS, using defaults: {e}")
+
+        self._latencies: Dict[str, deque] = {tier: deque(maxlen=LATENCY_WINDOW) for tier in self.tiers}
+        self._counts: Dict[str, Dict[str, int]] = {tier: {"runs": 0, "fallbacks": 0, "slo_misses": 0} for tier in self.tiers}
+
+    def classify(self, agent_name: str, request_text: str = "", nights: int = 1, item_count: int = 0, history_len: int = 0) -> str:
+        """
+        Returns the tier name for a request. Only uses signals available before calling the model.
+        """
+        nights = nights or 0
+        request_text = request_text or ""
+        if agent_name == "itinerary_concierge":
+            if is_restructure_request(request_text) or nights >= 3:
+                return "complex"
+            # e.g. "make lunch earlier" / "2日目のランチを早めて" on a short plan
+            if len(request_text) <= 40 and item_count <= 10 and history_len <= 4:
+                return "fast"
+            return "standard"
+
+        if agent_name == "itinerary_planner":
+            return "complex" if nights >= 3 else "standard"
+
+        if agent_name == "proposal_designer":
+            return "complex" if len(request_text or "") > 200 or nights >= 4 else "standard"
+
+        return "standard"
+
+    def model_for(self, tier: str) -> str:
+        return self.tiers.get(tier, self.tiers["standard"])["model"]
+
+    def latency_target(self, tier: str) -> float | None:
+        return self.tiers.get(tier, {}).get("latency_target_seconds")
+
+    def record(self, tier: str, latency_seconds: float, fallback: bool):
+        counts = self._counts.setdefault(tier, {"runs": 0, "fallbacks": 0, "slo_misses": 0})
+        counts["runs"] += 1
+        if fallback:
+            counts["fallbacks"] += 1
+        target = self.latency_target(tier)
+        if target and latency_seconds > target:
+            counts["slo_misses"] += 1
+        self._latencies.setdefault(tier, deque(maxlen=LATENCY_WINDOW)).append(latency_seconds)
+        logger.info(f"Model tier {tier} ({self.model_for(tier)}): {latency_seconds:.2f}s, fallback={fallback}")
+
+    def stats(self) -> Dict[str, Any]:
+        result = {}
+        for tier, conf in self.tiers.items():
+            samples = sorted(self._latencies.get(tier, []))
+            counts = self._counts.get(tier, {"runs": 0, "fallbacks": 0, "slo_misses": 0})
+            runs = counts["runs"]
+            result[tier] = {
+                **conf,
+                **counts,
+                "fallback_rate": round(counts["fallbacks"] / runs, 3) if runs else 0.0,
+                "slo_miss_rate": round(counts["slo_misses"] / runs, 3) if runs else 0.0,
+                "p50_seconds": round(samples[len(samples) // 2], 3) if samples else None,
+                "p95_seconds": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3) if samples else None,
+            }
+        return result
+
+
+model_router = ModelRouter()
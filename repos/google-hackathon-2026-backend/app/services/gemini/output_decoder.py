@@ -0,0 +1,212 @@
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Iterator, List
+
+from pydantic import Field, TypeAdapter, ValidationError
+
+from app.models.schemas import ProposalResponse, ItineraryResponse
+
+logger = logging.getLogger(__name__)
+
+# Pre-built adapters: building a TypeAdapter compiles the schema, so do it once per process.
+PROPOSALS_ADAPTER = TypeAdapter(Annotated[List[ProposalResponse], Field(min_length=1)])
+ITINERARY_ADAPTER = TypeAdapter(ItineraryResponse)
+
+_CODE_FENCE_RE = re.compile(r"```[a-zA-Z]*")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+# Bounds on the decoding attempts for one output
+MAX_START_CANDIDATES = 32
+MAX_TRUNCATION_CANDIDATES = 64
+
+
+class AgentOutputError(ValueError):
+    """Raised when agent output cannot be turned into a valid response."""
+
+    def __init__(self, message: str, repairs: list[str]):
+        self.repairs = repairs
+        super().__init__(f"{message} (repairs tried: {', '.join(repairs) or 'none'})")
+
+
+@dataclass
+class DecodedOutput:
+    data: Any
+    repairs: list[str] = field(default_factory=list)
+
+
+def _scan_value(text: str, start: int) -> tuple[int | None, list[tuple[int, tuple[str, ...]]]]:
+    """
+    Scans the JSON value opening at text[start].
+    Returns the index just past its end (None if the text ends first) and the
+    positions where a truncated value can be cut and closed, with the containers
+    open at each: after an opening bracket, before a comma and after a nested value.
+    """
+    stack: list[str] = []
+    cuts: list[tuple[int, tuple[str, ...]]] = []
+    quote = None
+    escaped = False
+
+    for i in range(start, len(text)):
+        c = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == quote:
+                quote = None
+            continue
+
+        if c in "\"'":
+            quote = c
+        elif c in "{[":
+            stack.append(c)
+            cuts.append((i + 1, tuple(stack)))
+        elif c in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return i + 1, cuts
+            cuts.append((i + 1, tuple(stack)))
+        elif c == ",":
+            cuts.append((i, tuple(stack)))
+    return None, cuts
+
+
+def _candidate_values(text: str) -> Iterator[tuple[str, list[str]]]:
+    """
+    Yields (fragment, repairs) for each JSON object/array that may be the answer, in order.
+    Every balanced value is a candidate, so bracketed prose before the JSON is skipped
+    once it fails to parse. A value cut off by the end of the text yields its repairs,
+    latest cut first: open strings and members are dropped and the containers still
+    open are closed in place, so complete members of partial nested values are kept.
+    """
+    starts = [i for i, c in enumerate(text) if c in "{["][:MAX_START_CANDIDATES]
+    for start in starts:
+        repairs = ["leading_prose"] if text[:start].strip() else []
+        end, cuts = _scan_value(text, start)
+        if end is not None:
+            yield text[start:end], repairs + (["trailing_prose"] if text[end:].strip() else [])
+            continue
+        # Values starting further on are nested in this truncated one
+        for pos, stack in reversed(cuts[-MAX_TRUNCATION_CANDIDATES:]):
+            yield text[start:pos] + "".join(_CLOSERS[c] for c in reversed(stack)), repairs + ["closed_truncated"]
+        return
+
+
+def _normalize(fragment: str, repairs: list[str]) -> str:
+    """
+    Rewrites common non-JSON defects outside of strings: single-quoted strings,
+    unquoted keys, Python literals and trailing commas.
+    """
+    out: list[str] = []
+    applied: set[str] = set()
+    i, n = 0, len(fragment)
+
+    while i < n:
+        c = fragment[i]
+        if c == '"':
+            j, escaped = i + 1, False
+            while j < n:
+                if escaped:
+                    escaped = False
+                elif fragment[j] == "\\":
+                    escaped = True
+                elif fragment[j] == '"':
+                    break
+                j += 1
+            out.append(fragment[i:j + 1])
+            i = j + 1
+        elif c == "'":
+            j, escaped, chars = i + 1, False, []
+            while j < n:
+                ch = fragment[j]
+                if escaped:
+                    chars.append(ch if ch == "'" else "\\" + ch)
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == "'":
+                    break
+                else:
+                    chars.append(ch)
+                j += 1
+            out.append(json.dumps("".join(chars), ensure_ascii=False))
+            applied.add("single_quotes")
+            i = j + 1
+        elif c == ",":
+            j = i + 1
+            while j < n and fragment[j].isspace():
+                j += 1
+            if j < n and fragment[j] in "}]":
+                applied.add("trailing_commas")
+            else:
+                out.append(c)
+            i += 1
+        elif c.isalpha() or c == "_":
+            j = i
+            while j < n and (fragment[j].isalnum() or fragment[j] == "_"):
+                j += 1
+            word = fragment[i:j]
+            k = j
+            while k < n and fragment[k].isspace():
+                k += 1
+            if k < n and fragment[k] == ":":
+                out.append(json.dumps(word))
+                applied.add("unquoted_keys")
+            elif word in _PYTHON_LITERALS:
+                out.append(_PYTHON_LITERALS[word])
+                applied.add("python_literals")
+            else:
+                out.append(word)
+            i = j
+        else:
+            out.append(c)
+            i += 1
+
+    repairs.extend(sorted(applied))
+    return "".join(out)
+
+
+def decode_agent_output(text: str, adapter: TypeAdapter) -> DecodedOutput:
+    """
+    Decodes raw agent text into data validated by adapter.
+    Returns the validated (JSON-compatible) data together with the repairs applied.
+    Raises AgentOutputError if the output cannot be repaired or fails validation.
+    """
+    base_repairs: list[str] = []
+    if "```" in text:
+        text = _CODE_FENCE_RE.sub("", text)
+        base_repairs.append("code_fence")
+
+    # (message, repairs, cause) of the first failure of each kind
+    json_failure = schema_failure = None
+    for fragment, repairs in _candidate_values(text):
+        repairs = base_repairs + repairs
+        try:
+            data = json.loads(fragment)
+        except json.JSONDecodeError:
+            try:
+                data = json.loads(_normalize(fragment, repairs))
+            except json.JSONDecodeError as e:
+                json_failure = json_failure or (f"Unrepairable JSON: {e}", repairs, e)
+                continue
+
+        try:
+            validated = adapter.validate_python(data)
+        except ValidationError as e:
+            schema_failure = schema_failure or (f"Schema validation failed: {e.error_count()} errors", repairs, e)
+            continue
+
+        if repairs:
+            logger.info(f"Agent output decoded with repairs: {', '.join(repairs)}")
+        return DecodedOutput(data=adapter.dump_python(validated, mode="json"), repairs=repairs)
+
+    # A schema mismatch says more about the output than an unparseable candidate
+    failure = schema_failure or json_failure
+    if failure is None:
+        raise AgentOutputError("No JSON object or array found in agent output", base_repairs)
+    message, repairs, cause = failure
+    raise AgentOutputError(message, repairs) from cause
@@ -1,17 +1,21 @@
 import os
 import logging
-import json
 import traceback
 import uuid
+import time
 from typing import List, Dict, Any
 
 from google.genai import types
+from pydantic import TypeAdapter
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-from app.prompts.proposal import get_proposal_agent_instruction
-from app.prompts.itinerary import get_itinerary_agent_instruction
-from app.prompts.brushup import get_brushup_agent_instruction
+from app.prompts.proposal import get_proposal_agent_context, PROPOSAL_AGENT_STATIC_INSTRUCTION
+from app.prompts.itinerary import get_itinerary_agent_context, ITINERARY_AGENT_STATIC_INSTRUCTION
+from app.prompts.brushup import get_brushup_agent_context, BRUSHUP_AGENT_STATIC_INSTRUCTION
+from app.services.gemini.output_decoder import decode_agent_output, PROPOSALS_ADAPTER, ITINERARY_ADAPTER
+from app.services.gemini.model_router import model_router
+from app.services.hedging import hedge_budget, run_hedged
 
 logger = logging.getLogger(__name__)
 
@@ -32,13 +36,23 @@ class PlanDesignService:
         self.session_service = InMemorySessionService()
         self.app_name = "travel_designer_backend"
 
-    async def _run_agent(self, agent_name: str, instruction: str, user_input: str) -> str:
+        # Hedging: start another candidate if no valid JSON arrived within the delay.
+        # The delay is the routed tier's latency target (AGENT_HEDGE_DELAY_SECONDS if the tier has none).
+        # Opt-in: agents listed in AGENT_HEDGE_IMMEDIATE race from the start, doubling their LLM cost.
+        # Every extra candidate draws from the shared hedge budget.
+        self.hedge_delay = float(os.getenv("AGENT_HEDGE_DELAY_SECONDS", "15"))
+        self.hedge_max_candidates = int(os.getenv("AGENT_HEDGE_MAX_CANDIDATES", "2"))
+        self.hedge_immediate_agents = {
+            name.strip() for name in os.getenv("AGENT_HEDGE_IMMEDIATE", "").split(",") if name.strip()
+        }
+
+    async def _run_agent(self, agent_name: str, instruction: str, user_input: str, model: str = "gemini-3-flash-preview") -> str:
         """
         Helper to run an adk Agent with the standard Runner pattern.
         """
         # 1. Define Agent
         agent = LlmAgent(
-            model="gemini-3-flash-preview", 
+            model=model,
             name=agent_name,
             instruction=instruction
         )
@@ -65,7 +79,7 @@ class PlanDesignService:
         )
 
         # 5. Run
-        logger.info(f"Running agent: {agent_name} (Session: {session_id})")
+        logger.info(f"Running agent: {agent_name} on {model} (Session: {session_id})")
         events_async = runner.run_async(
             session_id=session_id, user_id=user_id, new_message=content
         )
@@ -82,19 +96,48 @@ class PlanDesignService:
 
         return final_response_text
 
+    async def _run_agent_validated(self, agent_name: str, static_instruction: str, context: str, user_input: str, adapter: TypeAdapter, tier: str = "standard") -> Any:
+        """
+        Runs the agent on the model of the given tier in hedged mode and returns the first
+        candidate whose output decodes (with repairs if needed) and validates against adapter.
+        Raises if every candidate failed.
+        """
+        model = model_router.model_for(tier)
+
+        async def attempt(candidate: int) -> Any:
+            text = await self._run_agent(agent_name, static_instruction + context, user_input, model=model)
+            decoded = decode_agent_output(text, adapter)
+            if decoded.repairs:
+                logger.info(f"{agent_name} candidate {candidate} needed repairs: {decoded.repairs}")
+            return decoded.data
+
+        if agent_name in self.hedge_immediate_agents:
+            hedge_delay = 0.0
+        else:
+            hedge_delay = model_router.latency_target(tier) or self.hedge_delay
+
+        hedge_budget.record_request()
+        start = time.monotonic()
+        try:
+            result = await run_hedged(attempt, hedge_delay, self.hedge_max_candidates, name=agent_name, should_hedge=hedge_budget.try_acquire)
+        except Exception:
+            model_router.record(tier, time.monotonic() - start, fallback=True)
+            raise
+        model_router.record(tier, time.monotonic() - start, fallback=False)
+        return result
+
     async def generate_proposals(self, mode: str, language: str, selected_tags: List[str] = None, custom_attributes: str = None, nights: int = 1, departure_location: str = None) -> List[Dict[str, Any]]:
         logger.info(f"Generating proposals for mode: {mode}, tags: {selected_tags}, language: {language}, nights: {nights}, departure: {departure_location}")
         
         if self.use_mock or not self.is_initialized:
             return self._get_mock_proposals(language, mode)
 
-        instruction = get_proposal_agent_instruction(mode, language, selected_tags, custom_attributes, nights, departure_location)
+        context = get_proposal_agent_context(mode, language, selected_tags, custom_attributes, nights, departure_location)
         user_input = f"Generate 3 proposals now for mode: {mode}."
+        tier = model_router.classify("proposal_designer", request_text=custom_attributes or "", nights=nights)
 
         try:
-            text = await self._run_agent("proposal_designer", instruction, user_input)
-            clean_text = text.replace('```json', '').replace('```', '').strip()
-            result = json.loads(clean_text)
+            result = await self._run_agent_validated("proposal_designer", PROPOSAL_AGENT_STATIC_INSTRUCTION, context, user_input, PROPOSALS_ADAPTER, tier)
             logger.info(f"Successfully generated {len(result)} proposals.")
             return result
         except Exception as e:
@@ -108,13 +151,12 @@ class PlanDesignService:
         if self.use_mock or not self.is_initialized:
             return self._get_mock_itinerary(language, proposal_id)
 
-        instruction = get_itinerary_agent_instruction(proposal_id, title, language, nights)
+        context = get_itinerary_agent_context(proposal_id, title, language, nights)
         user_input = f"Create itinerary for '{title}'."
+        tier = model_router.classify("itinerary_planner", request_text=title, nights=nights)
 
         try:
-            text = await self._run_agent("itinerary_planner", instruction, user_input)
-            clean_text = text.replace('```json', '').replace('```', '').strip()
-            result = json.loads(clean_text)
+            result = await self._run_agent_validated("itinerary_planner", ITINERARY_AGENT_STATIC_INSTRUCTION, context, user_input, ITINERARY_ADAPTER, tier)
             logger.info(f"Successfully generated itinerary for proposal {proposal_id}.")
             return result
         except Exception as e:
@@ -129,13 +171,19 @@ class PlanDesignService:
             logger.warning("Mock mode: returning original itinerary without changes.")
             return current_itinerary
 
-        instruction = get_brushup_agent_instruction(current_itinerary, request, history)
+        context = get_brushup_agent_context(current_itinerary, request, history)
         user_input = f"Brush up the plan based on my request: {request}"
+        days = current_itinerary.get("days") or []
+        tier = model_router.classify(
+            "itinerary_concierge",
+            request_text=request,
+            nights=max(0, len(days) - 1),
+            item_count=sum(len(day.get("items") or []) for day in days),
+            history_len=len(history or []),
+        )
 
         try:
-            text = await self._run_agent("itinerary_concierge", instruction, user_input)
-            clean_text = text.replace('```json', '').replace('```', '').strip()
-            result = json.loads(clean_text)
+            result = await self._run_agent_validated("itinerary_concierge", BRUSHUP_AGENT_STATIC_INSTRUCTION, context, user_input, ITINERARY_ADAPTER, tier)
             logger.info("Successfully brushed up itinerary.")
             return result
         except Exception as e:
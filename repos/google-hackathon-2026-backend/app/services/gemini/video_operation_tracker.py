@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import time
+import traceback
+from typing import Any, Callable, Dict
+
+from app.services.gemini.client_registry import get_genai_client
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[float], None]
+
+
+class _TrackedOperation:
+    def __init__(self, operation: Any, future: asyncio.Future, on_progress: ProgressCallback | None):
+        self.operation = operation
+        self.future = future
+        self.on_progress = on_progress
+        self.started_at = time.monotonic()
+        self.next_poll_at = self.started_at
+        self.polls = 0
+
+
+class VideoOperationTracker:
+    """
+    Owns all in-flight Veo long-running operations of this process.
+
+    A single background task polls every due operation in one batch and resolves
+    the future of each caller when its operation finishes. The polling interval
+    follows the expected remaining time: sparse early on, frequent once a video
+    is expected to be nearly done. The expected duration is learned from the
+    completion times seen so far.
+
+    `operations_factory` returns an object with an async `get(operation)` method,
+    such as `client.aio.operations` or a local fake.
+    """
+    def __init__(self, operations_factory: Callable[[], Any] | None = None):
+        self.min_interval = float(os.getenv("VEO_POLL_MIN_INTERVAL_SECONDS", "2"))
+        self.max_interval = float(os.getenv("VEO_POLL_MAX_INTERVAL_SECONDS", "20"))
+        self.timeout_seconds = float(os.getenv("VEO_OPERATION_TIMEOUT_SECONDS", "900"))
+        self.max_concurrent_polls = int(os.getenv("VEO_POLL_CONCURRENCY", "8"))
+        # Initial guess for a 4s 720p Veo fast generation; updated with an EWMA of observed durations
+        self.expected_seconds = float(os.getenv("VEO_EXPECTED_SECONDS", "60"))
+
+        self._operations_factory = operations_factory or (lambda: get_genai_client().aio.operations)
+        self._tracked: Dict[str, _TrackedOperation] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._durations: list[float] = []
+        self._stats = {"tracked": 0, "completed": 0, "failed": 0, "timed_out": 0, "polls": 0, "poll_batches": 0}
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if self._task and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Video operation tracker started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for tracked in self._tracked.values():
+            if not tracked.future.done():
+                tracked.future.set_exception(RuntimeError("Video operation tracker stopped"))
+        self._tracked.clear()
+        logger.info("Video operation tracker stopped")
+
+    # --- Tracking ---
+
+    async def wait(self, operation: Any, on_progress: ProgressCallback | None = None) -> Any:
+        """
+        Registers an operation returned by generate_videos and waits until it is done.
+        Returns the finished operation; raises if the operation failed or timed out.
+        `on_progress` receives an estimated completion fraction after each poll.
+        """
+        if operation.done:
+            return operation
+        await self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        self._tracked[operation.name] = _TrackedOperation(operation, future, on_progress)
+        self._stats["tracked"] += 1
+        self._wakeup.set()
+        return await future
+
+    def _interval(self, tracked: _TrackedOperation, now: float) -> float:
+        remaining = self.expected_seconds - (now - tracked.started_at)
+        return max(self.min_interval, min(self.max_interval, remaining / 2))
+
+    async def _run(self):
+        while True:
+            try:
+                if not self._tracked:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                now = time.monotonic()
+                next_due = min(t.next_poll_at for t in self._tracked.values())
+                if next_due > now:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=next_due - now)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                # Operations that are almost due ride along so polls stay batched
+                due = [t for t in self._tracked.values() if t.next_poll_at <= now + self.min_interval / 2]
+                await self._poll_batch(due)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Video operation tracker loop error: {e}")
+                logger.error(traceback.format_exc())
+                await asyncio.sleep(self.min_interval)
+
+    async def _poll_batch(self, due: list[_TrackedOperation]):
+        operations = self._operations_factory()
+        semaphore = asyncio.Semaphore(self.max_concurrent_polls)
+        self._stats["poll_batches"] += 1
+
+        async def poll(tracked: _TrackedOperation):
+            async with semaphore:
+                try:
+                    tracked.operation = await operations.get(tracked.operation)
+                except Exception as e:
+                    # Transient poll failures are retried on the next interval
+                    logger.warning(f"Polling Veo operation {tracked.operation.name} failed: {e}")
+                tracked.polls += 1
+                self._stats["polls"] += 1
+
+        await asyncio.gather(*[poll(t) for t in due])
+
+        now = time.monotonic()
+        for tracked in due:
+            name = tracked.operation.name
+            elapsed = now - tracked.started_at
+            if tracked.operation.done:
+                self._tracked.pop(name, None)
+                self._finish(tracked, elapsed)
+            elif elapsed > self.timeout_seconds:
+                self._tracked.pop(name, None)
+                self._stats["timed_out"] += 1
+                if not tracked.future.done():
+                    tracked.future.set_exception(TimeoutError(f"Veo operation {name} did not finish within {self.timeout_seconds:.0f}s"))
+            else:
+                tracked.next_poll_at = now + self._interval(tracked, now)
+                if tracked.on_progress:
+                    try:
+                        tracked.on_progress(min(0.95, elapsed / max(self.expected_seconds, 1.0)))
+                    except Exception as e:
+                        logger.warning(f"Video progress callback failed: {e}")
+
+        logger.info(f"Polled {len(due)} Veo operations, {len(self._tracked)} still in flight")
+
+    def _finish(self, tracked: _TrackedOperation, elapsed: float):
+        if tracked.future.done():
+            return
+        error = getattr(tracked.operation, "error", None)
+        if error:
+            self._stats["failed"] += 1
+            tracked.future.set_exception(RuntimeError(f"Veo operation {tracked.operation.name} failed: {error}"))
+            return
+
+        self._stats["completed"] += 1
+        self._durations = (self._durations + [elapsed])[-200:]
+        self.expected_seconds = 0.8 * self.expected_seconds + 0.2 * elapsed
+        logger.info(f"Veo operation {tracked.operation.name} finished in {elapsed:.1f}s after {tracked.polls} polls")
+        tracked.future.set_result(tracked.operation)
+
+    # --- Observability ---
+
+    def stats(self) -> Dict[str, Any]:
+        durations = sorted(self._durations)
+
+        def percentile(p: float) -> float | None:
+            if not durations:
+                return None
+            return round(durations[min(len(durations) - 1, int(p * len(durations)))], 2)
+
+        return {
+            **self._stats,
+            "in_flight": len(self._tracked),
+            "expected_seconds": round(self.expected_seconds, 1),
+            "completion_p50_seconds": percentile(0.5),
+            "completion_p95_seconds": percentile(0.95),
+        }
+
+
+video_operation_tracker = VideoOperationTracker()
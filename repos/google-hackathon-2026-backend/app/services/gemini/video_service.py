@@ -1,16 +1,25 @@
+import asyncio
 import os
 import logging
 import traceback
-import asyncio
-import httpx
-from google import genai
+from app.services.gemini.client_registry import get_genai_client
+from app.services.http_client import get_http_client
 from google.genai import types
-from app.services.storage import storage_service as storage
+from app.services.storage import async_storage as storage
 from app.services.places.places_service import get_place_photo_bytes
 from app.prompts.video import get_video_generation_prompt
+from app.services.gemini.image_preprocessor import preprocess_image, VEO_IMAGE_MAX_SIDE
+from app.services.gemini.video_operation_tracker import video_operation_tracker, ProgressCallback
+from app.services.storage.media_cache import video_cache, media_cache_key
+from app.services.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+VIDEO_MODEL = "veo-3.1-fast-generate-001"
+
+# Identical concurrent requests share one Veo operation
+video_flight = SingleFlight("video_generation")
+
 class VideoService:
     def __init__(self):
         self.project_id = os.getenv("GCP_PROJECT_ID")
@@ -19,16 +28,26 @@ class VideoService:
         if not self.is_initialized and not self.use_mock:
              logger.warning("GCP_PROJECT_ID not found. VideoService running in mock mode.")
 
-    async def generate_travel_video(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None) -> str:
+    async def generate_travel_video(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None, on_progress: ProgressCallback | None = None) -> str:
+        """
+        Generates (or reuses) a travel video and returns a signed URL, or "" on failure.
+        """
+        gs_uri = await self.generate_travel_video_uri(destination, description, user_image_url, user_id, on_progress)
+        if not gs_uri:
+            return ""
+        return await storage.generate_signed_url(gs_uri)
+
+    async def generate_travel_video_uri(self, destination: str, description: str, user_image_url: str = None, user_id: int | str = None, on_progress: ProgressCallback | None = None) -> str | None:
+        """
+        Generates (or reuses) a travel video and returns its gs:// URI, or None on failure.
+        """
         logger.info(f"Generating travel video for Destination: {destination}, Description: {description[:50]}..., UserImage: {user_image_url}, UserId: {user_id}")
         
         if self.use_mock or not self.is_initialized:
              # Return a sample video URL for mock mode
-             return storage.generate_signed_url("https://storage.googleapis.com/travel-experience-designer-bucket/travel_movie/sample_video.mp4")
+             return "https://storage.googleapis.com/travel-experience-designer-bucket/travel_movie/sample_video.mp4"
 
         try:
-            client = genai.Client(vertexai=True)
-            
             # 1. Fetch Images
             destination_image_bytes = await get_place_photo_bytes(destination)
             
@@ -36,54 +55,33 @@ class VideoService:
             if user_image_url:
                 if user_image_url.startswith("gs://"):
                     # Download from GCS if it's a gs URI
-                    user_image_bytes = storage.get_file_bytes(user_image_url)
+                    user_image_bytes = await storage.get_file_bytes(user_image_url)
                 elif user_image_url.startswith("http"):
                     # Download from HTTP
-                    async with httpx.AsyncClient() as http_client:
-                        resp = await http_client.get(user_image_url)
-                        if resp.status_code == 200:
-                            user_image_bytes = resp.content
+                    resp = await get_http_client().get(user_image_url, follow_redirects=True)
+                    if resp.status_code == 200:
+                        user_image_bytes = resp.content
 
             # 2. Prepare Source
             # Because reference_images feature is restricted (not allowlisted), we fallback to using a single image in source.image
             # We prioritize the user image to make it personalized.
             
             primary_image_bytes = None
-            primary_mime_type = "image/jpeg"
             
             if user_image_bytes:
                 primary_image_bytes = user_image_bytes
-                # Determine mime type
-                if user_image_bytes.startswith(b'\x89PNG\r\n\x1a\n'):
-                    primary_mime_type = "image/png"
-                elif user_image_bytes.startswith(b'\xff\xd8'):
-                    primary_mime_type = "image/jpeg"
-                elif user_image_bytes.startswith(b'RIFF') and user_image_bytes[8:12] == b'WEBP':
-                     primary_mime_type = "image/webp"
-                
-                # Use imported prompt function? Or construct here as it's dynamic based on image?
-                # The prompt structure was slightly adjusted for single image.
-                # Let's keep the logic inline or update the imported prompt helper to handle this.
-                # The helper I created: get_video_generation_prompt(destination, description, has_user_image, has_destination_image)
-                # Let's use it.
-                
                 prompt = get_video_generation_prompt(destination, description, has_user_image=True, has_destination_image=False)
 
             elif destination_image_bytes:
                 primary_image_bytes = destination_image_bytes
-                 # Determine mime type
-                if destination_image_bytes.startswith(b'\x89PNG\r\n\x1a\n'):
-                    primary_mime_type = "image/png"
-                elif destination_image_bytes.startswith(b'\xff\xd8'):
-                    primary_mime_type = "image/jpeg"
-                elif destination_image_bytes.startswith(b'RIFF') and destination_image_bytes[8:12] == b'WEBP':
-                     primary_mime_type = "image/webp"
-
                 prompt = get_video_generation_prompt(destination, description, has_user_image=False, has_destination_image=True)
             else:
                  # No images available
                 logger.warning("No images found for video generation.")
-                return ""
+                return None
+
+            # Veo renders at 720p; larger sources only add upload time
+            primary_image_bytes, primary_mime_type = await preprocess_image(primary_image_bytes, VEO_IMAGE_MAX_SIDE)
 
             source = types.GenerateVideosSource(
                 prompt=prompt,
@@ -106,35 +104,45 @@ class VideoService:
                 output_gcs_uri=output_gcs_uri,
             )
 
-            # 4. Generate
-            logger.info(f"Calling Veo 3.1 Fast for video generation. Output: {output_gcs_uri}")
-            operation = client.models.generate_videos(
-                model="veo-3.1-fast-generate-001", 
-                source=source, 
-                config=config
-            )
+            # 4. Reuse an identical earlier video, or join an identical generation already running
+            config_signature = config.model_dump_json(exclude={"output_gcs_uri"}, exclude_none=True)
+            cache_key = media_cache_key(VIDEO_MODEL, prompt, primary_image_bytes, config_signature)
+            cached_uri = await asyncio.to_thread(video_cache.lookup, cache_key)
+            if cached_uri:
+                return cached_uri
 
-            # 5. Wait for completion
-            while not operation.done:
-                logger.info("Video generation in progress... waiting 10 seconds.")
-                await asyncio.sleep(10)
-                operation = client.operations.get(operation)
-
-            response = operation.result
-            if not response or not response.generated_videos:
-                logger.error("No videos were generated.")
-                return ""
-
-            generated_video = response.generated_videos[0]
-            if generated_video.video and generated_video.video.uri:
-                logger.info(f"Video generated successfully: {generated_video.video.uri}")
-                return storage.generate_signed_url(generated_video.video.uri)
-            
-            # If uri is not directly available, check if we need to construct it from GCS
-            logger.info("Video generation completed, returning first video URL.")
-            return ""
+            return await video_flight.do(cache_key, lambda: self._generate(source, config, cache_key, on_progress))
 
         except Exception as e:
             logger.error(f"Video generation failed: {e}")
             logger.error(traceback.format_exc())
-            return ""
+            return None
+
+    async def _generate(self, source: types.GenerateVideosSource, config: types.GenerateVideosConfig, cache_key: str, on_progress: ProgressCallback | None) -> str | None:
+        """
+        Runs one Veo generation and records the result in the video cache.
+        """
+        logger.info(f"Calling Veo 3.1 Fast for video generation. Output: {config.output_gcs_uri}")
+        operation = await get_genai_client().aio.models.generate_videos(
+            model=VIDEO_MODEL,
+            source=source, 
+            config=config
+        )
+
+        # Wait for completion (polled by the shared background tracker)
+        logger.info(f"Video generation started: {operation.name}")
+        operation = await video_operation_tracker.wait(operation, on_progress=on_progress)
+
+        response = operation.result
+        if not response or not response.generated_videos:
+            logger.error("No videos were generated.")
+            return None
+
+        generated_video = response.generated_videos[0]
+        if generated_video.video and generated_video.video.uri:
+            logger.info(f"Video generated successfully: {generated_video.video.uri}")
+            await asyncio.to_thread(video_cache.store, cache_key, generated_video.video.uri, VIDEO_MODEL)
+            return generated_video.video.uri
+        
+        logger.info("Video generation completed without a video URI.")
+        return None
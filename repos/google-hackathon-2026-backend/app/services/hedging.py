@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from app.services.retry import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgeExhaustedError(Exception):
+    """Raised when every hedged candidate failed."""
+
+    def __init__(self, name: str, errors: list[BaseException]):
+        self.errors = errors
+        last = errors[-1] if errors else None
+        super().__init__(f"All {len(errors)} hedged candidates for {name} failed. Last error: {last}")
+
+
+async def run_hedged(
+    make_attempt: Callable[[int], Awaitable[T]],
+    hedge_delay: float,
+    max_attempts: int = 2,
+    name: str = "request",
+    should_hedge: Callable[[], bool] | None = None,
+) -> T:
+    """
+    Runs make_attempt(candidate_no) and races additional candidates against it.
+
+    A new candidate is started when no candidate has succeeded within hedge_delay
+    seconds (0 starts all candidates right away), or immediately when a candidate
+    fails. The first candidate that returns without raising wins and the others
+    are cancelled. Raises HedgeExhaustedError when all candidates failed.
+    should_hedge, if given, is asked before every additional candidate; once it
+    returns False no more candidates are started.
+    """
+    max_attempts = max(1, max_attempts)
+    pending: set[asyncio.Task] = set()
+    errors: list[BaseException] = []
+    started = 0
+    denied = False
+
+    def launch() -> bool:
+        nonlocal started, denied
+        if started and should_hedge is not None and not should_hedge():
+            denied = True
+            return False
+        started += 1
+        pending.add(asyncio.create_task(make_attempt(started)))
+        return True
+
+    launch()
+    try:
+        while pending:
+            timeout = hedge_delay if started < max_attempts and not denied else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                if launch():
+                    logger.info(f"Hedging {name}: no valid result after {hedge_delay}s, started candidate {started}/{max_attempts}")
+                continue
+
+            for task in done:
+                pending.discard(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    errors.append(e)
+                    logger.warning(f"Hedged candidate for {name} failed ({len(errors)}/{max_attempts}): {e}")
+                    continue
+                if started > 1:
+                    logger.info(f"Hedging {name}: won with {started} candidates started, {len(pending)} cancelled")
+                return result
+
+            # Every finished candidate failed: replace it right away instead of waiting.
+            if started < max_attempts and not denied:
+                launch()
+
+        raise HedgeExhaustedError(name, errors)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+# Shared by every HedgePolicy: hedges stay below ~ratio * requests across the process
+hedge_budget = RetryBudget(
+    ratio=float(os.getenv("HEDGE_BUDGET_RATIO", "0.1")),
+    min_retries_per_second=float(os.getenv("HEDGE_BUDGET_MIN_PER_SECOND", "0.1")),
+    max_tokens=float(os.getenv("HEDGE_BUDGET_MAX_TOKENS", "5")),
+)
+
+
+class HedgePolicy:
+    """
+    Hedging for an idempotent read whose delay tracks its own latency distribution.
+
+    The duplicate is sent once the first attempt has been outstanding for the
+    `percentile` of recently observed latencies (clamped to min/max delay; default_delay
+    until min_samples are collected), and only if the shared hedge budget allows it.
+    Disabled policies run a single attempt but still record latencies.
+    """
+    def __init__(
+        self,
+        name: str,
+        enabled: bool,
+        percentile: float = 0.95,
+        default_delay: float = 1.0,
+        min_delay: float = 0.05,
+        max_delay: float = 5.0,
+        window: int = 200,
+        min_samples: int = 20,
+        budget: RetryBudget = hedge_budget,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.budget = budget
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._stats = {"calls": 0, "hedges_sent": 0, "hedge_wins": 0, "budget_rejected": 0, "failures": 0}
+
+    def _quantile(self, q: float) -> float | None:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self) -> float:
+        if len(self._latencies) < self.min_samples:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, self._quantile(self.percentile)))
+
+    def _should_hedge(self) -> bool:
+        if self.budget.try_acquire():
+            self._stats["hedges_sent"] += 1
+            return True
+        self._stats["budget_rejected"] += 1
+        return False
+
+    async def run(self, make_attempt: Callable[[int], Awaitable[T]]) -> T:
+        """
+        Runs make_attempt(candidate_no) with hedging and returns the first success.
+        Raises HedgeExhaustedError when every candidate failed.
+        """
+        self._stats["calls"] += 1
+        self.budget.record_request()
+        start = time.monotonic()
+
+        async def attempt(candidate: int) -> tuple[int, float, T]:
+            attempt_start = time.monotonic()
+            result = await make_attempt(candidate)
+            return candidate, time.monotonic() - attempt_start, result
+
+        try:
+            candidate, duration, result = await run_hedged(
+                attempt,
+                self.hedge_delay(),
+                max_attempts=2 if self.enabled else 1,
+                name=self.name,
+                should_hedge=self._should_hedge,
+            )
+        except HedgeExhaustedError:
+            self._stats["failures"] += 1
+            raise
+
+        if candidate > 1:
+            self._stats["hedge_wins"] += 1
+            # The cancelled first attempt took at least this long; recording only the
+            # winner's duration would bias the percentile (and so the delay) downwards.
+            duration = time.monotonic() - start
+        self._latencies.append(duration)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        def ms(value: float | None) -> float | None:
+            return round(value * 1000, 1) if value is not None else None
+
+        hedges = self._stats["hedges_sent"]
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            # Share of hedges that answered first (the rest were wasted upstream calls)
+            "hedge_win_rate": round(self._stats["hedge_wins"] / hedges, 3) if hedges else None,
+            "extra_request_rate": round(hedges / self._stats["calls"], 3) if self._stats["calls"] else None,
+            "hedge_delay_ms": ms(self.hedge_delay()),
+            "p50_ms": ms(self._quantile(0.5)),
+            "p95_ms": ms(self._quantile(0.95)),
+            "p99_ms": ms(self._quantile(0.99)),
+        }
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Dict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Outbound HTTP settings, all in one place
+HTTP2_ENABLED = os.getenv("HTTP_CLIENT_HTTP2", "true").lower() == "true"
+MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS", "90"))
+MAX_REQUESTS_PER_HOST = int(os.getenv("HTTP_CLIENT_MAX_REQUESTS_PER_HOST", "20"))
+TIMEOUT = httpx.Timeout(
+    connect=float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS", "5")),
+    read=float(os.getenv("HTTP_CLIENT_READ_TIMEOUT_SECONDS", "15")),
+    write=float(os.getenv("HTTP_CLIENT_WRITE_TIMEOUT_SECONDS", "15")),
+    pool=float(os.getenv("HTTP_CLIENT_POOL_TIMEOUT_SECONDS", "5")),
+)
+
+
+class _SlotReleasingStream(httpx.AsyncByteStream):
+    """
+    Response body that releases its per-host slot once the body is closed, so the cap
+    covers the whole transfer and not just the wait for headers.
+    """
+    def __init__(self, stream: httpx.AsyncByteStream, semaphore: asyncio.Semaphore):
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._semaphore.release()
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport to cap concurrent requests per host and to count
+    new TCP connections / TLS handshakes (via httpcore trace events) against requests,
+    which shows how well connections are being reused.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_requests_per_host: int):
+        self._transport = transport
+        self._max_requests_per_host = max_requests_per_host
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats: Dict[str, Any] = {"requests": 0, "tcp_connects": 0, "tls_handshakes": 0, "http2_responses": 0, "errors": 0}
+        self.host_requests: Dict[str, int] = defaultdict(int)
+
+    async def _trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.stats["tcp_connects"] += 1
+        elif event_name == "connection.start_tls.complete":
+            self.stats["tls_handshakes"] += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self._max_requests_per_host))
+        request.extensions = {**request.extensions, "trace": self._trace}
+        self.stats["requests"] += 1
+        self.host_requests[host] += 1
+
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            semaphore.release()
+            if isinstance(e, Exception):
+                self.stats["errors"] += 1
+            raise
+        # The slot is held until the body has been read or the response is closed
+        response.stream = _SlotReleasingStream(response.stream, semaphore)
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self.stats["http2_responses"] += 1
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_client: httpx.AsyncClient | None = None
+_transport: _InstrumentedTransport | None = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    global _transport
+    http2 = HTTP2_ENABLED
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("h2 is not installed; shared HTTP client falls back to HTTP/1.1")
+            http2 = False
+
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+    )
+    _transport = _InstrumentedTransport(httpx.AsyncHTTPTransport(http2=http2, limits=limits, retries=1), MAX_REQUESTS_PER_HOST)
+    logger.info(f"Created shared HTTP client (http2={http2}, max_connections={MAX_CONNECTIONS})")
+    return httpx.AsyncClient(transport=_transport, timeout=TIMEOUT)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide pooled AsyncClient (created on first use if startup() was not called).
+    Do not close it; the application lifespan does.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def startup():
+    get_http_client()
+
+
+async def shutdown():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Closed shared HTTP client")
+
+
+def stats() -> Dict[str, Any]:
+    if _transport is None:
+        return {"requests": 0}
+    requests = _transport.stats["requests"]
+    return {
+        **_transport.stats,
+        "connection_reuse_rate": round(1 - _transport.stats["tcp_connects"] / requests, 3) if requests else None,
+        "requests_by_host": dict(_transport.host_requests),
+        "http2_enabled": HTTP2_ENABLED,
+    }
@@ -0,0 +1,2 @@
+from .job_service import job_manager, job_to_dict, JobContext
+from .teaser_scheduler import teaser_scheduler
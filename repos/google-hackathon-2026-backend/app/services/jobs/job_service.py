@@ -0,0 +1,311 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+import traceback
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models.models import Job
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class JobContext:
+    """
+    Handed to job handlers so long-running work can report progress.
+    """
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+
+    def report_progress(self, progress: int, message: str | None = None):
+        """Records progress without blocking; it is written to the jobs table in the background."""
+        self.manager._report_progress(self.job_id, max(0, min(100, int(progress))), message)
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Awaitable[Any]]
+
+
+class JobManager:
+    """
+    In-process worker pool for long-running generation work.
+    Job state lives in the SQLite `jobs` table so queued/running jobs are
+    picked up again after a restart; completion is signalled in memory for long-polling.
+    The table is only accessed from worker threads (the *_async helpers), never on the loop.
+    """
+    def __init__(self):
+        self.num_workers = int(os.getenv("JOB_WORKERS", "4"))
+        self.max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "2"))
+        self.retention_hours = int(os.getenv("JOB_RETENTION_HOURS", "24"))
+
+        self.handlers: Dict[str, JobHandler] = {}
+        self.queue: asyncio.Queue | None = None
+        self.workers: list[asyncio.Task] = []
+        self.running: set[str] = set()
+        self._done_events: Dict[str, asyncio.Event] = {}
+        # Latest unwritten progress per job and the task writing it
+        self._pending_progress: Dict[str, tuple[int, str | None]] = {}
+        self._progress_writers: Dict[str, asyncio.Task] = {}
+        # kind -> [count, total queue wait seconds, total run seconds]
+        self._timings: Dict[str, list[float]] = {}
+
+    def register(self, kind: str, handler: JobHandler):
+        self.handlers[kind] = handler
+
+    # --- Persistence helpers ---
+
+    def _update(self, job_id: str, **fields):
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id).update(fields)
+            db.commit()
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Job | None:
+        db = SessionLocal()
+        try:
+            return db.query(Job).filter(Job.id == job_id).first()
+        finally:
+            db.close()
+
+    def _insert(self, job: Job) -> Job:
+        db = SessionLocal()
+        try:
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return job
+        finally:
+            db.close()
+
+    async def _update_async(self, job_id: str, **fields):
+        await asyncio.to_thread(self._update, job_id, **fields)
+
+    async def get_async(self, job_id: str) -> Job | None:
+        return await asyncio.to_thread(self.get, job_id)
+
+    def _report_progress(self, job_id: str, progress: int, message: str | None):
+        # Reports arriving while a write is in flight collapse into the latest one
+        self._pending_progress[job_id] = (progress, message)
+        if job_id not in self._progress_writers:
+            self._progress_writers[job_id] = asyncio.create_task(self._write_progress(job_id))
+
+    async def _write_progress(self, job_id: str):
+        try:
+            while job_id in self._pending_progress:
+                progress, message = self._pending_progress.pop(job_id)
+                await self._update_async(job_id, progress=progress, progress_message=message)
+        except Exception as e:
+            logger.warning(f"Failed to record progress of job {job_id}: {e}")
+        finally:
+            self._progress_writers.pop(job_id, None)
+            self._pending_progress.pop(job_id, None)
+
+    async def _settle_progress(self, job_id: str):
+        """Waits for a progress write in flight so it cannot land after the final state."""
+        writer = self._progress_writers.get(job_id)
+        if writer:
+            await asyncio.gather(writer, return_exceptions=True)
+
+    def _recover(self) -> list[str]:
+        """
+        Re-queues jobs interrupted by a restart and purges old finished jobs.
+        """
+        db = SessionLocal()
+        try:
+            cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=self.retention_hours)
+            db.query(Job).filter(Job.status.in_(TERMINAL_STATUSES), Job.finished_at < cutoff).delete(synchronize_session=False)
+
+            exhausted = db.query(Job).filter(Job.status == "running", Job.attempts >= self.max_attempts)
+            exhausted.update({
+                "status": "failed",
+                "error": "Job interrupted too many times",
+                "finished_at": datetime.datetime.utcnow(),
+            }, synchronize_session=False)
+            db.query(Job).filter(Job.status == "running").update({"status": "queued"}, synchronize_session=False)
+            db.commit()
+
+            queued = db.query(Job.id).filter(Job.status == "queued").order_by(Job.created_at).all()
+            return [row.id for row in queued]
+        finally:
+            db.close()
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if self.workers:
+            return
+        self.queue = asyncio.Queue()
+        recovered = await asyncio.to_thread(self._recover)
+        for job_id in recovered:
+            self.queue.put_nowait(job_id)
+        if recovered:
+            logger.info(f"Re-queued {len(recovered)} unfinished jobs after restart")
+
+        self.workers = [asyncio.create_task(self._worker(i)) for i in range(self.num_workers)]
+        logger.info(f"Job manager started with {self.num_workers} workers")
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        logger.info("Job manager stopped")
+
+    # --- Submission & waiting ---
+
+    async def submit(self, kind: str, payload: Dict[str, Any]) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self.queue is None:
+            raise RuntimeError("Job manager is not running")
+
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            status="queued",
+            payload=json.dumps(payload, ensure_ascii=False, default=str),
+            progress=0,
+            attempts=0,
+            created_at=datetime.datetime.utcnow(),
+        )
+        job = await asyncio.to_thread(self._insert, job)
+
+        self.queue.put_nowait(job.id)
+        logger.info(f"Job submitted: {job.id} ({kind}), queue depth: {self.queue.qsize()}")
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Job | None:
+        """
+        Long-polls until the job finishes or timeout seconds pass, then returns its current state.
+        """
+        job = await self.get_async(job_id)
+        if not job or job.status in TERMINAL_STATUSES or timeout <= 0:
+            return job
+
+        event = self._done_events.setdefault(job_id, asyncio.Event())
+        # The job may have finished between the first read and registering the event
+        job = await self.get_async(job_id)
+        if job.status in TERMINAL_STATUSES:
+            return job
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return await self.get_async(job_id)
+
+    # --- Execution ---
+
+    async def _worker(self, worker_no: int):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job worker {worker_no} crashed on {job_id}: {e}")
+                logger.error(traceback.format_exc())
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await self.get_async(job_id)
+        if not job or job.status != "queued":
+            return
+
+        handler = self.handlers.get(job.kind)
+        started_at = datetime.datetime.utcnow()
+        await self._update_async(job_id, status="running", started_at=started_at, attempts=(job.attempts or 0) + 1)
+        self.running.add(job_id)
+        logger.info(f"Job started: {job_id} ({job.kind})")
+
+        start = time.monotonic()
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind: {job.kind}")
+            result = await handler(json.loads(job.payload or "{}"), JobContext(self, job_id))
+            await self._settle_progress(job_id)
+            await self._update_async(
+                job_id,
+                status="succeeded",
+                result=json.dumps(result, ensure_ascii=False, default=str),
+                progress=100,
+                finished_at=datetime.datetime.utcnow(),
+            )
+            logger.info(f"Job succeeded: {job_id} ({job.kind}) in {time.monotonic() - start:.1f}s")
+        except Exception as e:
+            logger.error(f"Job failed: {job_id} ({job.kind}): {e}")
+            logger.error(traceback.format_exc())
+            await self._settle_progress(job_id)
+            await self._update_async(job_id, status="failed", error=str(e), finished_at=datetime.datetime.utcnow())
+        finally:
+            self.running.discard(job_id)
+            timing = self._timings.setdefault(job.kind, [0, 0.0, 0.0])
+            timing[0] += 1
+            if job.created_at:
+                timing[1] += max(0.0, (started_at - job.created_at).total_seconds())
+            timing[2] += time.monotonic() - start
+
+            event = self._done_events.pop(job_id, None)
+            if event:
+                event.set()
+
+    # --- Observability ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Blocking (queries the jobs table); call it from a thread when on the event loop."""
+        db = SessionLocal()
+        try:
+            counts = dict(db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+        finally:
+            db.close()
+
+        return {
+            "workers": len(self.workers),
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "running": len(self.running),
+            "status_counts": counts,
+            "timings": {
+                kind: {
+                    "completed": int(count),
+                    "avg_queue_wait_seconds": round(wait / count, 3) if count else 0.0,
+                    "avg_run_seconds": round(run / count, 3) if count else 0.0,
+                }
+                for kind, (count, wait, run) in self._timings.items()
+            },
+        }
+
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+    queue_wait = run_time = None
+    if job.started_at and job.created_at:
+        queue_wait = (job.started_at - job.created_at).total_seconds()
+    if job.finished_at and job.started_at:
+        run_time = (job.finished_at - job.started_at).total_seconds()
+
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress or 0,
+        "progress_message": job.progress_message,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "attempts": job.attempts or 0,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "queue_wait_seconds": queue_wait,
+        "run_seconds": run_time,
+    }
+
+
+job_manager = JobManager()
@@ -0,0 +1,240 @@
+import asyncio
+import datetime
+import logging
+import os
+import traceback
+from typing import Any, Dict
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models.models import PlanTeaser, PlanTeaserAttempt
+
+logger = logging.getLogger(__name__)
+
+
+def parse_windows(spec: str) -> list[tuple[datetime.time, datetime.time]]:
+    """
+    Parses "01:00-06:00,13:00-14:00" into (start, end) pairs. A window may wrap midnight ("22:00-05:00").
+    """
+    windows = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start, end = part.split("-")
+            windows.append((datetime.time.fromisoformat(start.strip()), datetime.time.fromisoformat(end.strip())))
+        except ValueError:
+            logger.warning(f"Ignoring invalid teaser window: {part}")
+    return windows
+
+
+def in_windows(now: datetime.time, windows: list[tuple[datetime.time, datetime.time]]) -> bool:
+    for start, end in windows:
+        if start <= end and start <= now < end:
+            return True
+        if start > end and (now >= start or now < end):
+            return True
+    return False
+
+
+class TeaserScheduler:
+    """
+    Pre-generates short teaser videos for trending shared plans during off-peak hours,
+    so plan detail views can show a video without waiting for Veo.
+
+    Every check interval, inside a configured window, the top plans (likes decayed by age)
+    without a teaser are generated through VideoService, bounded by a global concurrency
+    limit and a daily budget. State lives in the SQLite `plan_teasers` table, so the
+    budget and finished teasers survive restarts.
+    """
+    def __init__(self):
+        self.enabled = os.getenv("TEASER_ENABLED", "false").lower() == "true"
+        self.windows = parse_windows(os.getenv("TEASER_WINDOWS", "01:00-06:00"))
+        self.timezone = ZoneInfo(os.getenv("TEASER_TIMEZONE", "Asia/Tokyo"))
+        self.top_n = int(os.getenv("TEASER_TOP_N", "10"))
+        self.recent_days = int(os.getenv("TEASER_RECENT_DAYS", "30"))
+        self.daily_budget = int(os.getenv("TEASER_DAILY_BUDGET", "5"))
+        self.max_concurrency = int(os.getenv("TEASER_MAX_CONCURRENCY", "1"))
+        self.max_attempts = int(os.getenv("TEASER_MAX_ATTEMPTS", "2"))
+        self.check_interval_seconds = float(os.getenv("TEASER_CHECK_INTERVAL_SECONDS", "600"))
+
+        self._task: asyncio.Task | None = None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._semaphore: asyncio.Semaphore | None = None
+        self._stats = {"checks": 0, "started": 0, "succeeded": 0, "failed": 0, "budget_exhausted": 0}
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if not self.enabled:
+            logger.info("Teaser scheduler disabled (TEASER_ENABLED=false)")
+            return
+        if self._task:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._recover()
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Teaser scheduler started: windows={os.getenv('TEASER_WINDOWS', '01:00-06:00')} {self.timezone}, daily budget={self.daily_budget}")
+
+    async def stop(self):
+        tasks = [t for t in [self._task, *self._running.values()] if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+
+    def _recover(self):
+        # Generations interrupted by a restart are retried later (their start still counts against the budget)
+        db = SessionLocal()
+        try:
+            db.query(PlanTeaser).filter(PlanTeaser.status == "running").update({"status": "failed", "error": "Interrupted by restart"}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    # --- Scheduling ---
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Teaser scheduler check failed: {e}")
+                logger.error(traceback.format_exc())
+            await asyncio.sleep(self.check_interval_seconds)
+
+    def _today_start_utc(self) -> datetime.datetime:
+        local_midnight = datetime.datetime.now(self.timezone).replace(hour=0, minute=0, second=0, microsecond=0)
+        return local_midnight.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+    def _used_today(self) -> int:
+        db = SessionLocal()
+        try:
+            # Every start (including retries and running generations) spends budget
+            return db.query(func.count(PlanTeaserAttempt.id)).filter(PlanTeaserAttempt.started_at >= self._today_start_utc()).scalar() or 0
+        finally:
+            db.close()
+
+    def _eligible(self, plan_ids: list[str]) -> set[str]:
+        db = SessionLocal()
+        try:
+            teasers = {t.plan_id: t for t in db.query(PlanTeaser).filter(PlanTeaser.plan_id.in_(plan_ids)).all()}
+        finally:
+            db.close()
+        eligible = set()
+        for plan_id in plan_ids:
+            teaser = teasers.get(plan_id)
+            if plan_id in self._running:
+                continue
+            if teaser is None or (teaser.status == "failed" and (teaser.attempts or 0) < self.max_attempts):
+                eligible.add(plan_id)
+        return eligible
+
+    async def run_once(self, force: bool = False):
+        """
+        One scheduling pass. `force` ignores the off-peak windows (the budget still applies).
+        """
+        self._stats["checks"] += 1
+        if not force and not in_windows(datetime.datetime.now(self.timezone).time(), self.windows):
+            return
+
+        remaining = self.daily_budget - self._used_today()
+        if remaining <= 0:
+            self._stats["budget_exhausted"] += 1
+            return
+
+        from app.services.bigquery_service import BigQueryService
+        plans = await asyncio.to_thread(lambda: BigQueryService().get_trending_plans(limit=self.top_n, recent_days=self.recent_days))
+        eligible = self._eligible([str(p["plan_id"]) for p in plans])
+
+        for plan in plans:
+            if remaining <= 0:
+                break
+            plan_id = str(plan["plan_id"])
+            if plan_id not in eligible:
+                continue
+            self._mark_started(plan_id, plan.get("like_count", 0))
+            self._running[plan_id] = asyncio.create_task(self._generate(plan_id, plan["title"], plan.get("description") or ""))
+            remaining -= 1
+
+    def _mark_started(self, plan_id: str, like_count: int):
+        db = SessionLocal()
+        try:
+            teaser = db.query(PlanTeaser).filter(PlanTeaser.plan_id == plan_id).first()
+            if teaser is None:
+                teaser = PlanTeaser(plan_id=plan_id, attempts=0)
+                db.add(teaser)
+            teaser.status = "running"
+            teaser.error = None
+            teaser.attempts = (teaser.attempts or 0) + 1
+            teaser.like_count = like_count
+            teaser.started_at = datetime.datetime.utcnow()
+            teaser.finished_at = None
+            db.add(PlanTeaserAttempt(plan_id=plan_id, started_at=teaser.started_at))
+            db.commit()
+        finally:
+            db.close()
+        self._stats["started"] += 1
+
+    def _mark_finished(self, plan_id: str, gs_uri: str | None, error: str | None):
+        db = SessionLocal()
+        try:
+            db.query(PlanTeaser).filter(PlanTeaser.plan_id == plan_id).update({
+                "status": "succeeded" if gs_uri else "failed",
+                "gs_uri": gs_uri,
+                "error": error,
+                "finished_at": datetime.datetime.utcnow(),
+            })
+            db.commit()
+        finally:
+            db.close()
+
+    async def _generate(self, plan_id: str, title: str, description: str):
+        from app.services.gemini.video_service import VideoService
+        try:
+            async with self._semaphore:
+                logger.info(f"Generating teaser video for plan {plan_id}: {title}")
+                gs_uri = await VideoService().generate_travel_video_uri(destination=title, description=description)
+            if gs_uri:
+                self._stats["succeeded"] += 1
+                self._mark_finished(plan_id, gs_uri, None)
+            else:
+                self._stats["failed"] += 1
+                self._mark_finished(plan_id, None, "Video generation returned no result")
+        except asyncio.CancelledError:
+            self._mark_finished(plan_id, None, "Cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Teaser generation failed for plan {plan_id}: {e}")
+            self._stats["failed"] += 1
+            self._mark_finished(plan_id, None, str(e))
+        finally:
+            self._running.pop(plan_id, None)
+
+    # --- Lookup & observability ---
+
+    def get_teaser_uri(self, plan_id: str) -> str | None:
+        db = SessionLocal()
+        try:
+            teaser = db.query(PlanTeaser).filter(PlanTeaser.plan_id == str(plan_id), PlanTeaser.status == "succeeded").first()
+            return teaser.gs_uri if teaser else None
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        used_today = self._used_today() if self.enabled else 0
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "running": len(self._running),
+            "used_today": used_today,
+            "daily_budget": self.daily_budget,
+            "in_window": in_windows(datetime.datetime.now(self.timezone).time(), self.windows),
+        }
+
+
+teaser_scheduler = TeaserScheduler()
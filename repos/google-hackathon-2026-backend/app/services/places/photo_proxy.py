@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.services.auth import SECRET_KEY
+from app.services.places.places_cache import place_photo_bytes_cache
+from app.services.places.places_service import fetch_place_photo
+
+logger = logging.getLogger(__name__)
+
+PHOTO_NAME_RE = re.compile(r"^places/[A-Za-z0-9_-]+/photos/[A-Za-z0-9_-]+$")
+# Only a few sizes are served so cached files and CDN keys are not fragmented
+ALLOWED_MAX_PX = (400, 800, 1024, 1600)
+
+# Proxy URLs carry an HMAC of the photo name so only names this server issued are fetched upstream
+PHOTO_URL_SECRET = os.getenv("PLACE_PHOTO_URL_SECRET", SECRET_KEY).encode()
+
+_etags: "OrderedDict[tuple[str, int], str]" = OrderedDict()  # (path, size) -> ETag
+_etags_lock = threading.Lock()
+_MAX_ETAGS = 4096
+
+
+@dataclass
+class CachedPhoto:
+    path: str
+    size: int
+    etag: str
+    content_type: str
+
+
+def normalize_max_px(max_px: int) -> int:
+    """Rounds a requested size up to the nearest served size."""
+    for allowed in ALLOWED_MAX_PX:
+        if max_px <= allowed:
+            return allowed
+    return ALLOWED_MAX_PX[-1]
+
+
+def sign_photo_name(photo_name: str) -> str:
+    return hmac.new(PHOTO_URL_SECRET, photo_name.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def verify_photo_name(photo_name: str, sig: str) -> bool:
+    return hmac.compare_digest(sign_photo_name(photo_name), sig)
+
+
+def _sniff_content_type(path: str) -> str:
+    with open(path, "rb") as f:
+        head = f.read(12)
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return "image/png"
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        return "image/webp"
+    return "image/jpeg"
+
+
+def _etag_for(path: str, size: int) -> str:
+    """
+    Strong ETag over the file content, hashed in chunks and memoized per (path, size).
+    """
+    with _etags_lock:
+        etag = _etags.get((path, size))
+        if etag:
+            _etags.move_to_end((path, size))
+            return etag
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            h.update(chunk)
+    etag = f'"{h.hexdigest()[:32]}"'
+
+    with _etags_lock:
+        _etags[(path, size)] = etag
+        while len(_etags) > _MAX_ETAGS:
+            _etags.popitem(last=False)
+    return etag
+
+
+def _describe(path: str) -> CachedPhoto | None:
+    try:
+        size = os.stat(path).st_size
+        return CachedPhoto(path=path, size=size, etag=_etag_for(path, size), content_type=_sniff_content_type(path))
+    except FileNotFoundError:
+        # Evicted between lookup and stat
+        return None
+
+
+async def get_cached_photo(photo_name: str, max_px: int) -> CachedPhoto | None:
+    """
+    Returns the on-disk copy of a Places photo, downloading it into the photo cache on a miss.
+    Returns None if the photo cannot be fetched.
+    """
+    cache_key = f"{photo_name}@{max_px}"
+    path = await asyncio.to_thread(place_photo_bytes_cache.get_path, cache_key)
+    if path is None:
+        if await fetch_place_photo(photo_name, max_px=max_px) is None:
+            return None
+        path = await asyncio.to_thread(place_photo_bytes_cache.get_path, cache_key)
+        if path is None:
+            return None
+    return await asyncio.to_thread(_describe, path)
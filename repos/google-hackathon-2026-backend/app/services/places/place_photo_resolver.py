@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from app.services.cache import MISSING
+from app.services.places import places_client
+from app.services.places.places_cache import place_photo_cache
+from app.services.places.places_client import PlacesAPIError
+from app.services.places.places_service import fetch_place_photo
+
+logger = logging.getLogger(__name__)
+
+PlaceQuery = tuple[str, tuple[float, float] | None]  # (query, (lat, lng) or None)
+
+# Size the frontend displays (and the photo proxy serves by default)
+PREFETCH_MAX_PX = 800
+
+# Keeps fire-and-forget prefetch tasks referenced until they finish
+_prefetch_tasks: set[asyncio.Task] = set()
+
+
+def _cache_key(query: str, location: tuple[float, float] | None) -> str:
+    if not location:
+        return query
+    # ~100m precision; nearby coordinates for the same spot share an entry
+    return f"{query}@{location[0]:.3f},{location[1]:.3f}"
+
+
+async def resolve_place_photo(query: str, location: tuple[float, float] | None = None) -> Dict[str, Any] | None:
+    """
+    Returns {"photo_name", "attributions"} for the first photo of the best match, or None if
+    nothing was found. Results (including "not found") are cached; PlacesAPIError is raised
+    and not cached.
+    """
+    key = _cache_key(query, location)
+    cached = place_photo_cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    photos = await places_client.search_place_photos(query, limit=1, location=location)
+    if not photos:
+        place_photo_cache.set(key, None)
+        logger.info(f"No photos found for query: {query}")
+        return None
+
+    resolved = {"photo_name": photos[0].name, "attributions": photos[0].author_attributions}
+    place_photo_cache.set(key, resolved)
+    return resolved
+
+
+async def resolve_place_photos(queries: List[PlaceQuery]) -> List[Dict[str, Any] | None]:
+    """
+    Resolves many queries concurrently (upstream QPS is capped by the Places client).
+    Returns one result per input, in order; failed lookups are None.
+    """
+    unique = list(dict.fromkeys(queries))
+    results = await asyncio.gather(*[resolve_place_photo(q, loc) for q, loc in unique], return_exceptions=True)
+
+    by_query = {}
+    for (q, loc), result in zip(unique, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to resolve place photo for {q}: {result}")
+            result = None
+        by_query[(q, loc)] = result
+    return [by_query[item] for item in queries]
+
+
+def itinerary_place_queries(itinerary: Dict[str, Any]) -> List[PlaceQuery]:
+    """
+    Extracts (activity, (lat, lng)) for every item of an itinerary dict.
+    """
+    queries = []
+    for day in itinerary.get("days") or []:
+        for item in day.get("items") or []:
+            activity = item.get("activity")
+            if not activity:
+                continue
+            loc = item.get("location")
+            location = (loc["lat"], loc["lng"]) if isinstance(loc, dict) and "lat" in loc and "lng" in loc else None
+            queries.append((activity, location))
+    return queries
+
+
+def prefetch_itinerary_photos(itinerary: Dict[str, Any]):
+    """
+    Resolves the photos of all itinerary spots and downloads them into the photo cache
+    in the background, so the frontend's lookups (by query and location, as it sends
+    them for itinerary items) and photo proxy requests right after receiving the
+    itinerary are cache hits.
+    """
+    queries = itinerary_place_queries(itinerary)
+    if not queries or not places_client.get_api_key():
+        return
+
+    async def run():
+        start = time.monotonic()
+        results = await resolve_place_photos(queries)
+        found = [r["photo_name"] for r in results if r]
+        await asyncio.gather(*[fetch_place_photo(name, max_px=PREFETCH_MAX_PX) for name in dict.fromkeys(found)])
+        logger.info(f"Prefetched {len(found)}/{len(queries)} itinerary place photos in {time.monotonic() - start:.2f}s")
+
+    task = asyncio.create_task(run())
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
@@ -0,0 +1,27 @@
+import os
+
+from app.services.cache import LRUTTLCache
+from app.services.disk_cache import DiskByteCache
+
+# Query -> first photo ({"photo_name", "attributions"}), or None when nothing was found.
+# The media URL embeds the API key, so it is built per response instead of being cached.
+place_photo_cache = LRUTTLCache(
+    "place_photo",
+    max_entries=int(os.getenv("PLACE_PHOTO_CACHE_MAX_ENTRIES", "5000")),
+    ttl_seconds=float(os.getenv("PLACE_PHOTO_CACHE_TTL_HOURS", "24")) * 3600,
+    negative_ttl_seconds=float(os.getenv("PLACE_PHOTO_CACHE_NEGATIVE_TTL_MINUTES", "60")) * 60,
+)
+
+# L1 of the media pipeline: destination -> photo resource names ([] when nothing was found)
+place_photo_names_cache = LRUTTLCache(
+    "place_photo_names",
+    max_entries=int(os.getenv("PLACE_PHOTO_CACHE_MAX_ENTRIES", "5000")),
+    ttl_seconds=float(os.getenv("PLACE_PHOTO_CACHE_TTL_HOURS", "24")) * 3600,
+    negative_ttl_seconds=float(os.getenv("PLACE_PHOTO_CACHE_NEGATIVE_TTL_MINUTES", "60")) * 60,
+)
+
+# L2: "<photo name>@<max px>" -> photo bytes on local disk
+place_photo_bytes_cache = DiskByteCache(
+    directory=os.getenv("PLACE_PHOTO_DISK_CACHE_DIR", "./cache/place_photos"),
+    max_bytes=int(os.getenv("PLACE_PHOTO_DISK_CACHE_MB", "256")) * 1024 * 1024,
+)
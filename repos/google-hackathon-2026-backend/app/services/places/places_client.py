@@ -0,0 +1,155 @@
+import os
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import httpx
+
+from app.services.hedging import HedgeExhaustedError, HedgePolicy
+from app.services.http_client import get_http_client
+from app.services.rate_limit import AsyncRateLimiter
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+PLACES_BASE_URL = "https://places.googleapis.com/v1"
+
+# Concurrent identical searches / downloads (e.g. /media/image and /media/generate-video
+# for the same plan) share one upstream request
+search_flight = SingleFlight("places_search")
+photo_flight = SingleFlight("places_photo")
+
+# Process-wide cap on upstream Places requests (search + media)
+places_rate_limiter = AsyncRateLimiter(
+    rate=float(os.getenv("PLACES_MAX_QPS", "10")),
+    burst=float(os.getenv("PLACES_BURST", "10")),
+)
+LOCATION_BIAS_RADIUS_METERS = float(os.getenv("PLACES_LOCATION_BIAS_RADIUS_METERS", "2000"))
+
+# Opt-in: a second Text Search is sent when the first is slower than the observed p95
+search_hedge = HedgePolicy(
+    "places_search",
+    enabled=os.getenv("PLACES_HEDGING_ENABLED", "false").lower() == "true",
+    percentile=float(os.getenv("PLACES_HEDGE_PERCENTILE", "0.95")),
+    default_delay=float(os.getenv("PLACES_HEDGE_DEFAULT_DELAY_SECONDS", "1.0")),
+)
+
+
+class PlacesAPIError(Exception):
+    """Raised when the Places API cannot be reached or returns an error status."""
+
+
+@dataclass
+class PlacePhoto:
+    name: str  # Photo resource name: places/{place_id}/photos/{photo_id}
+    width_px: int | None = None
+    height_px: int | None = None
+    author_attributions: List[Dict[str, str]] = field(default_factory=list)
+
+
+def get_api_key() -> str | None:
+    return os.getenv("GOOGLE_PLACE_API_KEY") or None
+
+
+def photo_media_url(photo_name: str, max_px: int = 800) -> str:
+    """
+    Direct media URL of a photo. Note that it embeds the API key.
+    """
+    return f"{PLACES_BASE_URL}/{photo_name}/media?maxHeightPx={max_px}&maxWidthPx={max_px}&key={get_api_key()}"
+
+
+async def search_text(query: str, field_mask: str, location: tuple[float, float] | None = None) -> List[Dict[str, Any]]:
+    """
+    Text Search (New). Returns the matched places (possibly empty).
+    `location` (lat, lng) biases results towards that point.
+    Raises PlacesAPIError if the API key is missing or the request fails.
+    """
+    return await search_flight.do((query, field_mask, location), lambda: _search_text(query, field_mask, location))
+
+
+async def _search_text(query: str, field_mask: str, location: tuple[float, float] | None) -> List[Dict[str, Any]]:
+    api_key = get_api_key()
+    if not api_key:
+        raise PlacesAPIError("GOOGLE_PLACE_API_KEY is not set")
+
+    headers = {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": api_key,
+        "X-Goog-FieldMask": field_mask,
+    }
+    payload: Dict[str, Any] = {"textQuery": query}
+    if location:
+        payload["locationBias"] = {
+            "circle": {
+                "center": {"latitude": location[0], "longitude": location[1]},
+                "radius": LOCATION_BIAS_RADIUS_METERS,
+            }
+        }
+
+    async def attempt(candidate: int) -> httpx.Response:
+        await places_rate_limiter.acquire()
+        response = await get_http_client().post(f"{PLACES_BASE_URL}/places:searchText", headers=headers, json=payload)
+        # Raise here so an error status loses the race instead of cancelling a pending hedge
+        if response.status_code != 200:
+            raise PlacesAPIError(f"Places Search API returned {response.status_code}: {response.text}")
+        return response
+
+    try:
+        response = await search_hedge.run(attempt)
+    except HedgeExhaustedError as e:
+        last = e.errors[-1]
+        if isinstance(last, PlacesAPIError):
+            raise last from e
+        raise PlacesAPIError(f"Places Search request failed: {last}") from last
+
+    return response.json().get("places") or []
+
+
+async def search_place_photos(query: str, limit: int = 1, location: tuple[float, float] | None = None) -> List[PlacePhoto]:
+    """
+    Returns up to 'limit' photos (with author attributions) of the best matching place.
+    Raises PlacesAPIError on API failures; an empty list means nothing was found.
+    """
+    places = await search_text(query, field_mask="places.photos", location=location)
+    if not places:
+        logger.info(f"No places found for query: {query}")
+        return []
+
+    photos = places[0].get("photos") or []
+    if not photos:
+        logger.info(f"No photos found for place matching: {query}")
+    return [
+        PlacePhoto(
+            name=photo["name"],
+            width_px=photo.get("widthPx"),
+            height_px=photo.get("heightPx"),
+            author_attributions=photo.get("authorAttributions", []),
+        )
+        for photo in photos[:limit]
+    ]
+
+
+async def fetch_photo_media(photo_name: str, max_px: int = 1024) -> bytes:
+    """
+    Downloads the media of a single photo resource.
+    Raises PlacesAPIError on failure.
+    """
+    return await photo_flight.do((photo_name, max_px), lambda: _fetch_photo_media(photo_name, max_px))
+
+
+async def _fetch_photo_media(photo_name: str, max_px: int) -> bytes:
+    api_key = get_api_key()
+    if not api_key:
+        raise PlacesAPIError("GOOGLE_PLACE_API_KEY is not set")
+
+    url = f"{PLACES_BASE_URL}/{photo_name}/media"
+    params = {"key": api_key, "maxHeightPx": max_px, "maxWidthPx": max_px}
+    await places_rate_limiter.acquire()
+    try:
+        response = await get_http_client().get(url, params=params, follow_redirects=True)
+    except httpx.HTTPError as e:
+        raise PlacesAPIError(f"Places Photo request failed for {photo_name}: {e}") from e
+
+    if response.status_code != 200:
+        raise PlacesAPIError(f"Places Photo API returned {response.status_code} for {photo_name}")
+    return response.content
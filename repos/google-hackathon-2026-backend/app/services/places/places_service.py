@@ -1,73 +1,70 @@
-import os
 import logging
-import traceback
-import httpx
+import asyncio
+
+from app.services.cache import MISSING
+from app.services.places import places_client
+from app.services.places.places_client import PlacesAPIError
+from app.services.places.places_cache import place_photo_names_cache, place_photo_bytes_cache
 
 logger = logging.getLogger(__name__)
 
+# Places API (New) returns at most 10 photos per place
+MAX_PHOTOS_PER_PLACE = 10
 
-async def get_place_photos_bytes(destination: str, limit: int = 1) -> list[bytes]:
-    """Fetches up to 'limit' distinct photos for a destination."""
-    api_key = os.getenv("GOOGLE_PLACE_API_KEY")
-    if not api_key:
+
+async def search_place_photo_names(destination: str, limit: int = 1) -> list[str]:
+    """Returns up to 'limit' photo resource names of the best matching place."""
+    if not places_client.get_api_key():
         logger.warning("GOOGLE_PLACE_API_KEY not set. Skipping Places API.")
         return []
 
+    cached = place_photo_names_cache.get(destination)
+    if cached is not MISSING:
+        return (cached or [])[:limit]
+
     try:
-        async with httpx.AsyncClient() as client:
-            # 1. Search for the place to get its photos
-            search_url = "https://places.googleapis.com/v1/places:searchText"
-            headers = {
-                "Content-Type": "application/json",
-                "X-Goog-Api-Key": api_key,
-                "X-Goog-FieldMask": "places.photos" 
-            }
-            payload = {
-                "textQuery": destination
-            }
-            
-            response = await client.post(search_url, headers=headers, json=payload, timeout=10.0)
-            if response.status_code != 200:
-                logger.warning(f"Places Search API returned {response.status_code}: {response.text}")
-                return []
-                
-            data = response.json()
-            
-            if not data.get("places") or len(data["places"]) == 0:
-                logger.warning(f"No places found for destination: {destination}")
-                return []
-            
-            place = data["places"][0]
-            if not place.get("photos") or len(place["photos"]) == 0:
-                logger.warning(f"No photos found for place found for: {destination}")
-                return []
-            
-            # 2. Get up to 'limit' photo resource names
-            photos_data = place["photos"][:limit]
-            
-            # 3. Fetch photos in parallel
-            import asyncio
-            
-            async def fetch_single_photo(photo_data):
-                photo_name = photo_data["name"]
-                # logger.info(f"Fetching photo from Places API: {photo_name}")
-                photo_url = f"https://places.googleapis.com/v1/{photo_name}/media?key={api_key}&maxHeightPx=1024&maxWidthPx=1024"
-                photo_response = await client.get(photo_url, follow_redirects=True, timeout=15.0)
-                if photo_response.status_code == 200:
-                    return photo_response.content
-                return None
-
-            tasks = [fetch_single_photo(p) for p in photos_data]
-            results = await asyncio.gather(*tasks)
-            
-            return [r for r in results if r is not None]
-
-    except Exception as e:
-        logger.error(f"Error fetching place photos: {e}")
-        logger.error(traceback.format_exc())
+        # A search returns all photos of the place anyway, so cache every name and slice per caller
+        photos = await places_client.search_place_photos(destination, limit=MAX_PHOTOS_PER_PLACE)
+    except PlacesAPIError as e:
+        # Errors are not cached so the next call retries
+        logger.error(f"Error searching place photos: {e}")
         return []
 
+    names = [photo.name for photo in photos]
+    place_photo_names_cache.set(destination, names or None)
+    return names[:limit]
+
+
+async def fetch_place_photo(photo_name: str, max_px: int = 1024) -> bytes | None:
+    """Downloads the media of a single Places photo resource."""
+    if not places_client.get_api_key():
+        return None
+
+    cache_key = f"{photo_name}@{max_px}"
+    cached = await asyncio.to_thread(place_photo_bytes_cache.get, cache_key)
+    if cached:
+        return cached
+
+    try:
+        data = await places_client.fetch_photo_media(photo_name, max_px=max_px)
+    except PlacesAPIError as e:
+        logger.warning(f"Error fetching place photo: {e}")
+        return None
+
+    await asyncio.to_thread(place_photo_bytes_cache.put, cache_key, data)
+    return data
+
+
+async def get_place_photos_bytes(destination: str, limit: int = 1) -> list[bytes]:
+    """Fetches up to 'limit' distinct photos for a destination."""
+    photo_names = await search_place_photo_names(destination, limit=limit)
+    if not photo_names:
+        return []
+
+    # Fetch photos in parallel
+    results = await asyncio.gather(*[fetch_place_photo(name) for name in photo_names])
+    return [r for r in results if r is not None]
+
 async def get_place_photo_bytes(destination: str) -> bytes | None:
     photos = await get_place_photos_bytes(destination, limit=1)
     return photos[0] if photos else None
-
@@ -0,0 +1,37 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket for outbound calls: sustains `rate` acquisitions per second with bursts
+    up to `burst`. Waiters are served in arrival order.
+    """
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._stats = {"acquired": 0, "delayed": 0, "total_wait_seconds": 0.0}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                self._stats["delayed"] += 1
+                self._stats["total_wait_seconds"] += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+            self._stats["acquired"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "total_wait_seconds": round(self._stats["total_wait_seconds"], 3), "rate": self.rate}
@@ -0,0 +1,155 @@
+import email.utils
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 503}
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)s\s*$")
+
+
+class RetryBudget:
+    """
+    Process-wide cap on retries as a share of requests (token bucket).
+
+    Every request deposits `ratio` tokens and every retry spends one, so retries stay
+    below ~ratio * requests under sustained failure. A small time-based refill lets
+    low-traffic processes still retry occasionally.
+    """
+    def __init__(self, ratio: float, min_retries_per_second: float, max_tokens: float):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "rejected": 0}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self._last_refill) * self.min_retries_per_second)
+        self._last_refill = now
+
+    def record_request(self):
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+            self._stats["requests"] += 1
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self._stats["retries"] += 1
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "tokens": round(self.tokens, 2), "ratio": self.ratio}
+
+
+retry_budget = RetryBudget(
+    ratio=float(os.getenv("RETRY_BUDGET_RATIO", "0.2")),
+    min_retries_per_second=float(os.getenv("RETRY_BUDGET_MIN_PER_SECOND", "0.2")),
+    max_tokens=float(os.getenv("RETRY_BUDGET_MAX_TOKENS", "10")),
+)
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff ("full jitter") bounded by attempts, the shared
+    retry budget and the caller's deadline.
+
+    A server-provided Retry-After is always waited out in full (max_delay only caps
+    the backoff): retrying earlier just earns another 429. If it does not fit the
+    deadline, or exceeds max_retry_after when there is none, the caller gives up.
+    """
+    def __init__(self, name: str, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 30.0, budget: RetryBudget = retry_budget, max_retry_after: float = 300.0):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+        # EWMA of a single attempt's duration, used to decide whether another attempt still fits the deadline
+        self.expected_attempt_seconds: float | None = None
+
+    def record_attempt(self, duration_seconds: float):
+        if self.expected_attempt_seconds is None:
+            self.expected_attempt_seconds = duration_seconds
+        else:
+            self.expected_attempt_seconds = 0.8 * self.expected_attempt_seconds + 0.2 * duration_seconds
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def next_delay(self, attempt: int, deadline: float | None = None, retry_after: float | None = None) -> float | None:
+        """
+        Returns how long to sleep before retrying after the given 0-based attempt,
+        or None if the caller should give up.
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            if deadline is None and retry_after > self.max_retry_after:
+                logger.warning(f"{self.name}: giving up, server asked to retry after {retry_after:.0f}s")
+                return None
+            delay = max(delay, retry_after)
+
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            needed = delay + (self.expected_attempt_seconds or 0.0)
+            if needed > remaining:
+                logger.warning(f"{self.name}: giving up, {remaining:.1f}s left but next attempt needs ~{needed:.1f}s")
+                return None
+
+        if not self.budget.try_acquire():
+            logger.warning(f"{self.name}: retry budget exhausted, not retrying")
+            return None
+        return delay
+
+
+def is_retryable_error(e: Exception) -> bool:
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_STATUS_CODES
+    message = str(e)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or "UNAVAILABLE" in message
+
+
+def retry_after_seconds(e: Exception) -> float | None:
+    """
+    Extracts a server-provided retry delay from a Retry-After header or a
+    google.rpc.RetryInfo detail ("retryDelay": "12s"), if present.
+    """
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    value = headers.get("retry-after") if headers else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    details = getattr(e, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", {}).get("details", [])
+    if isinstance(details, list):
+        for detail in details:
+            if isinstance(detail, dict):
+                match = _DURATION_RE.match(str(detail.get("retryDelay", "")))
+                if match:
+                    return float(match.group(1))
+    return None
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight execution.
+
+    The first caller for a key starts the work as a task; callers arriving while it
+    runs await the same task and receive the same result (or exception). The key is
+    released as soon as the task finishes, so later calls start fresh.
+
+    Callers are shielded from each other: a cancelled caller (e.g. a disconnected
+    client) does not cancel the shared work for the others.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"leaders": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._flights.get(key)
+        if task is None:
+            self._stats["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda t, k=key: self._release(k, t))
+        else:
+            self._stats["shared"] += 1
+            logger.info(f"{self.name}: joined in-flight call for {str(key)[:32]}")
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        self._flights.pop(key, None)
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"{self.name}: shared call for {str(key)[:32]} failed: {task.exception()}")
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._flights)}
@@ -1 +1,3 @@
-from .storage_service import save_image, get_file_bytes, generate_signed_url, upload_file
+from .storage_service import save_image, save_image_bytes, get_file_bytes, generate_signed_url, upload_file
+from .media_cache import image_cache, video_cache, media_cache_key, digest_bytes
+from . import async_storage
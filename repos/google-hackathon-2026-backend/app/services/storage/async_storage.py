@@ -0,0 +1,73 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict
+
+from app.services.storage import storage_service
+
+logger = logging.getLogger(__name__)
+
+# The GCS client is synchronous. Calls run on a dedicated, bounded pool so that
+# uploads neither block the event loop nor starve the default executor used by
+# asyncio.to_thread elsewhere.
+GCS_IO_WORKERS = int(os.getenv("GCS_IO_WORKERS", "8"))
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_stats = {"calls": 0, "in_flight": 0, "errors": 0}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=GCS_IO_WORKERS, thread_name_prefix="gcs-io")
+    return _executor
+
+
+async def _run(func: Callable, *args, **kwargs):
+    _stats["calls"] += 1
+    _stats["in_flight"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+    except Exception:
+        _stats["errors"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+
+
+async def save_image(file: BinaryIO, filename: str, content_type: str, user_id: int | str = None, folder: str = None) -> str:
+    return await _run(storage_service.save_image, file, filename, content_type, user_id=user_id, folder=folder)
+
+
+async def save_image_bytes(data: bytes, filename: str, content_type: str, user_id: int | str = None, folder: str = None) -> str:
+    return await _run(storage_service.save_image_bytes, data, filename, content_type, user_id=user_id, folder=folder)
+
+
+async def generate_signed_url(gs_uri: str, expiration_minutes: int = 60) -> str:
+    return await _run(storage_service.generate_signed_url, gs_uri, expiration_minutes)
+
+
+async def get_file_bytes(gs_uri: str) -> bytes | None:
+    return await _run(storage_service.get_file_bytes, gs_uri)
+
+
+async def upload_file(file_obj, filename, content_type):
+    return await _run(storage_service.upload_file, file_obj, filename, content_type)
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def stats() -> Dict[str, Any]:
+    return {**_stats, "workers": GCS_IO_WORKERS}
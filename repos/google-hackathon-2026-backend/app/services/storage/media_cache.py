@@ -0,0 +1,105 @@
+import datetime
+import hashlib
+import logging
+import os
+from typing import Any, Dict
+
+from app.database import SessionLocal
+from app.models.models import MediaCacheEntry
+
+logger = logging.getLogger(__name__)
+
+CACHE_POLICIES = ("reuse", "refresh", "off")
+
+
+def digest_bytes(data: bytes | None) -> str:
+    return hashlib.sha256(data).hexdigest() if data else "none"
+
+
+def media_cache_key(*parts: str | bytes | None) -> str:
+    """
+    Content-addressed key over the generation inputs (model, prompt, image digests, ...).
+    bytes parts are hashed first so the key never depends on how large they are.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            part = digest_bytes(bytes(part))
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class MediaCache:
+    """
+    Local index (SQLite `media_cache` table) from generation-input digests to generated
+    objects already stored in GCS, so identical requests reuse the stored result.
+
+    Policies (<KIND>_CACHE_POLICY):
+      reuse   - return a cached object if it is younger than <KIND>_CACHE_MAX_AGE_HOURS
+      refresh - always generate, but record the new result
+      off     - neither look up nor record
+    """
+    def __init__(self, kind: str, default_max_age_hours: int):
+        self.kind = kind
+        prefix = kind.upper()
+        self.policy = os.getenv(f"{prefix}_CACHE_POLICY", "reuse").lower()
+        if self.policy not in CACHE_POLICIES:
+            logger.warning(f"Unknown {prefix}_CACHE_POLICY '{self.policy}', using 'reuse'")
+            self.policy = "reuse"
+        self.max_age = datetime.timedelta(hours=float(os.getenv(f"{prefix}_CACHE_MAX_AGE_HOURS", str(default_max_age_hours))))
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+
+    def lookup(self, key: str) -> str | None:
+        """
+        Returns the gs:// URI of a reusable result for key, or None.
+        """
+        if self.policy != "reuse":
+            return None
+
+        db = SessionLocal()
+        try:
+            entry = db.query(MediaCacheEntry).filter(MediaCacheEntry.key == key).first()
+            now = datetime.datetime.utcnow()
+            if not entry or (entry.created_at and now - entry.created_at > self.max_age):
+                self._stats["misses"] += 1
+                return None
+
+            entry.hit_count = (entry.hit_count or 0) + 1
+            entry.last_used_at = now
+            db.commit()
+            self._stats["hits"] += 1
+            logger.info(f"{self.kind} cache hit: {key[:16]} -> {entry.gs_uri}")
+            return entry.gs_uri
+        except Exception as e:
+            logger.warning(f"{self.kind} cache lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def store(self, key: str, gs_uri: str, model: str):
+        if self.policy == "off" or not gs_uri.startswith("gs://"):
+            return
+
+        db = SessionLocal()
+        try:
+            entry = db.query(MediaCacheEntry).filter(MediaCacheEntry.key == key).first()
+            if entry is None:
+                entry = MediaCacheEntry(key=key, kind=self.kind, hit_count=0)
+                db.add(entry)
+            entry.model = model
+            entry.gs_uri = gs_uri
+            entry.created_at = datetime.datetime.utcnow()
+            db.commit()
+            self._stats["stores"] += 1
+        except Exception as e:
+            logger.warning(f"{self.kind} cache store failed: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "policy": self.policy, "max_age_hours": self.max_age.total_seconds() / 3600}
+
+
+image_cache = MediaCache("image", default_max_age_hours=24 * 7)
+video_cache = MediaCache("video", default_max_age_hours=24 * 30)
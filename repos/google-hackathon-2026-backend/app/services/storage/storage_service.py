@@ -19,7 +19,18 @@ except Exception as e:
     storage_client = None
     bucket = None
 
-def save_image(file: BinaryIO, filename: str, content_type: str, user_id: int | str = None) -> str:
+def _new_blob_name(filename: str, user_id: int | str = None, folder: str = None) -> str:
+    # Generate a unique filename using UUID and timestamp
+    unique_id = uuid.uuid4()
+    timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+
+    # Organize by user_id if provided, else put in a 'common' folder
+    prefix = f"user_{user_id}" if user_id else "common"
+    if folder:
+        prefix = f"{prefix}/{folder}"
+    return f"{prefix}/{timestamp}_{unique_id}_{filename}"
+
+def save_image(file: BinaryIO, filename: str, content_type: str, user_id: int | str = None, folder: str = None) -> str:
     """
     Saves an image file to Google Cloud Storage.
     Returns the gs:// URI.
@@ -29,14 +40,7 @@ def save_image(file: BinaryIO, filename: str, content_type: str, user_id: int |
         raise Exception("GCS bucket not initialized.")
 
     try:
-        # Generate a unique filename using UUID and timestamp
-        unique_id = uuid.uuid4()
-        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-        
-        # Organize by user_id if provided, else put in a 'common' folder
-        folder = f"user_{user_id}" if user_id else "common"
-        blob_name = f"{folder}/{timestamp}_{unique_id}_{filename}"
-        
+        blob_name = _new_blob_name(filename, user_id, folder)
         blob = bucket.blob(blob_name)
         blob.upload_from_file(file, content_type=content_type)
         
@@ -49,6 +53,29 @@ def save_image(file: BinaryIO, filename: str, content_type: str, user_id: int |
         logger.error(traceback.format_exc())
         raise e
 
+def save_image_bytes(data: bytes, filename: str, content_type: str, user_id: int | str = None, folder: str = None) -> str:
+    """
+    Same as save_image, but uploads in-memory bytes directly (no file object wrapper or extra copy).
+    Returns the gs:// URI.
+    """
+    if not bucket:
+        logger.error("GCS bucket not initialized.")
+        raise Exception("GCS bucket not initialized.")
+
+    try:
+        blob_name = _new_blob_name(filename, user_id, folder)
+        blob = bucket.blob(blob_name)
+        blob.upload_from_string(data, content_type=content_type)
+
+        gs_uri = f"gs://{bucket_name}/{blob_name}"
+        logger.info(f"File uploaded to {gs_uri} ({len(data)} bytes)")
+        return gs_uri
+
+    except Exception as e:
+        logger.error(f"Failed to upload bytes to GCS: {e}")
+        logger.error(traceback.format_exc())
+        raise e
+
 def generate_signed_url(gs_uri: str, expiration_minutes: int = 60) -> str:
     """
     Generates a signed URL for a GCS object.
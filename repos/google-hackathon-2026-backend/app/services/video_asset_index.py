@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import time
+import traceback
+import unicodedata
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+SpotQuery = tuple[str, float | None, float | None]  # (spot name, lat, lng)
+
+_LATIN_RE = re.compile(r"[a-z0-9]+")
+_CJK_RE = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+")
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# BM25 parameters; poi_name terms count POI_NAME_WEIGHT times against keyword terms
+BM25_K1 = 1.2
+BM25_B = 0.75
+POI_NAME_WEIGHT = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Latin words plus character bigrams of Japanese runs (which have no word boundaries).
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    tokens = _LATIN_RE.findall(text)
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> tuple[float, float]:
+    """(lat, lng) span of a cell in degrees."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def haversine_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * 6371000 * math.asin(math.sqrt(a))
+
+
+@dataclass
+class VideoAsset:
+    video_id: str
+    video_url: str
+    platform: str | None = None
+    poi_name: str | None = None
+    keywords: List[str] = field(default_factory=list)
+    lat: float | None = None
+    lng: float | None = None
+
+
+class _Snapshot:
+    """
+    Immutable index over one export; replaced as a whole on refresh so lookups need no lock.
+    """
+    def __init__(self, assets: List[VideoAsset], precision: int):
+        self.assets = assets
+        self.precision = precision
+        self.postings: Dict[str, List[tuple[int, int]]] = defaultdict(list)  # token -> [(doc, weighted tf)]
+        self.doc_lengths: List[int] = []
+        self.cells: Dict[str, List[int]] = defaultdict(list)  # geohash -> docs
+
+        for doc, asset in enumerate(assets):
+            tf: Dict[str, int] = defaultdict(int)
+            for token in tokenize(asset.poi_name or ""):
+                tf[token] += POI_NAME_WEIGHT
+            for token in tokenize(" ".join(asset.keywords)):
+                tf[token] += 1
+            for token, count in tf.items():
+                self.postings[token].append((doc, count))
+            self.doc_lengths.append(sum(tf.values()))
+            if asset.lat is not None and asset.lng is not None:
+                self.cells[geohash_encode(asset.lat, asset.lng, precision)].append(doc)
+
+        n = len(assets)
+        self.avg_doc_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {token: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for token, p in self.postings.items()}
+        # Terms missing from the corpus weigh like the rarest term when normalizing scores
+        self.max_idf = math.log(1 + (n + 0.5) / 0.5) if n else 0.0
+
+    def text_scores(self, tokens: List[str]) -> tuple[Dict[int, float], float]:
+        """BM25 per matching doc, and the score's upper bound for these tokens (for normalization)."""
+        scores: Dict[int, float] = defaultdict(float)
+        upper = 0.0
+        for token in set(tokens):
+            idf = self.idf.get(token)
+            upper += (idf if idf is not None else self.max_idf) * (BM25_K1 + 1)
+            if idf is None:
+                continue
+            for doc, tf in self.postings[token]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / self.avg_doc_length)
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores, upper
+
+    def nearby(self, lat: float, lng: float, radius_meters: float) -> Dict[int, float]:
+        """Docs within radius_meters of the point, searched in the 3x3 cells around it -> distance."""
+        dlat, dlng = geohash_cell_size(self.precision)
+        cells = {
+            geohash_encode(max(-90.0, min(90.0, lat + i * dlat)), (lng + j * dlng + 180.0) % 360.0 - 180.0, self.precision)
+            for i in (-1, 0, 1)
+            for j in (-1, 0, 1)
+        }
+        found = {}
+        for cell in cells:
+            for doc in self.cells.get(cell, ()):
+                asset = self.assets[doc]
+                distance = haversine_meters(lat, lng, asset.lat, asset.lng)
+                if distance <= radius_meters:
+                    found[doc] = distance
+        return found
+
+
+class VideoAssetIndex:
+    """
+    In-process search index over an export of the BigQuery VideoAssets table: BM25 over
+    poi_name and keywords plus a geohash grid over location. It answers short-video
+    lookups for itinerary spots locally; callers fall back to Discovery Engine on a miss.
+
+    The export is kept as JSON Lines at VIDEO_ASSETS_EXPORT_PATH so restarts load it
+    without a BigQuery query, and it is refreshed from BigQuery in the background.
+    """
+    def __init__(self):
+        self.enabled = os.getenv("VIDEO_INDEX_ENABLED", "true").lower() == "true"
+        self.export_path = os.getenv("VIDEO_ASSETS_EXPORT_PATH", "./cache/video_assets.jsonl")
+        self.refresh_interval_seconds = float(os.getenv("VIDEO_INDEX_REFRESH_HOURS", "6")) * 3600
+        # Precision 6 cells are ~610m x ~1km, so the 3x3 neighbourhood covers radii up to ~600m
+        self.geohash_precision = int(os.getenv("VIDEO_INDEX_GEOHASH_PRECISION", "6"))
+        self.geo_radius_meters = float(os.getenv("VIDEO_INDEX_GEO_RADIUS_METERS", "500"))
+        self.geo_weight = float(os.getenv("VIDEO_INDEX_GEO_WEIGHT", "0.5"))
+        self.min_text_score = float(os.getenv("VIDEO_INDEX_MIN_TEXT_SCORE", "0.3"))
+        self.per_spot = int(os.getenv("VIDEO_INDEX_RESULTS_PER_SPOT", "2"))
+
+        self._snapshot: _Snapshot | None = None
+        self._loaded_at: float | None = None
+        self._source: str | None = None
+        self._task: asyncio.Task | None = None
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0, "total_lookup_ms": 0.0}
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        if not self.enabled:
+            logger.info("Video asset index disabled (VIDEO_INDEX_ENABLED=false)")
+            return
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        if os.path.exists(self.export_path):
+            try:
+                await self.load_async(await asyncio.to_thread(self._read_export), source="file")
+            except Exception as e:
+                logger.warning(f"Failed to load video asset export {self.export_path}: {e}")
+        while True:
+            age = time.time() - os.path.getmtime(self.export_path) if os.path.exists(self.export_path) else None
+            if self._snapshot is None or age is None or age >= self.refresh_interval_seconds:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    self._stats["refresh_failures"] += 1
+                    logger.error(f"Video asset index refresh failed: {e}")
+                    logger.error(traceback.format_exc())
+                age = 0.0
+            await asyncio.sleep(max(60.0, self.refresh_interval_seconds - age))
+
+    # --- Loading ---
+
+    def _read_export(self) -> List[VideoAsset]:
+        assets = []
+        with open(self.export_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    assets.append(VideoAsset(**json.loads(line)))
+        return assets
+
+    def _write_export(self, assets: List[VideoAsset]):
+        directory = os.path.dirname(self.export_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for asset in assets:
+                    f.write(json.dumps(asdict(asset), ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.export_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    async def refresh(self):
+        """
+        Exports VideoAssets from BigQuery, rebuilds the index and rewrites the local export.
+        """
+        assets = await asyncio.to_thread(self._export_from_bigquery)
+        await self.load_async(assets, source="bigquery")
+        await asyncio.to_thread(self._write_export, assets)
+        self._stats["refreshes"] += 1
+
+    @staticmethod
+    def _export_from_bigquery() -> List[VideoAsset]:
+        from app.services.bigquery_service import BigQueryService
+
+        rows = BigQueryService().export_video_assets()
+        return [VideoAsset(**row) for row in rows if row.get("video_url")]
+
+    def _install(self, snapshot: _Snapshot, source: str, build_seconds: float):
+        self._snapshot = snapshot
+        self._loaded_at = time.time()
+        self._source = source
+        logger.info(f"Video asset index built from {source}: {len(snapshot.assets)} assets in {build_seconds * 1000:.0f}ms")
+
+    def load(self, assets: List[VideoAsset], source: str = "memory"):
+        """Builds and installs a new snapshot. Blocking; use load_async on the event loop."""
+        start = time.monotonic()
+        self._install(_Snapshot(assets, self.geohash_precision), source, time.monotonic() - start)
+
+    async def load_async(self, assets: List[VideoAsset], source: str = "memory"):
+        """Builds the snapshot in a worker thread and swaps it in on the loop."""
+        start = time.monotonic()
+        snapshot = await asyncio.to_thread(_Snapshot, assets, self.geohash_precision)
+        self._install(snapshot, source, time.monotonic() - start)
+
+    # --- Lookup ---
+
+    def _lookup_spot(self, snapshot: _Snapshot, name: str, lat: float | None, lng: float | None) -> List[int]:
+        scores, upper = snapshot.text_scores(tokenize(name))
+        combined = {doc: score / upper for doc, score in scores.items() if upper and score / upper >= self.min_text_score}
+        if lat is not None and lng is not None:
+            for doc, distance in snapshot.nearby(lat, lng, self.geo_radius_meters).items():
+                text = scores.get(doc, 0.0) / upper if upper else 0.0
+                combined[doc] = text + self.geo_weight * (1 - distance / self.geo_radius_meters)
+        return sorted(combined, key=combined.get, reverse=True)[:self.per_spot]
+
+    def search(self, spots: List[SpotQuery], limit: int = 5) -> List[str]:
+        """
+        Returns up to `limit` video URLs for the given spots, taking the best matches of
+        each spot in turn so the videos cover the whole itinerary. [] when nothing
+        matched or the index is not loaded yet.
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not spots:
+            return []
+
+        start = time.perf_counter()
+        per_spot = [self._lookup_spot(snapshot, name, lat, lng) for name, lat, lng in spots if name or lat is not None]
+        urls: List[str] = []
+        for rank in range(self.per_spot):
+            for docs in per_spot:
+                if rank < len(docs):
+                    url = snapshot.assets[docs[rank]].video_url
+                    if url not in urls:
+                        urls.append(url)
+        urls = urls[:limit]
+
+        self._stats["lookups"] += 1
+        self._stats["hits" if urls else "misses"] += 1
+        self._stats["total_lookup_ms"] += (time.perf_counter() - start) * 1000
+        return urls
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["lookups"]
+        snapshot = self._snapshot
+        return {
+            **self._stats,
+            "total_lookup_ms": round(self._stats["total_lookup_ms"], 3),
+            "avg_lookup_ms": round(self._stats["total_lookup_ms"] / lookups, 4) if lookups else None,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else None,
+            "assets": len(snapshot.assets) if snapshot else 0,
+            "terms": len(snapshot.postings) if snapshot else 0,
+            "geo_cells": len(snapshot.cells) if snapshot else 0,
+            "source": self._source,
+            "loaded_at": self._loaded_at,
+        }
+
+
+video_asset_index = VideoAssetIndex()
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -20,7 +22,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(fastapi_app: FastAPI):
+    logger.info("Application starting up...")
+    from app.services.gemini import client_registry
+    from app.services import http_client
+    from app.services.jobs import job_manager, teaser_scheduler
+    from app.services.storage import async_storage
+    from app.services.gemini.video_operation_tracker import video_operation_tracker
+    from app.services.discovery_engine_service import discovery_engine_service
+    from app.services.video_asset_index import video_asset_index
+    from app.services.cache import persist_writer
+    from app.services.places.places_cache import place_photo_cache, place_photo_names_cache
+
+    # Read the persisted lookup caches before serving so the first lookups after a restart hit
+    await asyncio.gather(*(asyncio.to_thread(cache.load) for cache in (place_photo_cache, place_photo_names_cache)))
+    client_registry.startup()
+    http_client.startup()
+    discovery_engine_service.startup()
+    await job_manager.start()
+    await video_operation_tracker.start()
+    await teaser_scheduler.start()
+    await video_asset_index.start()
+    yield
+    logger.info("Application shutting down...")
+    await teaser_scheduler.stop()
+    await video_asset_index.stop()
+    await job_manager.stop()
+    await video_operation_tracker.stop()
+    await client_registry.shutdown()
+    await http_client.shutdown()
+    discovery_engine_service.shutdown()
+    async_storage.shutdown()
+    await asyncio.to_thread(persist_writer.flush)
+
 app = FastAPI(
+    lifespan=lifespan,
     title="AI Travel Experience Designer API",
     description="Backend API for generating travel proposals and video previews using Google Gemini.",
     version="0.1.0"
@@ -30,11 +67,6 @@ app = FastAPI(
 os.makedirs("static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Log server startup
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application starting up...")
-
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
@@ -52,7 +84,7 @@ async def validation_exception_handler(request, exc):
     )
 
 
-from app.api.endpoints import plan, media, search, report, places, auth, users, social
+from app.api.endpoints import plan, media, search, report, places, auth, users, social, jobs, metrics
 app.include_router(plan.router, prefix="/api/v1/plan", tags=["plan"])
 app.include_router(media.router, prefix="/api/v1/media", tags=["media"])
 app.include_router(search.router, prefix="/api/v1/search", tags=["search"])
@@ -61,6 +93,8 @@ app.include_router(places.router, prefix="/api/v1/places", tags=["places"])
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(social.router, prefix="/api/v1/social", tags=["social"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
 
 # CORS Configuration
 origins = [
@@ -0,0 +1,70 @@
+"""
+Measures the per-call overhead removed by the shared genai client registry.
+
+Compares building a new genai.Client(vertexai=True) per call (the old behaviour of
+ImageService / VideoService) with looking up the shared client. With --call, each
+iteration also sends a count_tokens request so connection setup is included.
+
+Usage (from the backend directory, with .env configured):
+    python scripts/bench_genai_client.py --iterations 20 [--call]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from google import genai
+
+from app.services.gemini import client_registry
+
+MODEL = "gemini-2.5-flash-lite"
+
+
+async def one_call(client: genai.Client):
+    await client.aio.models.count_tokens(model=MODEL, contents="ping")
+
+
+async def run(iterations: int, call: bool) -> dict[str, list[float]]:
+    timings = {"new_client": [], "shared_client": []}
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        client = genai.Client(vertexai=True)
+        if call:
+            await one_call(client)
+        timings["new_client"].append(time.perf_counter() - start)
+
+    client_registry.startup()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        client = client_registry.get_genai_client()
+        if call:
+            await one_call(client)
+        timings["shared_client"].append(time.perf_counter() - start)
+
+    await client_registry.shutdown()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--call", action="store_true", help="Also send a count_tokens request per iteration")
+    args = parser.parse_args()
+
+    load_dotenv()
+    timings = asyncio.run(run(args.iterations, args.call))
+    for name, values in timings.items():
+        print(f"{name:>14}: mean {statistics.mean(values) * 1000:8.2f} ms, "
+              f"p50 {statistics.median(values) * 1000:8.2f} ms, max {max(values) * 1000:8.2f} ms")
+    saved = statistics.mean(timings["new_client"]) - statistics.mean(timings["shared_client"])
+    print(f"Overhead removed per call: {saved * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
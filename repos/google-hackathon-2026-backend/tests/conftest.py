@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Import the app from the repository root and keep test data out of ./app.db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(prefix="backend-tests-"), "test.db"))
@@ -0,0 +1,89 @@
+import threading
+import time
+import uuid
+
+from app.database import Base, engine
+from app.models import models  # noqa: F401  (registers the tables)
+from app.services.cache import MISSING, LRUTTLCache, persist_writer
+
+Base.metadata.create_all(bind=engine)
+
+
+def make_cache(namespace, **kwargs):
+    return LRUTTLCache(namespace, max_entries=kwargs.pop("max_entries", 10), ttl_seconds=60, negative_ttl_seconds=5, **kwargs)
+
+
+def test_entries_survive_a_restart():
+    namespace = f"test-{uuid.uuid4().hex}"
+    cache = make_cache(namespace)
+    cache.set("found", {"photo_name": "places/a/photos/b"})
+    cache.set("not_found", None)
+    persist_writer.flush()
+
+    restarted = make_cache(namespace)
+    restarted.load()  # as the lifespan startup does
+    assert restarted.get("found") == {"photo_name": "places/a/photos/b"}
+    assert restarted.get("not_found") is None
+
+
+def test_lazy_load_on_first_use():
+    namespace = f"test-{uuid.uuid4().hex}"
+    make_cache(namespace).set("found", {"photo_name": "places/a/photos/b"})
+    persist_writer.flush()
+
+    restarted = make_cache(namespace)
+    assert restarted.get("found") is MISSING  # not loaded at startup: loads in the background
+    persist_writer.flush()
+    assert restarted.get("found") == {"photo_name": "places/a/photos/b"}
+
+
+def test_get_and_set_do_not_wait_for_sqlite(monkeypatch):
+    release = threading.Event()
+    original_apply = persist_writer._apply
+
+    def slow_apply(ops):
+        release.wait(5)
+        original_apply(ops)
+
+    monkeypatch.setattr(persist_writer, "_apply", slow_apply)
+    cache = make_cache(f"test-{uuid.uuid4().hex}")
+
+    start = time.monotonic()
+    for i in range(100):
+        cache.set(f"k{i}", i)
+        assert cache.get(f"k{i}") == i
+    elapsed = time.monotonic() - start
+
+    release.set()
+    persist_writer.flush()
+    assert elapsed < 0.5
+
+
+def test_writes_are_batched():
+    cache = make_cache(f"test-{uuid.uuid4().hex}", max_entries=100)
+    persist_writer.flush()
+    before = persist_writer.stats()
+
+    hold = threading.Event()
+    persist_writer.submit(("load", type("Blocker", (), {"_load": lambda self: hold.wait(5)})()))
+    for i in range(50):
+        cache.set(f"k{i}", i)
+    hold.set()
+    persist_writer.flush()
+
+    after = persist_writer.stats()
+    assert after["writes"] - before["writes"] == 50
+    assert after["batches"] - before["batches"] <= 2
+
+
+def test_memory_entries_win_over_loaded_ones():
+    namespace = f"test-{uuid.uuid4().hex}"
+    cache = make_cache(namespace)
+    cache.set("k", "old")
+    persist_writer.flush()
+
+    restarted = make_cache(namespace, persist=True)
+    restarted.set("k", "new")
+    persist_writer.flush()
+    assert restarted.get("k") == "new"
+    assert persist_writer.stats()["errors"] == 0
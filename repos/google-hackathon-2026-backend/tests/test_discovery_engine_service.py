@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+import types
+
+import pytest
+
+from app.services import discovery_engine_service as module
+from app.services.cache import LRUTTLCache
+from app.services.discovery_engine_service import DiscoveryEngineService, normalize_query
+from app.services.singleflight import SingleFlight
+
+
+class FakeSearchClient:
+    """Stand-in for SearchServiceClient; search() blocks like the gRPC call."""
+
+    def __init__(self, urls=None, fail=False, delay=0.0):
+        self.urls = urls or []
+        self.fail = fail
+        self.delay = delay
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def serving_config_path(self, **kwargs):
+        return "projects/p/locations/global/dataStores/d/servingConfigs/default_config"
+
+    def search(self, request):
+        with self._lock:
+            self.queries.append(request.query)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("503 unavailable")
+        return types.SimpleNamespace(results=[
+            types.SimpleNamespace(document=types.SimpleNamespace(struct_data={"video_url": url})) for url in self.urls
+        ])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(module, "search_cache", LRUTTLCache("test_discovery", max_entries=10, ttl_seconds=60, negative_ttl_seconds=60, persist=False))
+    monkeypatch.setattr(module, "search_flight", SingleFlight("test_discovery"))
+
+    def make(**kwargs):
+        svc = DiscoveryEngineService()
+        svc._client = FakeSearchClient(**kwargs)
+        return svc
+
+    return make
+
+
+def test_normalized_queries_hit_the_cache(service):
+    svc = service(urls=["https://v/1"])
+
+    async def run():
+        return [await svc.search_video_urls(q) for q in ("京都 紅葉", "京都　紅葉", " 京都 紅葉 ")]
+
+    assert asyncio.run(run()) == [["https://v/1"]] * 3
+    assert normalize_query("京都　紅葉") == "京都 紅葉"
+    assert len(svc.client.queries) == 1
+    assert module.search_cache.stats()["hits"] == 2
+
+
+def test_empty_results_are_cached(service):
+    svc = service(urls=[])
+
+    async def run():
+        return [await svc.search_video_urls("nothing") for _ in range(2)]
+
+    assert asyncio.run(run()) == [[], []]
+    assert len(svc.client.queries) == 1
+
+
+def test_concurrent_identical_searches_share_one_call(service):
+    svc = service(urls=["https://v/1"], delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*[svc.search_video_urls("京都") for _ in range(5)])
+
+    assert asyncio.run(run()) == [["https://v/1"]] * 5
+    assert len(svc.client.queries) == 1
+
+
+def test_errors_are_not_cached(service):
+    svc = service(urls=["https://v/1"], fail=True)
+
+    async def run():
+        first = await svc.search_video_urls("京都")
+        svc.client.fail = False
+        return first, await svc.search_video_urls("京都")
+
+    assert asyncio.run(run()) == ([], ["https://v/1"])
+    assert len(svc.client.queries) == 2
+
+
+def test_client_is_created_once_and_closed_on_shutdown(monkeypatch):
+    created = []
+
+    class Client(FakeSearchClient):
+        def __init__(self):
+            super().__init__()
+            self.transport = types.SimpleNamespace(close=lambda: created.append("closed"))
+            created.append("created")
+
+    monkeypatch.setattr(module.discoveryengine, "SearchServiceClient", Client)
+    svc = DiscoveryEngineService()
+
+    svc.startup()
+    assert svc.client is svc.client
+    svc.shutdown()
+
+    assert created == ["created", "closed"]
@@ -0,0 +1,55 @@
+import os
+
+from app.services.disk_cache import DiskByteCache
+
+
+def test_round_trip(tmp_path):
+    cache = DiskByteCache(str(tmp_path), max_bytes=1024)
+    assert cache.get("a") is None
+
+    cache.put("a", b"photo bytes")
+    cache.put("empty", b"")
+
+    assert cache.get("a") == b"photo bytes"
+    assert cache.get("empty") == b""
+    with open(cache.get_path("a"), "rb") as f:
+        assert f.read() == b"photo bytes"
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskByteCache(str(tmp_path), max_bytes=20)
+    cache.put("a", b"x" * 8)
+    cache.put("b", b"x" * 8)
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", b"x" * 8)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert not os.path.exists(cache.path_for(cache.digest("b")))
+    assert cache.stats()["bytes"] == 16
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    cache = DiskByteCache(str(tmp_path), max_bytes=1024)
+    cache.put("a", b"12345")
+    leftover = os.path.join(os.path.dirname(cache.path_for(cache.digest("a"))), ".tmpleftover")
+    with open(leftover, "wb") as f:
+        f.write(b"partial")
+
+    restarted = DiskByteCache(str(tmp_path), max_bytes=1024)
+
+    assert restarted.get("a") == b"12345"
+    assert restarted.stats()["bytes"] == 5
+    assert not os.path.exists(leftover)
+
+
+def test_file_removed_behind_the_index_is_a_miss(tmp_path):
+    cache = DiskByteCache(str(tmp_path), max_bytes=1024)
+    cache.put("a", b"12345")
+    os.unlink(cache.path_for(cache.digest("a")))
+
+    assert cache.get("a") is None
+    assert cache.stats()["files"] == 0
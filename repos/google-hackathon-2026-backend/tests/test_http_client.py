@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+
+from app.services.http_client import _InstrumentedTransport
+
+
+class SlowBodyTransport(httpx.AsyncBaseTransport):
+    """Returns headers right away and then streams the body slowly."""
+
+    def __init__(self):
+        self.active_bodies = 0
+        self.max_active_bodies = 0
+
+    async def handle_async_request(self, request):
+        transport = self
+
+        class Body(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                transport.active_bodies += 1
+                transport.max_active_bodies = max(transport.max_active_bodies, transport.active_bodies)
+                try:
+                    for _ in range(3):
+                        await asyncio.sleep(0.01)
+                        yield b"x"
+                finally:
+                    transport.active_bodies -= 1
+
+        return httpx.Response(200, stream=Body())
+
+
+def test_per_host_cap_covers_body_transfer():
+    inner = SlowBodyTransport()
+    transport = _InstrumentedTransport(inner, max_requests_per_host=2)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            responses = await asyncio.gather(*[client.get("https://example.com/") for _ in range(6)])
+        return [r.content for r in responses]
+
+    assert asyncio.run(run()) == [b"xxx"] * 6
+    assert inner.max_active_bodies == 2
+    assert transport.stats["requests"] == 6
+
+
+def test_slot_is_released_when_stream_is_closed_unread():
+    inner = SlowBodyTransport()
+    transport = _InstrumentedTransport(inner, max_requests_per_host=1)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(3):
+                async with client.stream("GET", "https://example.com/") as response:
+                    assert response.status_code == 200
+            return (await client.get("https://example.com/")).content
+
+    assert asyncio.run(asyncio.wait_for(run(), 2)) == b"xxx"
+
+
+def test_shared_client_is_reused_until_shutdown():
+    from app.services import http_client
+    from app.services.places import places_client
+
+    async def run():
+        first = http_client.get_http_client()
+        assert http_client.get_http_client() is first
+        # The Places client takes the shared pooled client instead of building its own
+        assert places_client.get_http_client is http_client.get_http_client
+        await http_client.shutdown()
+        second = http_client.get_http_client()
+        await http_client.shutdown()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+
+
+def test_requests_are_counted_per_host():
+    class OkTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            return httpx.Response(200, content=b"ok")
+
+    transport = _InstrumentedTransport(OkTransport(), max_requests_per_host=2)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://a.example.com/")
+            await client.get("https://a.example.com/")
+            await client.get("https://b.example.com/")
+
+    asyncio.run(run())
+    assert transport.stats["requests"] == 3
+    assert dict(transport.host_requests) == {"a.example.com": 2, "b.example.com": 1}
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+from app.services.gemini import image_service
+from app.services.gemini.image_service import NUM_TRAVEL_IMAGES, ImageService
+
+THEMES_SECONDS = 0.3
+PHOTO_SEARCH_SECONDS = 0.2
+PHOTO_FETCH_SECONDS = 0.1
+IMAGE_SECONDS = 0.3
+
+
+def make_service(monkeypatch, image_starts):
+    service = ImageService()
+    service.use_mock = False
+    service.is_initialized = True
+
+    async def extract_themes(destination, description):
+        await asyncio.sleep(THEMES_SECONDS)
+        return [f"theme {i}" for i in range(NUM_TRAVEL_IMAGES)]
+
+    async def search_place_photo_names(destination, limit=1):
+        await asyncio.sleep(PHOTO_SEARCH_SECONDS)
+        return [f"places/p/photos/{i}" for i in range(limit)]
+
+    async def fetch_place_photo(name, max_px=1024):
+        await asyncio.sleep(PHOTO_FETCH_SECONDS)
+        return name.encode()
+
+    async def generate_travel_image(destination, theme, user_image_url=None, user_id=None, reference_image_bytes=None, cache_scope=None):
+        image_starts.append(time.monotonic())
+        await asyncio.sleep(IMAGE_SECONDS)
+        return f"https://example.com/{theme}/{reference_image_bytes.decode()}"
+
+    monkeypatch.setattr(service, "_extract_themes", extract_themes)
+    monkeypatch.setattr(service, "generate_travel_image", generate_travel_image)
+    monkeypatch.setattr(image_service, "search_place_photo_names", search_place_photo_names)
+    monkeypatch.setattr(image_service, "fetch_place_photo", fetch_place_photo)
+    return service
+
+
+def test_total_time_is_the_critical_path(monkeypatch):
+    image_starts = []
+    service = make_service(monkeypatch, image_starts)
+
+    start = time.monotonic()
+    urls = asyncio.run(service.generate_travel_images("Kyoto", "autumn temples"))
+    elapsed = time.monotonic() - start
+
+    sequential = THEMES_SECONDS + PHOTO_SEARCH_SECONDS + PHOTO_FETCH_SECONDS + IMAGE_SECONDS
+    critical_path = max(THEMES_SECONDS, PHOTO_SEARCH_SECONDS + PHOTO_FETCH_SECONDS) + IMAGE_SECONDS
+
+    assert urls == [f"https://example.com/theme {i}/places/p/photos/{i}" for i in range(NUM_TRAVEL_IMAGES)]
+    assert critical_path - 0.02 <= elapsed < critical_path + 0.15
+    assert elapsed < sequential - 0.15
+    # Every image starts once both of its inputs are ready, not after a later stage
+    for image_start in image_starts:
+        assert image_start - start < max(THEMES_SECONDS, PHOTO_SEARCH_SECONDS + PHOTO_FETCH_SECONDS) + 0.1
+
+
+def test_failed_image_falls_back_individually(monkeypatch):
+    service = make_service(monkeypatch, [])
+
+    async def flaky(destination, theme, user_image_url=None, user_id=None, reference_image_bytes=None, cache_scope=None):
+        if theme == "theme 0":
+            raise RuntimeError("boom")
+        return "https://example.com/ok"
+
+    monkeypatch.setattr(service, "generate_travel_image", flaky)
+
+    async def collect():
+        return [result async for result in service.iter_travel_images("Kyoto", "autumn temples")]
+
+    results = sorted(asyncio.run(collect()), key=lambda r: r["index"])
+    assert results[0]["url"] == image_service.FALLBACK_IMAGE_URL and results[0]["error"] == "boom"
+    assert results[1] == {"index": 1, "url": "https://example.com/ok", "error": None}
+
+
+def test_cache_key_ignores_theme_and_is_per_user(monkeypatch):
+    service = ImageService()
+    service.use_mock = False
+    service.is_initialized = True
+    keys = []
+
+    async def preprocess_image(data, max_side):
+        return data, "image/jpeg"
+
+    async def generate_signed_url(uri):
+        return uri
+
+    def lookup(key):
+        keys.append(key)
+        return "gs://bucket/cached.png"
+
+    monkeypatch.setattr(image_service, "get_genai_client", lambda: None)
+    monkeypatch.setattr(image_service, "preprocess_image", preprocess_image)
+    monkeypatch.setattr(image_service.storage, "generate_signed_url", generate_signed_url)
+    monkeypatch.setattr(image_service.image_cache, "lookup", lookup)
+
+    async def generate(theme, user_id):
+        return await service.generate_travel_image(
+            "Kyoto", theme, user_id=user_id, reference_image_bytes=b"photo", cache_scope="temples#0",
+        )
+
+    asyncio.run(generate("misty morning temples", 1))
+    asyncio.run(generate("golden hour pagoda", 1))
+    asyncio.run(generate("misty morning temples", 2))
+
+    assert keys[0] == keys[1]
+    assert keys[0] != keys[2]
+
+
+def test_early_exit_settles_every_pipeline_task(monkeypatch):
+    service = make_service(monkeypatch, [])
+
+    async def generate(destination, theme, user_image_url=None, user_id=None, reference_image_bytes=None, cache_scope=None):
+        await asyncio.sleep(0 if theme == "theme 0" else 10)
+        return f"https://example.com/{theme}"
+
+    monkeypatch.setattr(service, "generate_travel_image", generate)
+
+    async def run():
+        stream = service.iter_travel_images("Kyoto", "autumn temples")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    first, leftover = asyncio.run(run())
+
+    assert first["url"].startswith("https://example.com/")
+    assert leftover == []
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import jobs as jobs_endpoint
+from app.database import Base, engine
+from app.models import models  # noqa: F401  (registers the tables)
+from app.services.jobs.job_service import JobManager
+
+Base.metadata.create_all(bind=engine)
+
+
+def test_progress_is_written_off_the_loop_and_final_state_wins():
+    manager = JobManager()
+    manager.num_workers = 1
+    loop_thread = threading.get_ident()
+    update_threads = set()
+    original_update = manager._update
+
+    def update(job_id, **fields):
+        update_threads.add(threading.get_ident())
+        original_update(job_id, **fields)
+
+    manager._update = update
+
+    async def handler(payload, job):
+        for progress in range(0, 100, 10):
+            job.report_progress(progress, "working")
+        await asyncio.sleep(0)
+        return {"ok": True}
+
+    manager.register("test", handler)
+
+    async def run():
+        await manager.start()
+        try:
+            job = await manager.submit("test", {})
+            return await manager.wait(job.id, timeout=5)
+        finally:
+            await manager.stop()
+
+    job = asyncio.run(run())
+
+    assert job.status == "succeeded"
+    assert job.progress == 100
+    assert loop_thread not in update_threads
+
+
+def test_image_job_requires_authentication():
+    app = FastAPI()
+    app.include_router(jobs_endpoint.router, prefix="/jobs")
+
+    response = TestClient(app).post("/jobs/image", json={"proposalId": 1, "title": "京都", "description": "寺"})
+
+    assert response.status_code == 401
@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.gemini.model_router import ModelRouter, is_restructure_request
+
+
+@pytest.fixture
+def router():
+    return ModelRouter()
+
+
+@pytest.mark.parametrize("text", [
+    "2日目のランチを早めて",
+    "1日目の夕食を和食に変えて",
+    "make lunch earlier",
+    "ランチと観光を入れ替えて",
+])
+def test_single_item_edits_on_short_plan_are_fast(router, text):
+    assert router.classify("itinerary_concierge", text, nights=1, item_count=8) == "fast"
+
+
+@pytest.mark.parametrize("text", [
+    "全体をもっとゆったりした日程にして",
+    "1日目と2日目を入れ替えて",
+    "Please restructure the whole trip",
+    "day 1 and day 3 should be reorganized",
+])
+def test_restructuring_edits_are_complex(router, text):
+    assert router.classify("itinerary_concierge", text, nights=1, item_count=8) == "complex"
+
+
+def test_long_plans_are_complex(router):
+    assert router.classify("itinerary_concierge", "ランチを早めて", nights=3, item_count=8) == "complex"
+
+
+def test_long_or_large_single_edits_are_standard(router):
+    text = "2日目の午後に美術館を追加して、その後のカフェは駅の近くのお店に変更してもらえますか、できれば静かなところがいいです"
+    assert router.classify("itinerary_concierge", text, nights=1, item_count=8) == "standard"
+    assert router.classify("itinerary_concierge", "ランチを早めて", nights=1, item_count=15) == "standard"
+
+
+def test_restructure_verb_needs_multi_day_or_length_signal():
+    assert not is_restructure_request("2日目の昼を組み直して")
+    assert is_restructure_request("2日目と3日目を組み直して")
+    assert is_restructure_request("組み直して" + "。" * 80)
+
+
+@pytest.mark.parametrize("agent, kwargs, tier", [
+    ("itinerary_planner", {"nights": 1}, "standard"),
+    ("itinerary_planner", {"nights": 3}, "complex"),
+    ("proposal_designer", {"request_text": "温泉", "nights": 1}, "standard"),
+    ("proposal_designer", {"request_text": "温泉", "nights": 4}, "complex"),
+    ("proposal_designer", {"request_text": "x" * 201, "nights": 1}, "complex"),
+    ("unknown_agent", {}, "standard"),
+])
+def test_other_agents(router, agent, kwargs, tier):
+    assert router.classify(agent, **kwargs) == tier
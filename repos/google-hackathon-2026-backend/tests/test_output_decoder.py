@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from app.services.gemini.output_decoder import ITINERARY_ADAPTER, PROPOSALS_ADAPTER, AgentOutputError, decode_agent_output
+
+
+def proposal(i):
+    return {"id": i, "title": f"Plan {i}", "tagline": "t", "desc": "d", "match": 90, "color": "#fff", "location": "Kyoto"}
+
+
+def test_truncated_array_keeps_complete_elements():
+    full = json.dumps([proposal(1), proposal(2), proposal(3)], ensure_ascii=False)
+    truncated = full[:full.index('"tagline"', full.index('"id": 3'))]
+
+    decoded = decode_agent_output(truncated, PROPOSALS_ADAPTER)
+
+    assert [p["id"] for p in decoded.data] == [1, 2]
+    assert "closed_truncated" in decoded.repairs
+
+
+def test_truncated_inside_nested_string_is_cut_to_last_element():
+    full = json.dumps([proposal(1), proposal(2)], ensure_ascii=False)
+    truncated = full[:full.rindex("Kyoto") + 2]
+
+    decoded = decode_agent_output(truncated, PROPOSALS_ADAPTER)
+
+    assert [p["id"] for p in decoded.data] == [1]
+
+
+def test_truncated_before_first_element_fails_validation():
+    with pytest.raises(AgentOutputError):
+        decode_agent_output('[{"id": 1, "title": "Pl', PROPOSALS_ADAPTER)
+
+
+def test_fence_prose_and_single_quotes_are_repaired():
+    text = "Here you go:\n```json\n[{'id': 1, title: 'Plan', 'tagline': 't', 'desc': 'd', 'match': 90, 'color': '#fff', 'location': 'Kyoto',}]\n```\nEnjoy!"
+
+    decoded = decode_agent_output(text, PROPOSALS_ADAPTER)
+
+    assert decoded.data[0]["title"] == "Plan"
+    assert {"code_fence", "leading_prose", "trailing_prose", "single_quotes", "unquoted_keys", "trailing_commas"} <= set(decoded.repairs)
+
+
+def itinerary():
+    item = {"time": "10:00", "activity": "清水寺", "icon": "⛩️", "description": "朝の参拝"}
+    return {
+        "proposalId": 1,
+        "days": [{"day": 1, "items": [item, {**item, "time": "12:00"}]}, {"day": 2, "items": [item, {**item, "time": "15:00"}]}],
+        "souvenirs": [{"name": "八ツ橋", "price": "¥800"}],
+    }
+
+
+def test_truncated_itinerary_keeps_complete_nested_items():
+    full = json.dumps(itinerary(), ensure_ascii=False)
+    truncated = full[:full.index('"15:00"') + 3]
+
+    decoded = decode_agent_output(truncated, ITINERARY_ADAPTER)
+
+    assert [len(day["items"]) for day in decoded.data["days"]] == [2, 1]
+    assert decoded.data["souvenirs"] == []
+    assert "closed_truncated" in decoded.repairs
+
+
+def test_bracketed_prose_before_the_json_is_skipped():
+    text = "Sure [see below]: " + json.dumps([proposal(1)]) + " (done)"
+
+    decoded = decode_agent_output(text, PROPOSALS_ADAPTER)
+
+    assert decoded.data[0]["id"] == 1
+    assert {"leading_prose", "trailing_prose"} <= set(decoded.repairs)
+
+
+def test_bracketed_prose_before_truncated_json():
+    full = json.dumps([proposal(1), proposal(2)], ensure_ascii=False)
+    text = "Sure {here it is}: " + full[:full.index('"id": 2') + 4]
+
+    decoded = decode_agent_output(text, PROPOSALS_ADAPTER)
+
+    assert [p["id"] for p in decoded.data] == [1]
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.api.endpoints import places
+from app.api.endpoints.places import _parse_range, _public_base_url
+from app.services.places.photo_proxy import CachedPhoto, sign_photo_name
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=abc", None),
+    ("bytes=-", None),
+    ("bytes=5-3", None),
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+def test_unsatisfiable_range_raises(header):
+    with pytest.raises(ValueError):
+        _parse_range(header, 1000)
+
+
+def make_request(headers):
+    scope = {
+        "type": "http",
+        "scheme": "http",
+        "server": ("api.example.com", 80),
+        "path": "/",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    return Request(scope)
+
+
+def test_base_url_honors_forwarded_proto(monkeypatch):
+    monkeypatch.setattr(places, "PUBLIC_API_BASE_URL", "")
+    request = make_request({"host": "api.example.com", "x-forwarded-proto": "https"})
+    assert _public_base_url(request) == "https://api.example.com"
+
+
+def test_configured_base_url_wins(monkeypatch):
+    monkeypatch.setattr(places, "PUBLIC_API_BASE_URL", "https://cdn.example.com/")
+    request = make_request({"host": "api.example.com"})
+    assert _public_base_url(request) == "https://cdn.example.com"
+
+
+def test_media_endpoint_only_fetches_signed_photo_names(monkeypatch, tmp_path):
+    fetched = []
+    photo = tmp_path / "photo.jpg"
+    photo.write_bytes(b"\xff\xd8jpeg")
+
+    async def get_cached_photo(photo_name, max_px):
+        fetched.append(photo_name)
+        return CachedPhoto(path=str(photo), size=photo.stat().st_size, etag='"e"', content_type="image/jpeg")
+
+    monkeypatch.setattr(places, "get_cached_photo", get_cached_photo)
+    app = FastAPI()
+    app.include_router(places.router, prefix="/places")
+    client = TestClient(app)
+    name = "places/abc/photos/def"
+
+    assert client.get(f"/places/photo/media/{name}").status_code == 404
+    assert client.get(f"/places/photo/media/{name}?sig={sign_photo_name('places/other/photos/def')}").status_code == 404
+    assert fetched == []
+
+    signed = client.get(f"/places/photo/media/{name}?sig={sign_photo_name(name)}")
+    assert signed.status_code == 200 and signed.content == b"\xff\xd8jpeg"
+    assert fetched == [name]
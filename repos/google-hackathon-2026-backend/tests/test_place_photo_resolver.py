@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import places as places_endpoint
+from app.services.cache import MISSING, LRUTTLCache
+from app.services.places import place_photo_resolver, places_client
+from app.services.places.place_photo_resolver import itinerary_place_queries, resolve_place_photo, resolve_place_photos
+from app.services.places.places_client import PlacePhoto, PlacesAPIError
+
+KYOTO = (35.0116, 135.7681)
+SENDAI = (38.2601, 140.8821)
+
+
+@pytest.fixture
+def places(monkeypatch):
+    """Fake Places search: the photo name encodes the query and the bias; records every call."""
+    cache = LRUTTLCache("test_place_photo", max_entries=100, ttl_seconds=60, negative_ttl_seconds=60, persist=False)
+    monkeypatch.setattr(place_photo_resolver, "place_photo_cache", cache)
+    monkeypatch.setenv("GOOGLE_PLACE_API_KEY", "test-key")
+    calls = []
+
+    async def search_place_photos(query, limit=1, location=None):
+        calls.append((query, location))
+        if query == "nowhere":
+            return []
+        if query == "broken":
+            raise PlacesAPIError("503")
+        suffix = f"{location[0]:.0f}_{location[1]:.0f}" if location else "bare"
+        return [PlacePhoto(name=f"places/{abs(hash(query)) % 1000}/photos/{suffix}")]
+
+    monkeypatch.setattr(places_client, "search_place_photos", search_place_photos)
+    return calls, cache
+
+
+def test_results_are_cached_per_query_and_bias(places):
+    calls, _ = places
+
+    async def run():
+        return [
+            await resolve_place_photo("Central Station", KYOTO),
+            await resolve_place_photo("Central Station", KYOTO),
+            await resolve_place_photo("Central Station", SENDAI),
+            await resolve_place_photo("Central Station"),
+        ]
+
+    kyoto, kyoto_again, sendai, bare = asyncio.run(run())
+
+    assert kyoto == kyoto_again
+    assert len({kyoto["photo_name"], sendai["photo_name"], bare["photo_name"]}) == 3
+    assert len(calls) == 3
+
+
+def test_not_found_is_cached_and_errors_are_not(places):
+    calls, cache = places
+
+    async def run():
+        assert await resolve_place_photo("nowhere") is None
+        assert await resolve_place_photo("nowhere") is None
+        for _ in range(2):
+            with pytest.raises(PlacesAPIError):
+                await resolve_place_photo("broken")
+
+    asyncio.run(run())
+    assert calls == [("nowhere", None), ("broken", None), ("broken", None)]
+    assert cache.get("broken") is MISSING
+
+
+def test_batch_resolution_keeps_order_and_dedupes(places):
+    calls, _ = places
+    queries = [("清水寺", KYOTO), ("broken", None), ("清水寺", KYOTO), ("nowhere", None)]
+
+    results = asyncio.run(resolve_place_photos(queries))
+
+    assert results[0] == results[2] and results[0] is not None
+    assert results[1] is None and results[3] is None
+    assert calls.count(("清水寺", KYOTO)) == 1
+
+
+def test_prefetch_does_not_alias_biased_results_to_the_bare_query(places, monkeypatch):
+    calls, cache = places
+    fetched = []
+
+    async def fetch_place_photo(name, max_px=1024):
+        fetched.append(name)
+        return b"photo"
+
+    monkeypatch.setattr(place_photo_resolver, "fetch_place_photo", fetch_place_photo)
+    itinerary = {"days": [{"items": [{"activity": "Central Station", "location": {"lat": SENDAI[0], "lng": SENDAI[1]}}]}]}
+
+    async def run():
+        place_photo_resolver.prefetch_itinerary_photos(itinerary)
+        await asyncio.gather(*place_photo_resolver._prefetch_tasks)
+
+    asyncio.run(run())
+
+    assert cache.get("Central Station") is MISSING
+    assert cache.get(place_photo_resolver._cache_key("Central Station", SENDAI)) is not MISSING
+    assert len(fetched) == 1
+
+
+def test_itinerary_place_queries():
+    itinerary = {"days": [{"items": [
+        {"activity": "清水寺", "location": {"lat": 34.99, "lng": 135.78}},
+        {"activity": "昼食"},
+        {"activity": ""},
+    ]}]}
+
+    assert itinerary_place_queries(itinerary) == [("清水寺", (34.99, 135.78)), ("昼食", None)]
+
+
+def test_batch_endpoint(places):
+    app = FastAPI()
+    app.include_router(places_endpoint.router, prefix="/places")
+    client = TestClient(app)
+
+    response = client.post("/places/photos/batch", json={
+        "items": [{"query": "清水寺", "lat": KYOTO[0], "lng": KYOTO[1]}, {"query": "nowhere"}],
+        "itinerary": {"proposalId": 1, "days": [{"day": 1, "items": [{"time": "10:00", "activity": "金閣寺", "icon": "⛩️"}]}]},
+    })
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["query"] for r in results] == ["清水寺", "nowhere", "金閣寺"]
+    assert results[0]["image_url"].startswith("http://testserver/places/photo/media/places/")
+    assert "&sig=" in results[0]["image_url"]
+    assert results[1]["image_url"] is None
+
+    too_many = client.post("/places/photos/batch", json={"items": [{"query": str(i)} for i in range(101)]})
+    assert too_many.status_code == 400
+
+
+def test_single_photo_endpoint_uses_the_location(places):
+    calls, _ = places
+    app = FastAPI()
+    app.include_router(places_endpoint.router, prefix="/places")
+
+    response = TestClient(app).post("/places/photo", json={"query": "Central Station", "lat": SENDAI[0], "lng": SENDAI[1]})
+
+    assert response.status_code == 200
+    assert calls == [("Central Station", SENDAI)]
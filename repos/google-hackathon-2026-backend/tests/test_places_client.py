@@ -0,0 +1,109 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.hedging import HedgePolicy
+from app.services.places import places_client
+from app.services.places.places_client import PlacesAPIError
+from app.services.retry import RetryBudget
+
+
+class FakeHttpClient:
+    """Replies to the n-th request with responses[n] after delays[n] seconds."""
+
+    def __init__(self, responses, delays):
+        self.responses = responses
+        self.delays = delays
+        self.calls = 0
+
+    async def post(self, url, headers=None, json=None):
+        n = self.calls
+        self.calls += 1
+        await asyncio.sleep(self.delays[n])
+        return self.responses[n]
+
+    async def get(self, url, params=None, follow_redirects=False):
+        return await self.post(url)
+
+
+@pytest.fixture
+def places(monkeypatch):
+    monkeypatch.setenv("GOOGLE_PLACE_API_KEY", "test-key")
+
+    def install(responses, delays, hedged=False):
+        client = FakeHttpClient(responses, delays)
+        monkeypatch.setattr(places_client, "get_http_client", lambda: client)
+        monkeypatch.setattr(places_client, "search_hedge", HedgePolicy(
+            "places_search_test",
+            enabled=hedged,
+            default_delay=0.02,
+            budget=RetryBudget(ratio=1.0, min_retries_per_second=10, max_tokens=10),
+        ))
+        return client
+
+    return install
+
+
+def test_fast_error_does_not_win_the_hedge(places):
+    client = places(
+        [httpx.Response(500, text="backend error"), httpx.Response(200, json={"places": [{"id": "ok"}]})],
+        # The first attempt fails after the hedge started but before the hedge answers
+        delays=[0.05, 0.1],
+        hedged=True,
+    )
+
+    result = asyncio.run(places_client._search_text("清水寺", "places.id", None))
+
+    assert result == [{"id": "ok"}]
+    assert client.calls == 2
+
+
+def test_error_status_raises_places_api_error(places):
+    places([httpx.Response(429, text="quota")], delays=[0.0])
+
+    with pytest.raises(PlacesAPIError, match="429"):
+        asyncio.run(places_client._search_text("清水寺", "places.id", None))
+
+
+def test_concurrent_identical_searches_share_one_request(places):
+    client = places([httpx.Response(200, json={"places": [{"id": "ok"}]})], delays=[0.05])
+
+    async def run():
+        return await asyncio.gather(*[places_client.search_text("清水寺", "places.id") for _ in range(5)])
+
+    assert asyncio.run(run()) == [[{"id": "ok"}]] * 5
+    assert client.calls == 1
+
+
+def test_shared_failure_reaches_every_caller_and_is_not_cached(places):
+    client = places(
+        [httpx.Response(503, text="unavailable"), httpx.Response(200, json={"places": [{"id": "ok"}]})],
+        delays=[0.05, 0.0],
+    )
+
+    async def run():
+        failed = await asyncio.gather(*[places_client.search_text("清水寺", "places.id") for _ in range(3)], return_exceptions=True)
+        return failed, await places_client.search_text("清水寺", "places.id")
+
+    failed, retried = asyncio.run(run())
+
+    assert all(isinstance(e, PlacesAPIError) for e in failed)
+    assert retried == [{"id": "ok"}]
+    assert client.calls == 2
+    assert places_client.search_flight.in_flight() == 0
+
+
+def test_concurrent_identical_photo_downloads_share_one_request(places):
+    client = places([httpx.Response(200, content=b"jpeg"), httpx.Response(500)], delays=[0.05, 0.0])
+
+    async def run():
+        shared = await asyncio.gather(*[places_client.fetch_photo_media("places/a/photos/b", 800) for _ in range(4)])
+        other_size = await asyncio.gather(places_client.fetch_photo_media("places/a/photos/b", 400), return_exceptions=True)
+        return shared, other_size
+
+    shared, other_size = asyncio.run(run())
+
+    assert shared == [b"jpeg"] * 4
+    assert isinstance(other_size[0], PlacesAPIError)
+    assert client.calls == 2
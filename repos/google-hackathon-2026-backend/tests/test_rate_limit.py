@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from app.services.rate_limit import AsyncRateLimiter
+
+
+def test_burst_passes_then_rate_applies():
+    limiter = AsyncRateLimiter(rate=20, burst=3)
+
+    async def run():
+        start = time.monotonic()
+        times = []
+        for _ in range(5):
+            await limiter.acquire()
+            times.append(time.monotonic() - start)
+        return times
+
+    times = asyncio.run(run())
+
+    assert times[2] < 0.02  # the burst is not delayed
+    assert times[4] >= 2 / 20 * 0.9  # two more tokens at 20/s
+    stats = limiter.stats()
+    assert stats["acquired"] == 5
+    assert stats["delayed"] == 2
+
+
+def test_waiters_are_served_in_arrival_order():
+    limiter = AsyncRateLimiter(rate=50, burst=1)
+    order = []
+
+    async def worker(i):
+        await limiter.acquire()
+        order.append(i)
+
+    async def run():
+        await asyncio.gather(*[worker(i) for i in range(5)])
+
+    asyncio.run(run())
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_sustained_rate_is_capped():
+    limiter = AsyncRateLimiter(rate=100, burst=1)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*[limiter.acquire() for _ in range(11)])
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 10 / 100 * 0.9
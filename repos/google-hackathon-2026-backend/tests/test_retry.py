@@ -0,0 +1,33 @@
+import time
+
+from app.services.retry import RetryBudget, RetryPolicy
+
+
+def make_policy(**kwargs):
+    return RetryPolicy("test", budget=RetryBudget(ratio=1.0, min_retries_per_second=10, max_tokens=10), **kwargs)
+
+
+def test_retry_after_is_honored_beyond_max_delay():
+    policy = make_policy(max_delay=30.0)
+
+    assert policy.next_delay(0, deadline=time.monotonic() + 120, retry_after=60.0) == 60.0
+    assert policy.next_delay(0, retry_after=60.0) == 60.0
+
+
+def test_gives_up_when_retry_after_exceeds_the_deadline():
+    policy = make_policy()
+
+    assert policy.next_delay(0, deadline=time.monotonic() + 30, retry_after=60.0) is None
+
+
+def test_gives_up_on_excessive_retry_after_without_deadline():
+    policy = make_policy(max_retry_after=120.0)
+
+    assert policy.next_delay(0, retry_after=600.0) is None
+
+
+def test_backoff_is_capped_by_max_delay():
+    policy = make_policy(base_delay=1.0, max_delay=2.0, max_attempts=10)
+
+    assert all(0 <= policy.next_delay(8) <= 2.0 for _ in range(5))
+    assert policy.next_delay(9) is None  # last attempt
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import uuid
+
+from app.database import Base, engine
+from app.models import models  # noqa: F401  (registers the tables)
+from app.services import bigquery_service
+from app.services.jobs.teaser_scheduler import TeaserScheduler
+
+Base.metadata.create_all(bind=engine)
+
+
+class FakeBigQueryService:
+    plans: list[dict] = []
+    threads: list[int] = []
+
+    def get_trending_plans(self, limit=10, recent_days=30):
+        FakeBigQueryService.threads.append(threading.get_ident())
+        return FakeBigQueryService.plans[:limit]
+
+
+def make_scheduler(monkeypatch, budget):
+    monkeypatch.setattr(bigquery_service, "BigQueryService", FakeBigQueryService)
+    scheduler = TeaserScheduler()
+    scheduler.daily_budget = budget
+    scheduler.max_attempts = 5
+    scheduler._semaphore = asyncio.Semaphore(1)
+    return scheduler
+
+
+def test_retries_spend_the_daily_budget(monkeypatch):
+    scheduler = make_scheduler(monkeypatch, budget=0)
+    plan_id = f"plan-{uuid.uuid4().hex}"
+    FakeBigQueryService.plans = [{"plan_id": plan_id, "title": "Kyoto", "description": "", "like_count": 3}]
+
+    async def failing(plan_id, title, description):
+        scheduler._mark_finished(plan_id, None, "boom")
+        scheduler._running.pop(plan_id, None)
+
+    monkeypatch.setattr(scheduler, "_generate", failing)
+
+    async def run():
+        used = scheduler._used_today()
+        scheduler.daily_budget = used + 2
+        for _ in range(4):
+            await scheduler.run_once(force=True)
+            await asyncio.sleep(0)
+        return scheduler._used_today() - used
+
+    assert asyncio.run(run()) == 2
+    assert scheduler.stats()["budget_exhausted"] == 2
+
+
+def test_trending_query_runs_off_the_event_loop(monkeypatch):
+    scheduler = make_scheduler(monkeypatch, budget=100)
+    FakeBigQueryService.plans = []
+    FakeBigQueryService.threads = []
+
+    asyncio.run(scheduler.run_once(force=True))
+
+    assert FakeBigQueryService.threads and FakeBigQueryService.threads[0] != threading.get_ident()
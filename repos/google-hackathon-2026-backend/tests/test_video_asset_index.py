@@ -0,0 +1,92 @@
+import asyncio
+import math
+
+from app.api.endpoints.media import VideoRequest, VideoSpot, find_video_urls
+from app.services import discovery_engine_service as discovery_engine_module
+from app.services import video_asset_index as index_module
+from app.services.video_asset_index import VideoAsset, VideoAssetIndex, geohash_cell_size, geohash_encode
+
+KYOTO_TOWER = (34.9875, 135.7593)
+
+
+def make_index(assets):
+    index = VideoAssetIndex()
+    index.load(assets)
+    return index
+
+
+def test_empty_or_unloaded_index_returns_nothing():
+    index = VideoAssetIndex()
+    assert index.search([("清水寺", None, None)]) == []
+
+    index.load([])
+    assert index.search([("清水寺", None, None)]) == []
+    assert index.stats()["misses"] == 1
+
+
+def test_bm25_ranks_the_name_match_first():
+    index = make_index([
+        VideoAsset("1", "https://v/keywords-only", keywords=["京都", "散歩"]),
+        VideoAsset("2", "https://v/kiyomizu", poi_name="清水寺", keywords=["京都"]),
+        VideoAsset("3", "https://v/fushimi", poi_name="伏見稲荷大社", keywords=["京都"]),
+    ])
+    index.per_spot = 3
+
+    assert index.search([("清水寺 京都", None, None)]) == ["https://v/kiyomizu"]
+
+    # Without the score floor the weaker "京都"-only matches rank below it
+    index.min_text_score = 0.0
+    urls = index.search([("清水寺 京都", None, None)])
+    assert urls[0] == "https://v/kiyomizu"
+    assert len(urls) == 3
+
+
+def test_unrelated_text_does_not_match():
+    index = make_index([VideoAsset("1", "https://v/kiyomizu", poi_name="清水寺")])
+    assert index.search([("Tokyo Skytree", None, None)]) == []
+
+
+def test_geohash_neighbourhood_crosses_cell_borders():
+    dlat, _ = geohash_cell_size(6)
+    # Query just below a cell's northern border, asset ~200m north in the next cell
+    cell_top = (math.floor((KYOTO_TOWER[0] + 90) / dlat) + 1) * dlat - 90
+    lat, lng = cell_top - dlat * 0.1, KYOTO_TOWER[1]
+    near = VideoAsset("near", "https://v/near", poi_name="unrelated", lat=lat + dlat * 0.3, lng=lng)
+    far = VideoAsset("far", "https://v/far", poi_name="unrelated", lat=lat + 0.05, lng=lng)
+    assert geohash_encode(near.lat, near.lng, 6) != geohash_encode(lat, lng, 6)
+    index = make_index([near, far])
+
+    assert index.search([("", lat, lng)]) == ["https://v/near"]
+
+
+def test_spots_are_interleaved_across_the_itinerary():
+    index = make_index([
+        VideoAsset("a1", "https://v/a1", poi_name="清水寺"),
+        VideoAsset("a2", "https://v/a2", poi_name="清水寺", keywords=["夜景"]),
+        VideoAsset("b1", "https://v/b1", poi_name="金閣寺"),
+    ])
+
+    urls = index.search([("清水寺", None, None), ("金閣寺", None, None)], limit=2)
+
+    assert set(urls) == {"https://v/b1", urls[0]}
+    assert urls[0] in ("https://v/a1", "https://v/a2")
+
+
+def test_find_video_urls_falls_back_to_discovery_engine(monkeypatch):
+    searched = []
+
+    async def search_video_urls(query, page_size=5):
+        searched.append(query)
+        return ["https://v/discovery"]
+
+    monkeypatch.setattr(discovery_engine_module.discovery_engine_service, "search_video_urls", search_video_urls)
+    monkeypatch.setattr(index_module, "video_asset_index", make_index([VideoAsset("1", "https://v/kiyomizu", poi_name="清水寺")]))
+
+    hit = VideoRequest(proposalId=1, title="京都", description="寺めぐり", spots=[VideoSpot(name="清水寺")])
+    miss = VideoRequest(proposalId=1, title="京都", description="寺めぐり", spots=[VideoSpot(name="Tokyo Skytree")])
+    no_spots = VideoRequest(proposalId=1, title="京都", description="寺めぐり")
+
+    assert asyncio.run(find_video_urls(hit)) == ["https://v/kiyomizu"]
+    assert asyncio.run(find_video_urls(miss)) == ["https://v/discovery"]
+    assert asyncio.run(find_video_urls(no_spots)) == ["https://v/discovery"]
+    assert searched == ["京都 寺めぐり", "京都 寺めぐり"]
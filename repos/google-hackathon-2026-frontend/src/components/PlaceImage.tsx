@@ -1,11 +1,13 @@
 import React, { useEffect, useState, useRef } from 'react';
 import { GeminiService } from '../services/gemini';
+import type { Location } from '../context/TravelContext';
 
 // NOTE: Using Backend API to proxy Google Places API (New)
 // Backend stores the API Key.
 
 interface PlaceImageProps {
     query: string;
+    location?: Location;
     width?: string;
     height?: string;
     className?: string;
@@ -17,6 +19,7 @@ const imageCache: Record<string, string> = {};
 
 const PlaceImage: React.FC<PlaceImageProps> = ({
     query,
+    location,
     width = '100%',
     height = '200px',
     className,
@@ -35,20 +38,22 @@ const PlaceImage: React.FC<PlaceImageProps> = ({
             return;
         }
 
+        const cacheKey = location ? `${query}@${location.lat},${location.lng}` : query;
+
         // Check cache first
-        if (imageCache[query]) {
-            setImageUrl(imageCache[query]);
+        if (imageCache[cacheKey]) {
+            setImageUrl(imageCache[cacheKey]);
             setLoading(false);
             return;
         }
 
         const fetchImage = async () => {
             try {
-                const data = await GeminiService.getPlacePhoto(query);
+                const data = await GeminiService.getPlacePhoto(query, location);
 
                 if (isMounted) {
                     if (data.image_url) {
-                        imageCache[query] = data.image_url;
+                        imageCache[cacheKey] = data.image_url;
                         setImageUrl(data.image_url);
                         setLoading(false);
                     } else {
@@ -70,7 +75,7 @@ const PlaceImage: React.FC<PlaceImageProps> = ({
         return () => {
             isMounted = false;
         };
-    }, [query]);
+    }, [query, location?.lat, location?.lng]);
 
     if (loading) {
         return (
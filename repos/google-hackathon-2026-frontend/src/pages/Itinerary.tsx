@@ -617,6 +617,7 @@ const Itinerary: React.FC = () => {
                                             <div style={{ marginLeft: '3.5rem', marginTop: '0.5rem', height: '200px', borderRadius: '10px', overflow: 'hidden' }}>
                                                 <PlaceImage
                                                     query={item.video_ref?.poi || item.activity}
+                                                    location={item.location}
                                                     height="100%"
                                                     borderRadius="10px"
                                                 />
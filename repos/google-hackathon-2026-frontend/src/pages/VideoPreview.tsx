@@ -3,11 +3,11 @@ import { useNavigate } from 'react-router-dom';
 import { InstagramEmbed, TikTokEmbed, YouTubeEmbed } from 'react-social-media-embed';
 import { useTravel } from '../context/TravelContext';
 import { useAuth } from '../context/AuthContext';
-import { GeminiService } from '../services/gemini';
+import { GeminiService, videoSpotsFor } from '../services/gemini';
 
 const VideoPreview: React.FC = () => {
     const navigate = useNavigate();
-    const { selectedProposal, t, videoCache, setVideoCache } = useTravel();
+    const { selectedProposal, itinerary, t, videoCache, setVideoCache } = useTravel();
     const { user, isLoading: isAuthLoading } = useAuth();
 
     // Separate loading states
@@ -72,7 +72,8 @@ const VideoPreview: React.FC = () => {
             GeminiService.searchShortVideos(
                 selectedProposal.id,
                 selectedProposal.title,
-                selectedProposal.desc
+                selectedProposal.desc,
+                videoSpotsFor(selectedProposal, itinerary)
             ).then(urls => {
                 if (urls && urls.length > 0) {
                     setVideoCache(prev => ({
@@ -1,8 +1,26 @@
-import type { Proposal, Itinerary, SocialPlan } from '../context/TravelContext';
+import type { Proposal, Itinerary, SocialPlan, Location } from '../context/TravelContext';
 import type { Language } from '../utils/translations';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8080/api/v1';
 
+// Spot sent to the media endpoints; the backend looks these up in its local video index first
+export interface VideoSpot {
+    name: string;
+    lat?: number;
+    lng?: number;
+}
+
+// Itinerary spots (with coordinates) when the itinerary belongs to the proposal, else its location name
+export const videoSpotsFor = (proposal: Proposal, itinerary: Itinerary | null): VideoSpot[] => {
+    if (itinerary && String(itinerary.proposalId) === String(proposal.id)) {
+        const spots = itinerary.days.flatMap(day => day.items
+            .filter(item => item.activity)
+            .map(item => ({ name: item.activity, lat: item.location?.lat, lng: item.location?.lng })));
+        if (spots.length > 0) return spots;
+    }
+    return proposal.location ? [{ name: proposal.location }] : [];
+};
+
 // Mock Data Generators reflecting "Gemini's Creativity" (Fallback)
 const MOCK_PROPOSALS: Record<Language, Record<string, Proposal[]>> = {
     en: {
@@ -126,7 +144,7 @@ export const GeminiService = {
         }
     },
 
-    generateVideo: async (proposalId: number | string, title: string, description: string, userProfileImage?: string | null, userId?: number | string | null): Promise<{ videoUrls: string[], imageUrl?: string }> => {
+    generateVideo: async (proposalId: number | string, title: string, description: string, userProfileImage?: string | null, userId?: number | string | null, spots?: VideoSpot[]): Promise<{ videoUrls: string[], imageUrl?: string }> => {
         try {
             const response = await fetch(`${API_BASE_URL}/media/generate-video`, {
                 method: 'POST',
@@ -136,7 +154,8 @@ export const GeminiService = {
                     title,
                     description,
                     user_profile_image_url: userProfileImage,
-                    user_id: userId
+                    user_id: userId,
+                    spots
                 })
             });
             if (!response.ok) throw new Error('Video API failed');
@@ -176,7 +195,7 @@ export const GeminiService = {
         }
     },
 
-    searchShortVideos: async (proposalId: number | string, title: string, description: string): Promise<string[]> => {
+    searchShortVideos: async (proposalId: number | string, title: string, description: string, spots?: VideoSpot[]): Promise<string[]> => {
         try {
             const response = await fetch(`${API_BASE_URL}/media/shorts`, {
                 method: 'POST',
@@ -184,7 +203,8 @@ export const GeminiService = {
                 body: JSON.stringify({
                     proposalId,
                     title,
-                    description
+                    description,
+                    spots
                 })
             });
             if (!response.ok) throw new Error('Shorts API failed');
@@ -409,14 +429,15 @@ export const GeminiService = {
         }
     },
 
-    getPlacePhoto: async (query: string): Promise<{ image_url: string | null, author_attributions?: any[] }> => {
+    getPlacePhoto: async (query: string, location?: Location): Promise<{ image_url: string | null, author_attributions?: any[] }> => {
         try {
             const response = await fetch(`${API_BASE_URL}/places/photo`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({ query }),
+                // The location biases the search to the spot (and matches the backend's prefetched entry)
+                body: JSON.stringify({ query, lat: location?.lat, lng: location?.lng }),
             });
 
             if (!response.ok) {